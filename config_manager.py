@@ -1,11 +1,50 @@
+import copy
 import json
 import os
+from contextlib import contextmanager
+from PyQt5.QtCore import QRunnable, QThreadPool, QTimer
+
+class ConfigWriteJob(QRunnable):
+    """后台写入配置文件的任务"""
+    
+    def __init__(self, manager, data):
+        super().__init__()
+        self.manager = manager
+        self.data = data
+    
+    def run(self):
+        self.manager.write_file(self.data)
 
 class ConfigManager:
-    """配置管理类，用于加载和保存配置文件"""
+    """
+    配置管理类，用于加载和保存配置文件
+    
+    set()只修改内存中的配置并标记为已修改，连续的修改在FLUSH_DELAY毫秒内合并为一次写入；
+    写入在后台线程中进行，先写临时文件再原子替换，写到一半时程序崩溃也不会损坏配置文件。
+    transaction()中的修改在退出时才安排写入。
+    """
+    
+    FLUSH_DELAY = 500  # 最后一次修改后多久写入文件（毫秒）
+    # 外观预设包含的配置项：样式、置顶、输出变换，以及主窗口大小位置和副屏位置
+    PRESET_KEYS = ("font_size", "background_color", "text_color",
+                   "main_window_topmost", "secondary_screen_topmost",
+                   "main_window_mirrored", "main_window_rotation",
+                   "secondary_screen_mirrored", "secondary_screen_rotation",
+                   "main_window", "secondary_window")
+    RESET_KEEP_KEYS = ("presets", "current_preset")  # 重置配置时保留的配置项
     
     def __init__(self, config_file="config.json"):
         self.config_file = config_file
+        self.dirty = False  # 内存中的配置是否有尚未写入的修改
+        self.write_count = 0  # 实际写入文件的次数
+        self._transaction_depth = 0
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_DELAY)
+        self.flush_timer.timeout.connect(self.flush)
+        # 单线程写入，多次写入按提交顺序完成，较旧的内容不会覆盖较新的内容
+        self._write_pool = QThreadPool()
+        self._write_pool.setMaxThreadCount(1)
         self.default_config = {
             "main_window": {
                 "width": 800,
@@ -20,6 +59,9 @@ class ConfigManager:
                 "y": 100
             },
             "scroll_speed": 1000,
+            "frame_pacing": "refresh",
+            "display_mode": "paragraph",
+            "tiled_rendering": False,
             "font_size": 36,
             "background_color": "#000000",
             "text_color": "#ffffff",
@@ -27,9 +69,15 @@ class ConfigManager:
             "paragraph_time_control_mode": "global",
             "secondary_screen_topmost": False,
             "main_window_topmost": False,
+            "main_window_mirrored": False,
+            "main_window_rotation": 0,
+            "secondary_screen_mirrored": False,
+            "secondary_screen_rotation": 0,
+            "presets": {},  # 外观预设：名称 -> PRESET_KEYS中配置项的值
+            "current_preset": None,
             "last_opened_file": None
         }
-        self.config = self.default_config.copy()
+        self.config = copy.deepcopy(self.default_config)
         self.load_config()
     
     def load_config(self):
@@ -41,18 +89,79 @@ class ConfigManager:
                 self.config.update(loaded_config)
             except Exception as e:
                 print(f"加载配置文件失败: {e}")
-                self.config = self.default_config.copy()
+                self.config = copy.deepcopy(self.default_config)
         else:
             self.save_config()
     
+    def reset(self):
+        """重置为默认配置并立即保存，保留外观预设"""
+        kept = {key: self.config[key] for key in self.RESET_KEEP_KEYS if key in self.config}
+        # 深拷贝，之后修改窗口位置等嵌套配置时不会改动默认配置
+        self.config = copy.deepcopy(self.default_config)
+        self.config.update(kept)
+        self.save_config()
+    
     def save_config(self):
-        """保存配置文件"""
+        """立即保存配置文件（同步写入，等待之前的后台写入完成）"""
+        self.flush_timer.stop()
+        self._write_pool.waitForDone()
+        self.dirty = False
+        self.write_file(self._serialize())
+    
+    def flush(self):
+        """把尚未写入的修改提交到后台线程写入文件"""
+        self.flush_timer.stop()
+        if not self.dirty:
+            return
+        self.dirty = False
+        # 在调用线程中序列化，后台线程只负责写入，不会读到正在修改的配置
+        self._write_pool.start(ConfigWriteJob(self, self._serialize()))
+    
+    def close(self):
+        """写入所有尚未保存的修改并等待后台写入完成（程序退出前调用）"""
+        self.flush()
+        self._write_pool.waitForDone()
+    
+    def _serialize(self):
+        """把当前配置序列化为JSON文本"""
+        return json.dumps(self.config, indent=4, ensure_ascii=False)
+    
+    def write_file(self, data):
+        """
+        原子写入配置文件：先写入临时文件并刷新到磁盘，再替换原文件
+        
+        Args:
+            data: 配置文件内容
+        """
+        temp_file = self.config_file + ".tmp"
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.config_file)
+            self.write_count += 1
         except Exception as e:
             print(f"保存配置文件失败: {e}")
     
+    @contextmanager
+    def transaction(self):
+        """
+        批量修改配置：事务中的修改在退出时合并为一次写入，事务可以嵌套
+        
+        用法:
+            with config_manager.transaction():
+                config_manager.set("main_window.x", x)
+                config_manager.set("main_window.y", y)
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0 and self.dirty:
+                self.flush_timer.start()
+    
     def get(self, key, default=None):
         """获取配置值"""
         keys = key.split('.')
@@ -65,22 +174,86 @@ class ConfigManager:
         return value
     
     def set(self, key, value):
-        """设置配置值"""
+        """设置配置值：只修改内存中的配置，稍后合并写入文件"""
         keys = key.split('.')
         config = self.config
         for k in keys[:-1]:
             if k not in config:
                 config[k] = {}
             config = config[k]
+        if config.get(keys[-1], self) == value:
+            return
         config[keys[-1]] = value
-        self.save_config()
+        self.dirty = True
+        if self._transaction_depth == 0:
+            # 每次修改都重新计时，连续修改只在停止后写入一次
+            self.flush_timer.start()
     
     def update_window_size(self, window_type, width, height):
         """更新窗口大小配置"""
-        self.set(f"{window_type}.width", width)
-        self.set(f"{window_type}.height", height)
+        with self.transaction():
+            self.set(f"{window_type}.width", width)
+            self.set(f"{window_type}.height", height)
     
     def update_window_position(self, window_type, x, y):
         """更新窗口位置配置"""
-        self.set(f"{window_type}.x", x)
-        self.set(f"{window_type}.y", y)
+        with self.transaction():
+            self.set(f"{window_type}.x", x)
+            self.set(f"{window_type}.y", y)
+    
+    def preset_names(self):
+        """获取所有外观预设的名称"""
+        return sorted(self.config.get("presets", {}))
+    
+    def get_preset(self, name):
+        """获取外观预设，不存在时返回None"""
+        return self.config.get("presets", {}).get(name)
+    
+    def capture_preset(self):
+        """按当前配置生成外观预设"""
+        return {key: copy.deepcopy(self.config[key]) for key in self.PRESET_KEYS if key in self.config}
+    
+    def save_preset(self, name, preset):
+        """
+        保存外观预设
+        
+        Args:
+            name: 预设名称
+            preset: PRESET_KEYS中配置项的值
+        """
+        presets = dict(self.config.get("presets", {}))
+        presets[name] = preset
+        self.set("presets", presets)
+    
+    def delete_preset(self, name):
+        """删除外观预设"""
+        presets = dict(self.config.get("presets", {}))
+        if presets.pop(name, None) is not None:
+            with self.transaction():
+                self.set("presets", presets)
+                if self.config.get("current_preset") == name:
+                    self.set("current_preset", None)
+    
+    def apply_preset(self, name):
+        """
+        把外观预设写入配置，所有修改合并为一次写入
+        
+        Args:
+            name: 预设名称
+        
+        Returns:
+            预设内容，不存在时返回None
+        """
+        preset = self.get_preset(name)
+        if preset is None:
+            return None
+        with self.transaction():
+            for key, value in preset.items():
+                if isinstance(value, dict):
+                    # 窗口大小和位置逐项合并，预设中没有的项保持不变
+                    for sub_key, sub_value in value.items():
+                        self.set(f"{key}.{sub_key}", sub_value)
+                else:
+                    self.set(key, value)
+            self.set("current_preset", name)
+        return preset
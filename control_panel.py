@@ -3,13 +3,16 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget, QPus
                              QLineEdit, QTextEdit, QProgressBar, QCheckBox, QGroupBox, 
                              QDoubleSpinBox, QFormLayout, QFrame, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QColor
-
-from help_dialog import HelpDialog
+from PyQt5.QtGui import QColor, QPalette
 
 class ControlPanel(QWidget):
     """控制面板，集成所有功能控制选项"""
     
+    FRAME_PACING_MODES = ["refresh", "update_request", "fixed"]  # 与帧节奏下拉框的选项顺序一致
+    DISPLAY_MODES = ["paragraph", "continuous"]  # 与显示方式下拉框的选项顺序一致
+    # 演出中很少使用的标签页：启动时只放占位页，首帧显示后或第一次切换到该页时才创建控件
+    DEFERRED_TABS = ("style_tab", "screen_tab")
+    
     # 定义信号
     # 文件操作信号
     open_file = pyqtSignal(str)
@@ -18,19 +21,25 @@ class ControlPanel(QWidget):
     clear_text = pyqtSignal()
     
     # 文本内容信号
-    text_changed = pyqtSignal(str)
+    text_edited = pyqtSignal()  # 文本被编辑（不携带文本，由接收方合并后再读取）
+    contents_changed = pyqtSignal(int, int, int)  # 文档变化位置、删除字符数、新增字符数
+    editor_cursor_moved = pyqtSignal(int)  # 编辑光标位置（开启跟随光标时发出）
     
     # 滚动控制信号
     start_scroll = pyqtSignal()
     pause_scroll = pyqtSignal()
     reset_scroll = pyqtSignal()
     scroll_speed_changed = pyqtSignal(int)
+    frame_pacing_changed = pyqtSignal(str)  # 滚动帧节奏："refresh"、"update_request"或"fixed"
+    display_mode_changed = pyqtSignal(str)  # 显示方式："paragraph"单段显示或"continuous"整篇连续滚动
+    tiled_rendering_changed = pyqtSignal(bool)  # 是否使用分块位图渲染
     
     # 段落控制信号
     paragraph_changed = pyqtSignal(int)
     paragraph_duration_changed = pyqtSignal(int)
     paragraph_scroll_changed = pyqtSignal(float)
     paragraph_time_control_mode_changed = pyqtSignal(str)
+    seek_time_requested = pyqtSignal(str)  # 跳转到时间轴上的时间（时:分:秒）
     
     # 样式控制信号
     font_size_changed = pyqtSignal(int)
@@ -41,6 +50,8 @@ class ControlPanel(QWidget):
     toggle_secondary_screen = pyqtSignal(bool)
     toggle_main_window_topmost = pyqtSignal(bool)
     toggle_secondary_window_topmost = pyqtSignal(bool)
+    main_window_transform_changed = pyqtSignal(bool, int)  # 主窗口输出变换：是否镜像、旋转角度
+    secondary_window_transform_changed = pyqtSignal(bool, int)  # 副屏输出变换：是否镜像、旋转角度
     main_window_width_changed = pyqtSignal(int)
     main_window_height_changed = pyqtSignal(int)
     main_window_x_changed = pyqtSignal(int)
@@ -51,6 +62,9 @@ class ControlPanel(QWidget):
     # 配置控制信号
     save_config = pyqtSignal()
     reset_config = pyqtSignal()
+    apply_preset = pyqtSignal(str)  # 切换到外观预设：预设名称
+    save_preset = pyqtSignal(str)  # 把当前外观保存为预设：预设名称
+    delete_preset = pyqtSignal(str)  # 删除外观预设：预设名称
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -63,6 +77,8 @@ class ControlPanel(QWidget):
         # 初始化属性
         self.current_file_path = None
         self.is_scrolling = False
+        self.deferred_tabs = {}  # 尚未创建的标签页：占位页 -> 创建函数
+        self.help_dialog = None  # 帮助对话框，第一次打开时创建
         
         # 创建UI组件
         self.setup_ui()
@@ -75,12 +91,12 @@ class ControlPanel(QWidget):
         # 创建标签页控件
         self.tab_widget = QTabWidget()
         
-        # 创建各个标签页
+        # 创建各个标签页，很少使用的标签页先放占位页
         self.text_tab = self.create_text_tab()
         self.scroll_tab = self.create_scroll_tab()
         self.paragraph_tab = self.create_paragraph_tab()
-        self.style_tab = self.create_style_tab()
-        self.screen_tab = self.create_screen_tab()
+        self.style_tab = self.create_deferred_tab(self.create_style_tab)
+        self.screen_tab = self.create_deferred_tab(self.create_screen_tab)
         
         # 添加标签页到标签页控件
         self.tab_widget.addTab(self.text_tab, "文本管理")
@@ -88,6 +104,7 @@ class ControlPanel(QWidget):
         self.tab_widget.addTab(self.paragraph_tab, "段落设置")
         self.tab_widget.addTab(self.style_tab, "样式定制")
         self.tab_widget.addTab(self.screen_tab, "多屏设置")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         
         # 创建底部按钮布局
         bottom_layout = QHBoxLayout()
@@ -118,6 +135,38 @@ class ControlPanel(QWidget):
         main_layout.addLayout(bottom_layout)
         main_layout.addWidget(self.error_label)
     
+    def create_deferred_tab(self, create):
+        """
+        创建延迟创建的标签页的占位页
+        
+        Args:
+            create: 创建标签页内容的函数
+        
+        Returns:
+            占位页
+        """
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.deferred_tabs[tab] = create
+        return tab
+    
+    def build_deferred_tabs(self):
+        """创建所有尚未创建的标签页内容"""
+        deferred_tabs = self.deferred_tabs
+        self.deferred_tabs = {}
+        for tab, create in deferred_tabs.items():
+            tab.layout().addWidget(create())
+    
+    def tabs_built(self):
+        """所有标签页的控件是否都已创建"""
+        return not self.deferred_tabs
+    
+    def on_tab_changed(self, index):
+        """切换到尚未创建的标签页时立即创建"""
+        if self.tab_widget.widget(index) in self.deferred_tabs:
+            self.build_deferred_tabs()
+    
     def create_text_tab(self):
         """创建文本管理标签页"""
         tab = QWidget()
@@ -141,16 +190,24 @@ class ControlPanel(QWidget):
         self.text_edit = QTextEdit()
         self.text_edit.setPlaceholderText("请输入或粘贴提词文本，使用({分:秒})分隔段落...")
         
+        # 显示跟随编辑光标所在段落
+        self.follow_cursor_check = QCheckBox("显示跟随编辑光标")
+        
         # 连接信号
         self.open_btn.clicked.connect(self.on_open_file)
         self.save_btn.clicked.connect(self.on_save_file)
         self.save_as_btn.clicked.connect(self.on_save_as_file)
         self.clear_btn.clicked.connect(self.on_clear_text)
+        # contentsChange先于textChanged发出，用于增量解析
+        self.text_edit.document().contentsChange.connect(self.contents_changed)
         self.text_edit.textChanged.connect(self.on_text_changed)
+        self.text_edit.cursorPositionChanged.connect(self.on_cursor_position_changed)
+        self.follow_cursor_check.stateChanged.connect(self.on_cursor_position_changed)
         
         # 添加到布局
         layout.addWidget(file_group)
         layout.addWidget(self.text_edit)
+        layout.addWidget(self.follow_cursor_check)
         
         return tab
     
@@ -169,6 +226,14 @@ class ControlPanel(QWidget):
         control_layout.addWidget(self.start_pause_btn)
         control_layout.addWidget(self.reset_btn)
         
+        # 显示方式
+        display_mode_layout = QHBoxLayout()
+        display_mode_layout.addWidget(QLabel("显示方式:"))
+        self.display_mode_combo = QComboBox()
+        self.display_mode_combo.addItems(["单段显示", "整篇连续滚动"])
+        display_mode_layout.addWidget(self.display_mode_combo)
+        display_mode_layout.addStretch()
+        
         # 滚动速度控制
         speed_group = QGroupBox("滚动速度")
         speed_layout = QVBoxLayout(speed_group)
@@ -196,15 +261,40 @@ class ControlPanel(QWidget):
         speed_layout.addLayout(speed_input_layout)
         speed_layout.addWidget(self.scroll_time_label)
         
+        # 帧节奏
+        pacing_group = QGroupBox("帧节奏")
+        pacing_layout = QVBoxLayout(pacing_group)
+        
+        pacing_mode_layout = QHBoxLayout()
+        pacing_mode_layout.addWidget(QLabel("刷新方式:"))
+        self.frame_pacing_combo = QComboBox()
+        self.frame_pacing_combo.addItems(["跟随显示器刷新率", "窗口系统帧请求", "固定30毫秒"])
+        pacing_mode_layout.addWidget(self.frame_pacing_combo)
+        pacing_mode_layout.addStretch()
+        
+        self.frame_stats_label = QLabel("帧率: -- fps，掉帧: 0")
+        self.frame_stats_label.setAlignment(Qt.AlignCenter)
+        
+        self.tiled_rendering_check = QCheckBox("分块缓存渲染（大字号时减少重绘）")
+        
+        pacing_layout.addLayout(pacing_mode_layout)
+        pacing_layout.addWidget(self.tiled_rendering_check)
+        pacing_layout.addWidget(self.frame_stats_label)
+        
         # 连接信号
         self.start_pause_btn.clicked.connect(self.on_start_pause)
         self.reset_btn.clicked.connect(self.reset_scroll)
         self.speed_slider.valueChanged.connect(self.on_speed_changed)
         self.speed_spinbox.valueChanged.connect(self.on_speed_spinbox_changed)
+        self.frame_pacing_combo.currentIndexChanged.connect(self.on_frame_pacing_changed)
+        self.display_mode_combo.currentIndexChanged.connect(self.on_display_mode_changed)
+        self.tiled_rendering_check.stateChanged.connect(self.on_tiled_rendering_toggled)
         
         # 添加到布局
         layout.addWidget(control_group)
+        layout.addLayout(display_mode_layout)
         layout.addWidget(speed_group)
+        layout.addWidget(pacing_group)
         
         return tab
     
@@ -275,11 +365,32 @@ class ControlPanel(QWidget):
         progress_layout.addWidget(QLabel("整体进度:"))
         progress_layout.addWidget(self.overall_progress)
         
+        # 演出时间轴：已播时间、总时长、剩余时间，以及按时间跳转
+        self.time_info_label = QLabel("已播 0:00:00 / 共 0:00:00，剩余 0:00:00")
+        self.time_info_label.setAlignment(Qt.AlignCenter)
+        self.time_progress = QProgressBar()  # 按时间计算的整体进度，只用于显示
+        self.time_progress.setRange(0, 1000)
+        self.time_progress.setValue(0)
+        self.time_progress.setTextVisible(False)
+        seek_layout = QHBoxLayout()
+        seek_layout.addWidget(QLabel("跳转到时间:"))
+        self.seek_time_edit = QLineEdit()
+        self.seek_time_edit.setPlaceholderText("时:分:秒")
+        self.seek_time_btn = QPushButton("跳转")
+        seek_layout.addWidget(self.seek_time_edit)
+        seek_layout.addWidget(self.seek_time_btn)
+        progress_layout.addWidget(QLabel("时间进度:"))
+        progress_layout.addWidget(self.time_progress)
+        progress_layout.addWidget(self.time_info_label)
+        progress_layout.addLayout(seek_layout)
+        
         # 连接信号
         self.prev_paragraph_btn.clicked.connect(self.on_prev_paragraph)
         self.next_paragraph_btn.clicked.connect(self.on_next_paragraph)
         self.duration_spinbox.valueChanged.connect(self.paragraph_duration_changed)
         self.time_control_mode_combo.currentIndexChanged.connect(self.on_time_control_mode_changed)
+        self.seek_time_btn.clicked.connect(self.on_seek_time)
+        self.seek_time_edit.returnPressed.connect(self.on_seek_time)
         # 连接信号，确保时间控制方式变化时能保存到配置
         self.time_control_mode_combo.currentIndexChanged.connect(self.save_config)
         
@@ -315,7 +426,9 @@ class ControlPanel(QWidget):
         self.bg_color_display = QLabel("#000000")
         self.bg_color_display.setFixedWidth(100)
         self.bg_color_display.setAlignment(Qt.AlignCenter)
-        self.bg_color_display.setStyleSheet("background-color: #000000; color: white; border: 1px solid gray;")
+        self.bg_color_display.setAutoFillBackground(True)
+        self.bg_color_display.setFrameStyle(QFrame.Panel | QFrame.Sunken)
+        self.set_color_swatch(self.bg_color_display, QColor(0, 0, 0), QColor(255, 255, 255))
         
         bg_layout.addWidget(self.bg_color_btn)
         bg_layout.addWidget(self.bg_color_display)
@@ -326,7 +439,9 @@ class ControlPanel(QWidget):
         self.text_color_display = QLabel("#ffffff")
         self.text_color_display.setFixedWidth(100)
         self.text_color_display.setAlignment(Qt.AlignCenter)
-        self.text_color_display.setStyleSheet("background-color: #ffffff; color: black; border: 1px solid gray;")
+        self.text_color_display.setAutoFillBackground(True)
+        self.text_color_display.setFrameStyle(QFrame.Panel | QFrame.Sunken)
+        self.set_color_swatch(self.text_color_display, QColor(255, 255, 255), QColor(0, 0, 0))
         
         text_layout.addWidget(self.text_color_btn)
         text_layout.addWidget(self.text_color_display)
@@ -334,14 +449,43 @@ class ControlPanel(QWidget):
         color_layout.addRow("背景色:", bg_layout)
         color_layout.addRow("文本色:", text_layout)
         
+        # 外观预设：样式、置顶、输出变换和窗口位置一次性切换
+        preset_group = QGroupBox("外观预设")
+        preset_layout = QVBoxLayout(preset_group)
+        
+        preset_select_layout = QHBoxLayout()
+        self.preset_combo = QComboBox()
+        self.preset_combo.setEditable(True)  # 输入新名称保存为新预设
+        self.preset_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.apply_preset_btn = QPushButton("切换")
+        preset_select_layout.addWidget(self.preset_combo, 1)
+        preset_select_layout.addWidget(self.apply_preset_btn)
+        
+        preset_edit_layout = QHBoxLayout()
+        self.save_preset_btn = QPushButton("保存为预设")
+        self.delete_preset_btn = QPushButton("删除预设")
+        self.preset_time_label = QLabel("")
+        preset_edit_layout.addWidget(self.save_preset_btn)
+        preset_edit_layout.addWidget(self.delete_preset_btn)
+        preset_edit_layout.addStretch()
+        preset_edit_layout.addWidget(self.preset_time_label)
+        
+        preset_layout.addLayout(preset_select_layout)
+        preset_layout.addLayout(preset_edit_layout)
+        
         # 连接信号
         self.font_size_spinbox.valueChanged.connect(self.font_size_changed)
         self.bg_color_btn.clicked.connect(self.on_bg_color_clicked)
         self.text_color_btn.clicked.connect(self.on_text_color_clicked)
+        self.apply_preset_btn.clicked.connect(self.on_apply_preset)
+        self.preset_combo.activated.connect(self.on_apply_preset)
+        self.save_preset_btn.clicked.connect(self.on_save_preset)
+        self.delete_preset_btn.clicked.connect(self.on_delete_preset)
         
         # 添加到布局
         layout.addWidget(font_group)
         layout.addWidget(color_group)
+        layout.addWidget(preset_group)
         
         return tab
     
@@ -380,9 +524,19 @@ class ControlPanel(QWidget):
         # 主窗口置顶
         self.main_topmost_check = QCheckBox("主窗口置顶")
         
+        # 主窗口镜像和旋转
+        main_transform_layout = QHBoxLayout()
+        self.main_mirror_check = QCheckBox("水平镜像")
+        self.main_rotation_combo = QComboBox()
+        self.main_rotation_combo.addItems(["不旋转", "旋转180°"])
+        main_transform_layout.addWidget(self.main_mirror_check)
+        main_transform_layout.addWidget(self.main_rotation_combo)
+        main_transform_layout.addStretch()
+        
         main_window_layout.addRow("宽度:", self.main_width_spinbox)
         main_window_layout.addRow("高度:", self.main_height_spinbox)
         main_window_layout.addRow("坐标:", main_coords_layout)
+        main_window_layout.addRow("输出:", main_transform_layout)
         main_window_layout.addRow(self.main_topmost_check)
         
         # 副屏设置
@@ -407,9 +561,19 @@ class ControlPanel(QWidget):
         secondary_coords_layout.addWidget(self.secondary_y_spinbox)
         secondary_coords_layout.addStretch()
         
+        # 副屏镜像和旋转
+        secondary_transform_layout = QHBoxLayout()
+        self.secondary_mirror_check = QCheckBox("水平镜像")
+        self.secondary_rotation_combo = QComboBox()
+        self.secondary_rotation_combo.addItems(["不旋转", "旋转180°"])
+        secondary_transform_layout.addWidget(self.secondary_mirror_check)
+        secondary_transform_layout.addWidget(self.secondary_rotation_combo)
+        secondary_transform_layout.addStretch()
+        
         # 添加控件到布局
         secondary_layout.addRow(self.secondary_screen_check)
         secondary_layout.addRow("坐标:", secondary_coords_layout)
+        secondary_layout.addRow("输出:", secondary_transform_layout)
         secondary_layout.addRow(self.secondary_topmost_check)
         
         # 连接信号
@@ -423,6 +587,10 @@ class ControlPanel(QWidget):
         self.secondary_screen_check.stateChanged.connect(self.on_secondary_screen_toggled)
         self.secondary_topmost_check.stateChanged.connect(self.on_secondary_topmost_toggled)
         self.main_topmost_check.stateChanged.connect(self.on_main_topmost_toggled)
+        self.main_mirror_check.stateChanged.connect(self.on_main_transform_changed)
+        self.main_rotation_combo.currentIndexChanged.connect(self.on_main_transform_changed)
+        self.secondary_mirror_check.stateChanged.connect(self.on_secondary_transform_changed)
+        self.secondary_rotation_combo.currentIndexChanged.connect(self.on_secondary_transform_changed)
         
         # 添加到布局
         layout.addWidget(main_window_group)
@@ -463,7 +631,13 @@ class ControlPanel(QWidget):
     @pyqtSlot()
     def on_text_changed(self):
         """文本内容改变"""
-        self.text_changed.emit(self.text_edit.toPlainText())
+        self.text_edited.emit()
+    
+    @pyqtSlot()
+    def on_cursor_position_changed(self):
+        """编辑光标位置改变"""
+        if self.follow_cursor_check.isChecked():
+            self.editor_cursor_moved.emit(self.text_edit.textCursor().position())
     
     @pyqtSlot()
     def on_start_pause(self):
@@ -506,6 +680,26 @@ class ControlPanel(QWidget):
         # 更新滚动一行时间显示
         self.update_scroll_time(value)
     
+    @pyqtSlot(int)
+    def on_frame_pacing_changed(self, index):
+        """帧节奏改变"""
+        self.frame_pacing_changed.emit(self.FRAME_PACING_MODES[index])
+    
+    @pyqtSlot(int)
+    def on_display_mode_changed(self, index):
+        """显示方式改变"""
+        self.display_mode_changed.emit(self.DISPLAY_MODES[index])
+    
+    @pyqtSlot(int)
+    def on_tiled_rendering_toggled(self, state):
+        """分块缓存渲染开关切换"""
+        self.tiled_rendering_changed.emit(state == Qt.Checked)
+    
+    def update_frame_stats(self, stats):
+        """更新滚动帧率和掉帧统计"""
+        self.frame_stats_label.setText(
+            f"帧率: {stats['fps']:.1f} / {stats['target_fps']:.0f} fps，掉帧: {stats['dropped_frames']}")
+    
     def update_scroll_time(self, speed_value, line_height=None):
         """
         更新滚动一行所需时间显示
@@ -555,13 +749,26 @@ class ControlPanel(QWidget):
         # 这个功能将通过连接到文本处理器来实现
         pass
     
+    @pyqtSlot()
+    def on_seek_time(self):
+        """按时间跳转"""
+        self.seek_time_requested.emit(self.seek_time_edit.text())
+    
+    @staticmethod
+    def set_color_swatch(label, background_color, text_color):
+        """用调色板设置颜色示例标签的颜色，不使用样式表，不会触发样式重新计算"""
+        palette = label.palette()
+        palette.setColor(QPalette.Window, background_color)
+        palette.setColor(QPalette.WindowText, text_color)
+        label.setPalette(palette)
+    
     @pyqtSlot()
     def on_bg_color_clicked(self):
         """选择背景色"""
         color = QColorDialog.getColor(QColor(0, 0, 0), self, "选择背景色")
         if color.isValid():
             self.bg_color_display.setText(color.name())
-            self.bg_color_display.setStyleSheet(f"background-color: {color.name()}; color: white; border: 1px solid gray;")
+            self.set_color_swatch(self.bg_color_display, color, QColor(255, 255, 255))
             self.background_color_changed.emit(color)
     
     @pyqtSlot()
@@ -570,9 +777,48 @@ class ControlPanel(QWidget):
         color = QColorDialog.getColor(QColor(255, 255, 255), self, "选择文本色")
         if color.isValid():
             self.text_color_display.setText(color.name())
-            self.text_color_display.setStyleSheet(f"background-color: {color.name()}; color: black; border: 1px solid gray;")
+            self.set_color_swatch(self.text_color_display, color, QColor(0, 0, 0))
             self.text_color_changed.emit(color)
     
+    def on_apply_preset(self):
+        """切换到选中的外观预设"""
+        name = self.preset_combo.currentText().strip()
+        if name:
+            self.apply_preset.emit(name)
+    
+    def on_save_preset(self):
+        """把当前外观保存为输入的预设名称"""
+        name = self.preset_combo.currentText().strip()
+        if name:
+            self.save_preset.emit(name)
+    
+    def on_delete_preset(self):
+        """删除选中的外观预设"""
+        name = self.preset_combo.currentText().strip()
+        if name:
+            self.delete_preset.emit(name)
+    
+    def set_preset_names(self, names, current=None):
+        """
+        更新外观预设列表
+        
+        Args:
+            names: 预设名称列表
+            current: 当前使用的预设名称
+        """
+        self.preset_combo.blockSignals(True)
+        self.preset_combo.clear()
+        self.preset_combo.addItems(names)
+        if current in names:
+            self.preset_combo.setCurrentIndex(names.index(current))
+        else:
+            self.preset_combo.setEditText("")
+        self.preset_combo.blockSignals(False)
+    
+    def update_preset_time(self, elapsed_ms):
+        """显示最近一次切换外观预设的用时"""
+        self.preset_time_label.setText(f"切换用时: {elapsed_ms:.1f} ms")
+    
     @pyqtSlot(int)
     def on_secondary_screen_toggled(self, state):
         """副屏开关切换"""
@@ -588,6 +834,18 @@ class ControlPanel(QWidget):
         """主窗口置顶切换"""
         self.toggle_main_window_topmost.emit(state == Qt.Checked)
     
+    @pyqtSlot()
+    def on_main_transform_changed(self):
+        """主窗口镜像或旋转改变"""
+        self.main_window_transform_changed.emit(
+            self.main_mirror_check.isChecked(), self.main_rotation_combo.currentIndex() * 180)
+    
+    @pyqtSlot()
+    def on_secondary_transform_changed(self):
+        """副屏镜像或旋转改变"""
+        self.secondary_window_transform_changed.emit(
+            self.secondary_mirror_check.isChecked(), self.secondary_rotation_combo.currentIndex() * 180)
+    
     @pyqtSlot(int)
     def on_main_window_width_changed(self, width):
         """主窗口宽度改变"""
@@ -660,6 +918,26 @@ class ControlPanel(QWidget):
         self.overall_progress.setRange(0, total_paragraphs - 1)
         self.overall_progress.setValue(current_index)
     
+    def update_time_info(self, elapsed, total, remaining, progress):
+        """
+        更新演出时间信息
+        
+        Args:
+            elapsed: 已播时间（秒）
+            total: 总时长（秒）
+            remaining: 剩余时间（秒）
+            progress: 按时间计算的整体进度（0.0 - 1.0）
+        """
+        self.time_info_label.setText(
+            f"已播 {self.format_time(elapsed)} / 共 {self.format_time(total)}，剩余 {self.format_time(remaining)}")
+        self.time_progress.setValue(int(progress * self.time_progress.maximum()))
+    
+    @staticmethod
+    def format_time(seconds):
+        """把秒数格式化为时:分:秒"""
+        seconds = int(seconds)
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    
     def update_paragraph_progress(self, progress):
         """更新段落内进度"""
         self.paragraph_progress.setValue(int(progress * 100))
@@ -673,6 +951,17 @@ class ControlPanel(QWidget):
         self.speed_slider.setValue(slider_value)
         self.speed_value.setText(str(slider_value))
         
+        # 帧节奏
+        frame_pacing = config.get("frame_pacing", "refresh")
+        if frame_pacing in self.FRAME_PACING_MODES:
+            self.frame_pacing_combo.setCurrentIndex(self.FRAME_PACING_MODES.index(frame_pacing))
+        
+        # 显示方式
+        display_mode = config.get("display_mode", "paragraph")
+        if display_mode in self.DISPLAY_MODES:
+            self.display_mode_combo.setCurrentIndex(self.DISPLAY_MODES.index(display_mode))
+        self.tiled_rendering_check.setChecked(config.get("tiled_rendering", False))
+        
         # 段落停留时间
         paragraph_duration = config.get("paragraph_duration", 10)
         self.duration_spinbox.setValue(paragraph_duration)
@@ -681,10 +970,32 @@ class ControlPanel(QWidget):
         paragraph_time_control_mode = config.get("paragraph_time_control_mode", "global")
         self.time_control_mode_combo.setCurrentIndex(0 if paragraph_time_control_mode == "global" else 1)
         
+        # 外观：字体、颜色、窗口大小位置、置顶和输出变换
+        self.update_look_from_config(config)
+        
+        # 副屏启用状态 - 固定默认为False，不读取配置
+        self.secondary_screen_check.setChecked(False)
+        
+        # 外观预设
+        self.set_preset_names(sorted(config.get("presets", {})), config.get("current_preset"))
+    
+    def update_look_from_config(self, config):
+        """从配置更新外观预设包含的UI状态"""
+        # 这些控件在延迟创建的标签页中
+        self.build_deferred_tabs()
+        
         # 字体大小
         font_size = config.get("font_size", 36)
         self.font_size_spinbox.setValue(font_size)
         
+        # 颜色示例
+        background_color = config.get("background_color", "#000000")
+        self.bg_color_display.setText(background_color)
+        self.set_color_swatch(self.bg_color_display, QColor(background_color), QColor(255, 255, 255))
+        text_color = config.get("text_color", "#ffffff")
+        self.text_color_display.setText(text_color)
+        self.set_color_swatch(self.text_color_display, QColor(text_color), QColor(0, 0, 0))
+        
         # 窗口大小和位置
         main_window = config.get("main_window", {"width": 800, "height": 600, "x": 100, "y": 100})
         self.main_width_spinbox.setValue(main_window["width"])
@@ -701,12 +1012,17 @@ class ControlPanel(QWidget):
         self.main_topmost_check.setChecked(config.get("main_window_topmost", False))
         self.secondary_topmost_check.setChecked(config.get("secondary_screen_topmost", False))
         
-        # 副屏启用状态 - 固定默认为False，不读取配置
-        self.secondary_screen_check.setChecked(False)
+        # 输出镜像和旋转
+        self.main_mirror_check.setChecked(config.get("main_window_mirrored", False))
+        self.main_rotation_combo.setCurrentIndex(1 if config.get("main_window_rotation", 0) == 180 else 0)
+        self.secondary_mirror_check.setChecked(config.get("secondary_screen_mirrored", False))
+        self.secondary_rotation_combo.setCurrentIndex(1 if config.get("secondary_screen_rotation", 0) == 180 else 0)
     
     def show_help(self):
-        """显示帮助对话框"""
-        self.help_dialog = HelpDialog(self)
+        """显示帮助对话框：第一次打开时才导入并创建"""
+        if self.help_dialog is None:
+            from help_dialog import HelpDialog
+            self.help_dialog = HelpDialog(self)
         self.help_dialog.exec_()
     
     def on_save_config(self):
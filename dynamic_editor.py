@@ -1,4 +1,4 @@
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QObject, QTimer, QElapsedTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QTextEdit
 
 class DynamicEditor(QObject):
@@ -11,6 +11,8 @@ class DynamicEditor(QObject):
     text_changed = pyqtSignal(str)  # 文本内容改变信号
     scroll_position_saved = pyqtSignal(object)  # 滚动位置保存信号
     scroll_position_restored = pyqtSignal(object)  # 滚动位置恢复信号
+    text_update_requested = pyqtSignal()  # 合并后的文本更新请求
+    latency_measured = pyqtSignal(float)  # 编辑到显示的延迟（毫秒）
     
     def __init__(self):
         """初始化动态编辑器"""
@@ -22,6 +24,22 @@ class DynamicEditor(QObject):
         self.is_editing = False  # 是否正在编辑
         self.last_known_scroll_positions = {}  # 保存最后已知的滚动位置
         
+        # 编辑合并相关属性：一个时间窗口内的连续编辑只触发一次文本更新
+        self.coalesce_interval = 16  # 合并时间窗口（毫秒），默认约一帧
+        self.debounce = False  # False: 每个窗口最多更新一次；True: 停止输入一个窗口后才更新
+        self.coalesce_timer = QTimer(self)
+        self.coalesce_timer.setSingleShot(True)
+        self.coalesce_timer.timeout.connect(self.flush_text_change)
+        self.latency_clock = QElapsedTimer()
+        self.latency_clock.start()
+        self.pending_since = None  # 当前未处理编辑中第一次编辑的时间
+        self.pending_edits = 0  # 当前未处理的编辑次数
+        self.last_latency = 0.0  # 最近一次编辑到显示的延迟（毫秒）
+        self.max_latency = 0.0  # 最大延迟（毫秒）
+        self.total_latency = 0.0  # 累计延迟，用于计算平均值
+        self.update_count = 0  # 实际执行的文本更新次数
+        self.edit_count = 0  # 收到的编辑次数
+        
     def set_current_paragraph(self, index):
         """设置当前段落索引"""
         self.current_paragraph_index = index
@@ -31,15 +49,15 @@ class DynamicEditor(QObject):
         保存指定窗口的滚动位置
         
         Args:
-            window: 窗口对象，包含text_browser属性
+            window: 窗口对象，包含text_display属性
         """
-        if hasattr(window, 'text_browser') and hasattr(window, 'scroll_position'):
+        if hasattr(window, 'text_display') and hasattr(window, 'scroll_position'):
             # 保存滚动条位置和自定义滚动位置
-            scroll_bar_value = window.text_browser.verticalScrollBar().value()
+            scroll_bar_value = window.text_display.verticalScrollBar().value()
             scroll_position = window.scroll_position
             
             # 计算滚动百分比（相对于文本总高度）
-            scroll_bar = window.text_browser.verticalScrollBar()
+            scroll_bar = window.text_display.verticalScrollBar()
             max_value = scroll_bar.maximum()
             scroll_percentage = scroll_bar_value / max_value if max_value > 0 else 0
             
@@ -65,7 +83,7 @@ class DynamicEditor(QObject):
         恢复指定窗口的滚动位置
         
         Args:
-            window: 窗口对象，包含text_browser属性
+            window: 窗口对象，包含text_display属性
             is_paragraph_switch: 是否是段落切换
         """
         # 如果是段落切换，不恢复滚动位置（让自动跳转逻辑处理）
@@ -85,7 +103,7 @@ class DynamicEditor(QObject):
         
         try:
             # 计算新的滚动条位置（基于滚动百分比）
-            scroll_bar = window.text_browser.verticalScrollBar()
+            scroll_bar = window.text_display.verticalScrollBar()
             new_max_value = scroll_bar.maximum()
             
             if new_max_value > 0:
@@ -111,6 +129,68 @@ class DynamicEditor(QObject):
         
         return False
     
+    def set_coalesce_interval(self, interval, debounce=False):
+        """
+        设置编辑合并方式
+        
+        Args:
+            interval: 合并时间窗口（毫秒）
+            debounce: 是否在停止输入一个窗口后才更新
+        """
+        self.coalesce_interval = max(0, interval)
+        self.debounce = debounce
+    
+    @pyqtSlot()
+    def schedule_text_change(self):
+        """记录一次编辑，同一时间窗口内的连续编辑合并为一次文本更新"""
+        if self.pending_since is None:
+            self.pending_since = self.latency_clock.nsecsElapsed()
+        self.pending_edits += 1
+        self.edit_count += 1
+        if self.debounce or not self.coalesce_timer.isActive():
+            self.coalesce_timer.start(self.coalesce_interval)
+    
+    def cancel_pending_text_change(self):
+        """取消尚未处理的文本更新（文本已经通过其他途径更新时使用）"""
+        self.coalesce_timer.stop()
+        self.pending_since = None
+        self.pending_edits = 0
+    
+    @pyqtSlot()
+    def flush_text_change(self):
+        """立即处理合并后的文本更新"""
+        self.coalesce_timer.stop()
+        if self.pending_since is not None:
+            self.text_update_requested.emit()
+    
+    def mark_displayed(self):
+        """文本更新已显示，记录从第一次编辑到显示的延迟"""
+        if self.pending_since is None:
+            return
+        self.last_latency = (self.latency_clock.nsecsElapsed() - self.pending_since) / 1e6
+        self.max_latency = max(self.max_latency, self.last_latency)
+        self.total_latency += self.last_latency
+        self.update_count += 1
+        self.pending_since = None
+        self.pending_edits = 0
+        self.latency_measured.emit(self.last_latency)
+    
+    def get_latency_stats(self):
+        """
+        获取编辑到显示的延迟统计
+        
+        Returns:
+            包含最近、平均、最大延迟（毫秒）以及编辑和更新次数的字典
+        """
+        average = self.total_latency / self.update_count if self.update_count else 0.0
+        return {
+            'last_latency': self.last_latency,
+            'average_latency': average,
+            'max_latency': self.max_latency,
+            'edit_count': self.edit_count,
+            'update_count': self.update_count
+        }
+    
     @pyqtSlot(str)
     def on_text_changed(self, text, is_dynamic_edit=True):
         """
@@ -0,0 +1,157 @@
+from PyQt5.QtCore import QObject, QEvent, QElapsedTimer, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QGuiApplication
+
+class FrameClock(QObject):
+    """
+    滚动帧时钟，按显示器刷新节奏驱动每一帧
+    
+    支持三种节奏：
+        "update_request"：使用QWindow.requestUpdate()，由窗口系统在适合绘制下一帧时通知
+        "refresh"：按窗口所在显示器的刷新间隔定时
+        "fixed"：固定30毫秒间隔（原有方式）
+    每一帧的时间差都由QElapsedTimer计算，同时统计实际帧率和掉帧数。
+    """
+    
+    # 定义信号
+    frame = pyqtSignal(float)  # 新的一帧：距上一帧的时间（秒）
+    
+    MODES = ("update_request", "refresh", "fixed")
+    FIXED_INTERVAL = 30  # fixed模式的帧间隔（毫秒）
+    
+    def __init__(self, widget, mode="refresh"):
+        """
+        Args:
+            widget: 需要按刷新节奏绘制的窗口部件
+            mode: 帧节奏，见MODES
+        """
+        super().__init__(widget)
+        self.widget = widget
+        self.mode = mode if mode in self.MODES else "refresh"
+        self.is_active = False
+        self._window = None  # 安装了事件过滤器的QWindow
+        
+        self.clock = QElapsedTimer()
+        self.last_frame_ns = 0
+        self.interval_ns = 0  # 预期的帧间隔（纳秒），开始时按显示器刷新率确定
+        self.next_frame_ns = 0  # 定时模式下一帧的计划时间
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        
+        # 帧统计
+        self.frame_count = 0  # 累计帧数
+        self.dropped_frames = 0  # 累计掉帧数：帧间隔超过预期间隔1.5倍时计入缺少的帧
+        self.fps = 0.0  # 最近一秒的实际帧率
+        self._fps_frames = 0
+        self._fps_start_ns = 0
+    
+    def set_mode(self, mode):
+        """设置帧节奏，运行中会立即切换"""
+        if mode not in self.MODES or mode == self.mode:
+            return
+        was_active = self.is_active
+        self.stop()
+        self.mode = mode
+        if was_active:
+            self.start()
+    
+    def frame_interval(self):
+        """获取预期的帧间隔（毫秒）"""
+        if self.mode == "fixed":
+            return self.FIXED_INTERVAL
+        screen = self.widget.screen() if hasattr(self.widget, 'screen') else None
+        if screen is None:
+            screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        return 1000.0 / refresh_rate if refresh_rate > 0 else 1000.0 / 60
+    
+    def start(self):
+        """开始按帧节奏发出frame信号"""
+        if self.is_active:
+            return
+        self.is_active = True
+        self.clock.start()
+        self.last_frame_ns = 0
+        self.interval_ns = int(self.frame_interval() * 1e6)
+        self.next_frame_ns = 0
+        self._fps_frames = 0
+        self._fps_start_ns = 0
+        
+        if self.mode == "update_request" and self._attach_window():
+            self._window.requestUpdate()
+        else:
+            self._schedule_next_frame(0)
+    
+    def stop(self):
+        """停止发出frame信号"""
+        self.is_active = False
+        self.timer.stop()
+        if self._window is not None:
+            self._window.removeEventFilter(self)
+            self._window = None
+    
+    def _attach_window(self):
+        """在窗口的QWindow上安装事件过滤器以接收UpdateRequest，窗口尚未创建时返回False"""
+        window = self.widget.window().windowHandle()
+        if window is None:
+            return False
+        if window is not self._window:
+            if self._window is not None:
+                self._window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._window = window
+        return True
+    
+    def eventFilter(self, obj, event):
+        if obj is self._window and event.type() == QEvent.UpdateRequest and self.is_active:
+            self._tick()
+            # 请求下一帧；事件继续交给窗口处理，以完成本帧的绘制
+            if self.is_active and self._window is not None:
+                self._window.requestUpdate()
+        return False
+    
+    def _schedule_next_frame(self, now_ns):
+        """
+        定时模式：按固定的帧间隔网格安排下一帧，而不是从本帧开始再等一个间隔，
+        这样非整数毫秒的刷新间隔（如16.67毫秒）不会因取整而偏离刷新率；落后时跳到下一个网格点
+        """
+        self.next_frame_ns += self.interval_ns
+        if self.next_frame_ns <= now_ns:
+            self.next_frame_ns = now_ns + self.interval_ns - (now_ns - self.next_frame_ns) % self.interval_ns
+        self.timer.start(max(0, round((self.next_frame_ns - now_ns) / 1e6)))
+    
+    def _tick(self):
+        """计算距上一帧的时间，更新统计并发出frame信号"""
+        now_ns = self.clock.nsecsElapsed()
+        delta_ns = now_ns - self.last_frame_ns
+        self.last_frame_ns = now_ns
+        if self._window is None:
+            self._schedule_next_frame(now_ns)
+        
+        self.frame_count += 1
+        if delta_ns > self.interval_ns * 1.5:
+            self.dropped_frames += round(delta_ns / self.interval_ns) - 1
+        
+        self._fps_frames += 1
+        if now_ns - self._fps_start_ns >= 1e9:
+            self.fps = self._fps_frames * 1e9 / (now_ns - self._fps_start_ns)
+            self._fps_frames = 0
+            self._fps_start_ns = now_ns
+        
+        self.frame.emit(delta_ns / 1e9)
+    
+    def get_stats(self):
+        """
+        获取帧统计
+        
+        Returns:
+            包含帧节奏、预期帧率、实际帧率、累计帧数和掉帧数的字典
+        """
+        return {
+            'mode': self.mode,
+            'target_fps': 1000.0 / self.frame_interval(),
+            'fps': self.fps,
+            'frame_count': self.frame_count,
+            'dropped_frames': self.dropped_frames,
+        }
@@ -0,0 +1,233 @@
+from collections import OrderedDict
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QFontMetricsF, QTextLayout, QTextOption
+
+class TextLayoutEntry:
+    """一段文本在某个字体、行宽和设备像素比下的排版结果，以及按颜色绘制好的位图"""
+    
+    __slots__ = ('layout', 'height', 'pixmap', 'pixmap_colors')
+    
+    def __init__(self, layout, height):
+        self.layout = layout  # QTextLayout
+        self.height = height  # 排版后的文本高度（不含留白）
+        self.pixmap = None  # 绘制好的位图，由显示组件生成后保存在这里供其他输出复用
+        self.pixmap_colors = None  # 位图对应的(背景色, 文字色)
+
+class TileCache:
+    """
+    分块位图缓存，由所有输出窗口共享
+    
+    段落按固定高度切成水平条带，每个条带单独绘制成位图；滚动时只合成可见的条带。
+    总字节数超过上限时淘汰最久未使用（即最早离开视口）的条带，大字号长段落也不会占用过多内存。
+    """
+    
+    TILE_HEIGHT = 256  # 条带高度（逻辑像素）
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()  # (排版结果id, 条带索引, 颜色, 设备像素比) -> (排版结果, 位图)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, entry, index, colors, ratio, render):
+        """
+        获取条带位图，没有缓存时调用render(entry, index)绘制并加入缓存
+        
+        Args:
+            entry: 段落的排版结果（TextLayoutEntry）
+            index: 条带索引
+            colors: (背景色, 文字色)
+            ratio: 设备像素比
+            render: 绘制条带的函数
+        
+        Returns:
+            QPixmap
+        """
+        # 值中保存排版结果的引用，条带在缓存中时排版结果的id不会被复用
+        key = (id(entry), index, colors, ratio)
+        value = self.tiles.get(key)
+        if value is not None:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+            return value[1]
+        
+        self.misses += 1
+        pixmap = render(entry, index)
+        self.tiles[key] = (entry, pixmap)
+        self.bytes += pixmap.width() * pixmap.height() * 4
+        while self.bytes > self.max_bytes and len(self.tiles) > 1:
+            _, (_, evicted) = self.tiles.popitem(last=False)
+            self.bytes -= evicted.width() * evicted.height() * 4
+        return pixmap
+    
+    def clear(self):
+        """清空缓存"""
+        self.tiles.clear()
+        self.bytes = 0
+    
+    def get_stats(self):
+        """
+        获取缓存统计
+        
+        Returns:
+            包含命中次数、未命中次数、条带数和占用字节数的字典
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'tiles': len(self.tiles),
+            'bytes': self.bytes,
+        }
+
+class LayoutCache:
+    """
+    排版缓存，由所有输出窗口共享
+    
+    以(段落文本, 字体, 行宽, 设备像素比, 对齐方式)为键保存排版结果，同一段落在相同条件下只排版一次；
+    超过容量时淘汰最久未使用的条目。字体度量按字体（含字号）缓存，改变字号时不必重复计算。
+    条目中的整段位图与条带一样按总字节数限制，超过上限时释放最久未使用的位图，条目本身保留。
+    """
+    
+    def __init__(self, max_entries=8, max_pixmap_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_pixmap_bytes = max_pixmap_bytes
+        self.entries = OrderedDict()
+        self.pixmaps = OrderedDict()  # 排版结果id -> 带有整段位图的排版结果，按使用先后排列
+        self.pixmap_bytes = 0
+        self.metrics = {}  # 字体键 -> QFontMetricsF
+        self.tiles = TileCache()  # 分块位图
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text, font, width, ratio, alignment):
+        """生成缓存键"""
+        return (text, font.key(), width, ratio, int(alignment))
+    
+    def get(self, text, font, width, ratio, alignment):
+        """
+        获取排版结果，没有缓存时排版并加入缓存
+        
+        Args:
+            text: 段落文本
+            font: 字体
+            width: 行宽（像素）
+            ratio: 设备像素比
+            alignment: 水平对齐方式
+        
+        Returns:
+            TextLayoutEntry
+        """
+        key = self.make_key(text, font, width, ratio, alignment)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        
+        self.misses += 1
+        entry = self.build(text, font, width, alignment, self.font_metrics(font).leading())
+        self.entries[key] = entry
+        while len(self.entries) > self.max_entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.release_pixmap(evicted)
+        return entry
+    
+    def get_pixmap(self, entry, colors):
+        """
+        获取条目中按指定颜色绘制好的整段位图
+        
+        Args:
+            entry: 段落的排版结果（TextLayoutEntry）
+            colors: (背景色, 文字色)
+        
+        Returns:
+            QPixmap，没有位图或颜色不同时返回None
+        """
+        if entry.pixmap is None or entry.pixmap_colors != colors:
+            return None
+        self.pixmaps.move_to_end(id(entry))
+        return entry.pixmap
+    
+    def store_pixmap(self, entry, pixmap, colors):
+        """
+        把绘制好的整段位图保存到条目中，总字节数超过上限时释放最久未使用的位图
+        
+        Args:
+            entry: 段落的排版结果（TextLayoutEntry）
+            pixmap: 整段位图
+            colors: (背景色, 文字色)
+        """
+        self.release_pixmap(entry)
+        entry.pixmap = pixmap
+        entry.pixmap_colors = colors
+        self.pixmaps[id(entry)] = entry
+        self.pixmap_bytes += pixmap.width() * pixmap.height() * 4
+        while self.pixmap_bytes > self.max_pixmap_bytes and len(self.pixmaps) > 1:
+            _, evicted = self.pixmaps.popitem(last=False)
+            self.pixmap_bytes -= evicted.pixmap.width() * evicted.pixmap.height() * 4
+            evicted.pixmap = None
+            evicted.pixmap_colors = None
+    
+    def release_pixmap(self, entry):
+        """释放条目中的整段位图"""
+        if self.pixmaps.pop(id(entry), None) is not None:
+            self.pixmap_bytes -= entry.pixmap.width() * entry.pixmap.height() * 4
+        entry.pixmap = None
+        entry.pixmap_colors = None
+    
+    def font_metrics(self, font):
+        """获取字体度量，按字体（含字号）缓存"""
+        key = font.key()
+        metrics = self.metrics.get(key)
+        if metrics is None:
+            metrics = self.metrics[key] = QFontMetricsF(font)
+        return metrics
+    
+    @staticmethod
+    def build(text, font, width, alignment, leading):
+        """按行宽排版文本，行与行之间加上字体的行间距leading"""
+        # QTextLayout只处理一个段落，换行符转换为行分隔符
+        layout = QTextLayout(text.replace('\n', '\u2028'), font)
+        option = QTextOption(alignment)
+        option.setWrapMode(QTextOption.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(option)
+        layout.setCacheEnabled(True)
+        
+        height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            height += leading
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+        return TextLayoutEntry(layout, height)
+    
+    def clear(self):
+        """清空缓存"""
+        for entry in list(self.pixmaps.values()):
+            self.release_pixmap(entry)
+        self.entries.clear()
+        self.tiles.clear()
+    
+    def get_stats(self):
+        """
+        获取缓存统计
+        
+        Returns:
+            包含命中次数、未命中次数、命中率、条目数、整段位图占用字节数和分块位图统计的字典
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(self.entries),
+            'pixmap_bytes': self.pixmap_bytes,
+            'tiles': self.tiles.get_stats(),
+        }
@@ -1,69 +1,150 @@
 import sys
 import os
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget
-from PyQt5.QtCore import Qt, QObject, pyqtSignal, pyqtSlot
-from PyQt5.QtGui import QIcon, QColor
+from PyQt5.QtCore import Qt, QObject, QElapsedTimer, QEvent, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QIcon, QColor, QFont
 
 # 导入各个模块
 from main_window import MainDisplayWindow
 from control_panel import ControlPanel
-from secondary_screen import SecondaryScreenWindow
 from text_processor import TextProcessor
 from config_manager import ConfigManager
 from dynamic_editor import DynamicEditor
+from parse_cache import ParseCache
+from frame_clock import FrameClock
+from layout_cache import LayoutCache
+from text_display import TextDisplay
+from settings import Settings
 
 class MainApp(QObject):
     """主应用程序类，管理所有窗口和组件"""
     
+    CHECKPOINT_GLIDE = 0.5  # 连续模式下段落切换偏差修正的时间常数（秒）
+    
     def __init__(self):
         super().__init__()
         
+        # 启动计时：从开始构造（创建QApplication之前）计时，记录各阶段的用时（毫秒）
+        self.startup_clock = QElapsedTimer()
+        self.startup_clock.start()
+        self.startup_stats = {}
+        
         # 初始化应用程序
         self.app = QApplication(sys.argv)
         self.app.setApplicationName("提词器")
         self.app.setApplicationVersion("1.72")
         self.app.setOrganizationName("光脉科技")
         self.app.setOrganizationDomain("hngmjt.com")
+        self.startup_stats["app_created_ms"] = self.startup_clock.nsecsElapsed() / 1e6
         
         # 初始化配置管理器
         self.config_manager = ConfigManager()
+        self.startup_stats["config_load_ms"] = self.startup_clock.nsecsElapsed() / 1e6
         
-        # 初始化各个组件
+        # 初始化各个组件；副屏默认隐藏，第一次启用时才创建（见ensure_secondary_screen）
         self.main_window = MainDisplayWindow()
         self.control_panel = ControlPanel()
-        self.secondary_screen = SecondaryScreenWindow()
+        self.secondary_screen = None
         self.text_processor = TextProcessor()
         self.dynamic_editor = DynamicEditor()
         
-        # 应用程序设置
-        self.settings = {
-            "scroll_speed": self.config_manager.get("scroll_speed"),
-            "font_size": self.config_manager.get("font_size"),
-            "background_color": self.config_manager.get("background_color"),
-            "text_color": self.config_manager.get("text_color"),
-            "paragraph_duration": self.config_manager.get("paragraph_duration"),
-            "secondary_screen_enabled": False,  # 固定默认为False，不读取配置
-            "secondary_screen_topmost": self.config_manager.get("secondary_screen_topmost"),
-            "main_window_topmost": self.config_manager.get("main_window_topmost")
-        }
-        
-        # 应用配置到文本处理器
-        self.text_processor.set_paragraph_duration(self.settings["paragraph_duration"])
-        self.text_processor.set_time_control_mode(self.config_manager.get("paragraph_time_control_mode"))
-        
-        # 应用配置到窗口
+        # 解析缓存：再次打开同一个脚本时跳过解析
+        self.parse_cache = ParseCache()
+        self.text_processor.parse_cache = self.parse_cache
+        
+        # 排版缓存：主窗口和第二屏幕共享，同一段落在相同字体、宽度下只排版一次；
+        # 容量需要容纳连续模式下视口附近的全部段落
+        self.layout_cache = LayoutCache(max_entries=16)
+        self.main_window.text_display.set_layout_cache(self.layout_cache)
+        
+        # 预排版：显示一段后，在空闲时排版并绘制前后相邻的段落，段落切换时直接使用缓存结果
+        self.prelayout_queue = []  # 等待预排版的段落索引
+        self.prelayout_timer = QTimer(self)
+        self.prelayout_timer.setSingleShot(True)
+        self.prelayout_timer.setInterval(0)
+        self.prelayout_timer.timeout.connect(self.prelayout_next)
+        
+        # 主窗口大小调整：拖动期间只记录大小，停止改变后再同步副屏、写入配置和更新控制面板
+        self.pending_main_window_size = None
+        self.resize_settle_timer = QTimer(self)
+        self.resize_settle_timer.setSingleShot(True)
+        self.resize_settle_timer.setInterval(TextDisplay.RELAYOUT_DELAY)
+        self.resize_settle_timer.timeout.connect(self.apply_main_window_size)
+        
+        # 渲染调度：标记需要刷新的部分，每轮事件循环只刷新一次
+        self.dirty_parts = set()  # "text"文本、"scroll"滚动位置复位、"style"样式、"panel"控制面板
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(0)
+        self.render_timer.timeout.connect(self.flush_render)
+        self.rendered_paragraph_index = None  # 上次显示的段落索引
+        self.rendered_text = None  # 上次显示的段落文本
+        self.render_stats = {"requested": 0, "flushed": 0, "avoided": 0}
+        self.preset_stats = {"switches": 0, "last_ms": 0.0, "max_ms": 0.0}  # 外观预设切换用时
+        
+        # 滚动主时钟：每帧只计算一次滚动位置，所有输出窗口按同一位置绘制
+        self.scroll_position = 0.0  # 当前段落的滚动位置（像素），连续模式下相对于当前段落的顶端
+        self.checkpoint_error = 0.0  # 连续模式：段落切换时滚动位置与新段落开头的偏差，在后续几帧内逐渐修正
+        self.is_scrolling = False
+        self.scroll_clock = FrameClock(self.main_window)
+        self.scroll_clock.frame.connect(self.on_scroll_frame)
+        
+        # 播放时每秒刷新一次控制面板上的演出时间和滚动帧率
+        self.time_info_timer = QTimer(self)
+        self.time_info_timer.setInterval(1000)
+        self.time_info_timer.timeout.connect(self.update_time_info)
+        self.time_info_timer.timeout.connect(self.update_frame_stats)
+        
+        # 应用程序设置：类型固定的设置对象，窗口按设置项的改变信号更新
+        self.settings = Settings(self.config_manager.default_config)
+        self.settings.load(self.config_manager)
+        self.connect_settings()
+        
+        # 应用配置到窗口：先设置窗口位置和大小，其他设置作为一个批次通知一次，
+        # 由connect_settings()中的订阅应用到各窗口
         self.apply_config_to_windows()
+        self.settings.notify_all()
         
-        # 更新控制面板UI
+        # 更新控制面板UI和恢复上次打开的文件推迟到主窗口第一次绘制之后（见on_first_frame）
+        self.first_frame_done = False
+        self.main_window.text_display.installEventFilter(self)
+        self.startup_stats["construct_ms"] = self.startup_clock.nsecsElapsed() / 1e6
+    
+    def eventFilter(self, obj, event):
+        """主窗口第一次绘制后安排启动的后续工作"""
+        if event.type() == QEvent.Paint and obj is self.main_window.text_display:
+            obj.removeEventFilter(self)
+            self.startup_stats["first_frame_ms"] = self.startup_clock.nsecsElapsed() / 1e6
+            # 等这一帧绘制完成后再继续
+            QTimer.singleShot(0, self.on_first_frame)
+        return False
+    
+    def on_first_frame(self):
+        """首帧显示后：创建其余标签页、更新控制面板并恢复上次打开的文件"""
+        if self.first_frame_done:
+            return
+        self.first_frame_done = True
+        self.main_window.text_display.removeEventFilter(self)
+        
+        # 更新控制面板UI：此时信号已经连接，阻塞控制面板的信号，
+        # 填入配置值时不会再次设置滚动速度或写入配置
+        self.control_panel.build_deferred_tabs()
+        self.control_panel.blockSignals(True)
         self.control_panel.update_from_config(self.config_manager.config)
+        self.control_panel.blockSignals(False)
         
         # 自动恢复上次打开的文件
         last_opened_file = self.config_manager.get("last_opened_file")
         if last_opened_file and os.path.exists(last_opened_file):
             self.open_file(last_opened_file)
+        self.startup_stats["restore_ms"] = self.startup_clock.nsecsElapsed() / 1e6
+    
+    def get_startup_stats(self):
+        """获取启动用时（毫秒，从MainApp开始构造时计时）：创建QApplication、配置加载、构造完成、首帧、恢复上次文件"""
+        return dict(self.startup_stats)
     
     def apply_config_to_windows(self):
-        """应用配置到窗口"""
+        """应用窗口位置和大小配置"""
         # 应用主窗口配置
         main_win_config = self.config_manager.get("main_window")
         self.main_window.setGeometry(
@@ -74,6 +155,8 @@ class MainApp(QObject):
         )
         
         # 应用副屏配置 - 副屏使用主窗口的宽度和高度
+        if self.secondary_screen is None:
+            return
         secondary_win_config = self.config_manager.get("secondary_window")
         self.secondary_screen.setGeometry(
             secondary_win_config["x"],
@@ -81,21 +164,78 @@ class MainApp(QObject):
             main_win_config["width"],  # 副屏使用主窗口宽度
             main_win_config["height"]  # 副屏使用主窗口高度
         )
+    
+    def connect_settings(self):
+        """订阅设置项的改变：每个窗口只订阅一次，一批修改只更新一次"""
+        signals = self.settings.signals
+        signals.scroll_speed_changed.connect(self.main_window.set_scroll_speed)
+        signals.frame_pacing_changed.connect(self.scroll_clock.set_mode)
+        signals.main_window_topmost_changed.connect(self.main_window.set_topmost)
+        signals.paragraph_duration_changed.connect(self.text_processor.set_paragraph_duration)
+        signals.paragraph_time_control_mode_changed.connect(self.text_processor.set_time_control_mode)
+        signals.tiled_rendering_changed.connect(self.main_window.text_display.set_tiled)
+        signals.changed.connect(self.on_settings_changed)
+    
+    def ensure_secondary_screen(self):
+        """
+        获取副屏窗口，第一次调用时创建并按当前设置初始化
+        
+        Returns:
+            SecondaryScreenWindow
+        """
+        if self.secondary_screen is not None:
+            return self.secondary_screen
+        from secondary_screen import SecondaryScreenWindow
+        window = self.secondary_screen = SecondaryScreenWindow()
+        display = window.text_display
+        display.set_layout_cache(self.layout_cache)
+        self.apply_config_to_windows()
         
-        # 应用其他配置
-        self.main_window.set_scroll_speed(self.settings["scroll_speed"])
-        self.main_window.set_font_size(self.settings["font_size"])
-        self.main_window.set_background_color(QColor(self.settings["background_color"]))
-        self.main_window.set_text_color(QColor(self.settings["text_color"]))
-        
-        self.secondary_screen.set_scroll_speed(self.settings["scroll_speed"])
-        self.secondary_screen.set_font_size(self.settings["font_size"])
-        self.secondary_screen.set_background_color(QColor(self.settings["background_color"]))
-        self.secondary_screen.set_text_color(QColor(self.settings["text_color"]))
-        
-        # 应用置顶设置
-        self.main_window.set_topmost(self.settings["main_window_topmost"])
-        self.secondary_screen.set_topmost(self.settings["secondary_screen_topmost"])
+        # 按当前设置初始化，之后订阅设置项的改变
+        window.set_scroll_speed(self.settings.scroll_speed)
+        window.set_topmost(self.settings.secondary_screen_topmost)
+        window.set_output_transform(self.settings.secondary_screen_mirrored,
+                                    self.settings.secondary_screen_rotation)
+        display.set_tiled(self.settings.tiled_rendering)
+        self.apply_style(window)
+        if self.settings.display_mode == "continuous":
+            display.set_paragraphs(self.text_processor.paragraphs)
+        signals = self.settings.signals
+        signals.scroll_speed_changed.connect(window.set_scroll_speed)
+        signals.secondary_screen_topmost_changed.connect(window.set_topmost)
+        signals.tiled_rendering_changed.connect(display.set_tiled)
+        
+        # 连续模式下按增量信号更新段落高度
+        self.text_processor.paragraph_changed.connect(display.update_paragraph)
+        self.text_processor.paragraphs_inserted.connect(display.insert_paragraphs)
+        self.text_processor.paragraphs_removed.connect(display.remove_paragraphs)
+        
+        window.window_moved_signal.connect(self.on_secondary_window_moved)
+        return window
+    
+    def output_windows(self):
+        """获取已创建的输出窗口"""
+        if self.secondary_screen is None:
+            return (self.main_window,)
+        return (self.main_window, self.secondary_screen)
+    
+    def on_settings_changed(self, names):
+        """
+        一批设置修改完成：按最终的值更新需要多个设置项的部分
+        
+        Args:
+            names: 改变的设置项名称集合
+        """
+        if names & {"font_size", "background_color", "text_color"}:
+            self.mark_dirty("style")
+        if "display_mode" in names:
+            self.apply_display_mode()
+        if names & {"main_window_mirrored", "main_window_rotation"}:
+            self.main_window.set_output_transform(self.settings.main_window_mirrored,
+                                                  self.settings.main_window_rotation)
+        if self.secondary_screen is not None and names & {"secondary_screen_mirrored", "secondary_screen_rotation"}:
+            self.secondary_screen.set_output_transform(self.settings.secondary_screen_mirrored,
+                                                       self.settings.secondary_screen_rotation)
     
     def initialize_components(self):
         """初始化所有组件"""
@@ -103,14 +243,17 @@ class MainApp(QObject):
         self.setup_connections()
         
         # 初始化显示内容
-        self.update_display()
+        self.mark_dirty("text", "scroll", "panel")
     
     def setup_connections(self):
         """建立组件之间的信号连接"""
         # 控制面板信号连接
         
         # 动态编辑信号连接到DynamicEditor
-        self.control_panel.text_changed.connect(self.on_dynamic_text_changed)
+        self.control_panel.contents_changed.connect(self.text_processor.note_contents_change)
+        self.control_panel.text_edited.connect(self.dynamic_editor.schedule_text_change)
+        self.dynamic_editor.text_update_requested.connect(self.on_text_update_requested)
+        self.control_panel.editor_cursor_moved.connect(self.on_editor_cursor_moved)
         self.control_panel.open_file.connect(self.open_file)
         self.control_panel.save_file.connect(self.save_file)
         self.control_panel.save_as_file.connect(self.save_file)
@@ -121,6 +264,9 @@ class MainApp(QObject):
         self.control_panel.pause_scroll.connect(self.pause_scroll)
         self.control_panel.reset_scroll.connect(self.reset_scroll)
         self.control_panel.scroll_speed_changed.connect(self.set_scroll_speed)
+        self.control_panel.frame_pacing_changed.connect(self.set_frame_pacing)
+        self.control_panel.display_mode_changed.connect(self.set_display_mode)
+        self.control_panel.tiled_rendering_changed.connect(self.set_tiled_rendering)
         
         # 样式控制
         self.control_panel.font_size_changed.connect(self.set_font_size)
@@ -128,14 +274,20 @@ class MainApp(QObject):
         self.control_panel.text_color_changed.connect(self.set_text_color)
         
         # 段落停留时间信号
-        self.control_panel.paragraph_duration_changed.connect(self.text_processor.set_paragraph_duration)
+        self.control_panel.paragraph_duration_changed.connect(self.set_paragraph_duration)
         # 段落时间控制方式信号
-        self.control_panel.paragraph_time_control_mode_changed.connect(self.text_processor.set_time_control_mode)
+        self.control_panel.paragraph_time_control_mode_changed.connect(self.set_paragraph_time_control_mode)
+        # 时间轴相关信号
+        self.control_panel.paragraph_duration_changed.connect(self.update_time_info)
+        self.control_panel.paragraph_time_control_mode_changed.connect(self.update_time_info)
+        self.control_panel.seek_time_requested.connect(self.seek_to_time)
         
         # 屏幕控制
         self.control_panel.toggle_secondary_screen.connect(self.toggle_secondary_screen)
         self.control_panel.toggle_main_window_topmost.connect(self.set_main_window_topmost)
         self.control_panel.toggle_secondary_window_topmost.connect(self.set_secondary_window_topmost)
+        self.control_panel.main_window_transform_changed.connect(self.set_main_window_transform)
+        self.control_panel.secondary_window_transform_changed.connect(self.set_secondary_window_transform)
         self.control_panel.main_window_width_changed.connect(self.set_main_window_width)
         self.control_panel.main_window_height_changed.connect(self.set_main_window_height)
         self.control_panel.main_window_x_changed.connect(self.set_main_window_x)
@@ -146,11 +298,21 @@ class MainApp(QObject):
         # 配置控制信号
         self.control_panel.save_config.connect(self.on_save_config)
         self.control_panel.reset_config.connect(self.on_reset_config)
+        self.control_panel.apply_preset.connect(self.apply_preset)
+        self.control_panel.save_preset.connect(self.save_preset)
+        self.control_panel.delete_preset.connect(self.delete_preset)
         
         # 文本处理器信号连接
         self.text_processor.current_paragraph_changed.connect(self.on_paragraph_changed)
-        self.text_processor.current_paragraph_changed.connect(self.update_display)
-        self.text_processor.current_paragraph_changed.connect(self.update_control_panel)
+        self.text_processor.paragraph_changed.connect(self.on_paragraph_content_changed)
+        self.text_processor.paragraphs_inserted.connect(self.on_paragraphs_moved)
+        self.text_processor.paragraphs_removed.connect(self.on_paragraphs_moved)
+        
+        # 连续模式下输出窗口按增量信号更新段落高度（副屏在创建时连接）
+        display = self.main_window.text_display
+        self.text_processor.paragraph_changed.connect(display.update_paragraph)
+        self.text_processor.paragraphs_inserted.connect(display.insert_paragraphs)
+        self.text_processor.paragraphs_removed.connect(display.remove_paragraphs)
         
         # DynamicEditor信号连接
         self.dynamic_editor.text_changed.connect(self.text_processor.set_text)
@@ -159,10 +321,6 @@ class MainApp(QObject):
         self.control_panel.prev_paragraph_btn.clicked.connect(self.text_processor.prev_paragraph)
         self.control_panel.next_paragraph_btn.clicked.connect(self.text_processor.next_paragraph)
         
-        # 滚动条位置同步信号
-        self.main_window.text_browser.verticalScrollBar().valueChanged.connect(self.on_main_scroll_changed)
-        self.secondary_screen.text_browser.verticalScrollBar().valueChanged.connect(self.on_secondary_scroll_changed)
-        
         # 进度条信号连接
         self.control_panel.paragraph_changed.connect(self.text_processor.set_current_paragraph)
         self.control_panel.paragraph_scroll_changed.connect(self.on_paragraph_scroll_changed)
@@ -170,59 +328,176 @@ class MainApp(QObject):
         # 设置窗口相关连接
         self.setup_window_connections()
     
+    def on_text_update_requested(self):
+        """合并后的文本更新：读取一次编辑器文本，显示在下一次渲染时刷新"""
+        self.on_dynamic_text_changed(self.control_panel.text_edit.toPlainText())
+    
     def on_dynamic_text_changed(self, text):
         """处理动态文本变化，使用DynamicEditor管理滚动位置"""
-        # 保存当前滚动位置
+        # 保存当前滚动位置（所有输出窗口的位置相同，只需保存主窗口）
         self.dynamic_editor.save_scroll_position(self.main_window)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.dynamic_editor.save_scroll_position(self.secondary_screen)
         
-        # 通过DynamicEditor处理文本变化
+        # 通过DynamicEditor处理文本变化，滚动位置在渲染时恢复
         self.dynamic_editor.on_text_changed(text, is_dynamic_edit=True)
-        
-        # 恢复滚动位置
-        self.dynamic_editor.restore_scroll_position(self.main_window, is_paragraph_switch=False)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.dynamic_editor.restore_scroll_position(self.secondary_screen, is_paragraph_switch=False)
+    
+    def on_editor_cursor_moved(self, position):
+        """编辑光标移动时，显示跳转到光标所在段落"""
+        index = self.text_processor.paragraph_at_document_position(position)
+        if index is not None and index != self.text_processor.current_paragraph_index:
+            self.text_processor.set_current_paragraph(index)
     
     def on_paragraph_changed(self, index):
-        """处理段落切换，更新DynamicEditor的当前段落索引"""
+        """处理段落切换，更新DynamicEditor的当前段落索引并安排刷新"""
         self.dynamic_editor.set_current_paragraph(index)
+        if index == self.rendered_paragraph_index:
+            # 段落没有切换（例如动态编辑），保留滚动位置
+            self.mark_dirty("text", "panel")
+        else:
+            self.mark_dirty("text", "scroll", "panel")
+    
+    def on_paragraph_content_changed(self, index):
+        """段落内容改变，只有当前段落需要刷新显示"""
+        if index == self.text_processor.current_paragraph_index:
+            self.mark_dirty("text")
+    
+    def on_paragraphs_moved(self, start, count):
+        """段落插入或删除：段落总数改变，发生在当前段落之前时当前段落的内容也会改变"""
+        if start <= self.text_processor.current_paragraph_index:
+            self.mark_dirty("text")
+        self.mark_dirty("panel")
+    
+    def mark_dirty(self, *parts):
+        """
+        标记需要刷新的部分，在本轮事件循环结束后统一刷新一次
+        
+        Args:
+            parts: "text"、"scroll"、"style"、"panel"中的一个或多个
+        """
+        for part in parts:
+            self.render_stats["requested"] += 1
+            if part in self.dirty_parts:
+                self.render_stats["avoided"] += 1
+            else:
+                self.dirty_parts.add(part)
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+    
+    def flush_render(self):
+        """刷新所有被标记的部分"""
+        self.render_timer.stop()
+        dirty_parts = self.dirty_parts
+        self.dirty_parts = set()
+        if not dirty_parts:
+            return
+        self.render_stats["flushed"] += 1
+        
+        if "style" in dirty_parts:
+            self.apply_style(self.main_window)
+            if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
+                self.apply_style(self.secondary_screen)
+        if "text" in dirty_parts or "scroll" in dirty_parts:
+            is_paragraph_switch = ("scroll" in dirty_parts or
+                                   self.rendered_paragraph_index != self.text_processor.current_paragraph_index)
+            self.update_display(is_paragraph_switch=is_paragraph_switch)
+        if "panel" in dirty_parts:
+            self.update_control_panel()
+        
+        # 后台解析完成前显示的还是旧段落，延迟在解析结果显示后再记录
+        if not self.text_processor.is_parsing():
+            self.dynamic_editor.mark_displayed()
+    
+    def get_render_stats(self):
+        """获取渲染统计：请求次数、实际刷新次数、合并掉的冗余刷新次数"""
+        return dict(self.render_stats)
+    
+    def apply_style(self, window):
+        """把当前样式设置一次性应用到窗口"""
+        window.set_style(
+            self.settings.font_size,
+            QColor(self.settings.background_color),
+            QColor(self.settings.text_color)
+        )
     
     def update_display(self, is_paragraph_switch=True):
         """更新显示内容"""
         current_text = self.text_processor.get_current_paragraph()
         
-        # 保存当前滚动状态
-        was_scrolling = self.main_window.is_scrolling
-        
-        # 关闭滚动定时器
-        if was_scrolling:
-            self.main_window.pause_scroll()
-            if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-                self.secondary_screen.pause_scroll()
+        # 动态编辑没有改变当前段落文本时无需重新设置文本
+        if not is_paragraph_switch and current_text == self.rendered_text:
+            self.render_stats["avoided"] += 1
+            return
+        previous_index = self.rendered_paragraph_index
+        self.rendered_text = current_text
+        self.rendered_paragraph_index = self.text_processor.current_paragraph_index
+        
+        if self.settings.display_mode == "continuous":
+            # 连续模式：整个脚本已经在输出窗口中，只需把锚点移到当前段落
+            if is_paragraph_switch:
+                self.scroll_position = self.checkpoint_position(previous_index, self.rendered_paragraph_index)
+            for window in self.output_windows():
+                window.text_display.set_anchor(self.rendered_paragraph_index)
+            self.apply_scroll_position()
+            self.schedule_prelayout()
+            return
         
         # 更新文本
-        self.main_window.set_text(current_text)
-        self.secondary_screen.set_text(current_text)
+        for window in self.output_windows():
+            window.set_text(current_text)
         
         # 根据是否是段落切换决定是否重置滚动位置
         if is_paragraph_switch:
             # 段落切换：重置滚动位置到新段落开头
-            self.main_window.reset_scroll()
-            if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-                self.secondary_screen.reset_scroll()
-        else:
-            # 动态编辑：恢复之前的滚动位置
-            self.dynamic_editor.restore_scroll_position(self.main_window, is_paragraph_switch=False)
-            if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-                self.dynamic_editor.restore_scroll_position(self.secondary_screen, is_paragraph_switch=False)
-        
-        # 如果之前在滚动，继续滚动
-        if was_scrolling:
-            self.main_window.start_scroll()
-            if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-                self.secondary_screen.start_scroll()
+            self.scroll_position = 0.0
+        elif self.dynamic_editor.restore_scroll_position(self.main_window, is_paragraph_switch=False):
+            # 动态编辑：恢复之前的滚动位置，主时钟从恢复后的位置继续
+            self.scroll_position = self.main_window.text_display.scroll_offset
+        self.apply_scroll_position()
+        self.schedule_prelayout()
+    
+    def checkpoint_position(self, previous_index, index):
+        """
+        连续模式：段落切换时计算相对于新段落顶端的滚动位置
+        
+        段落标识是时间检查点：滚动中切换到下一段时，先按连续的位置换算（画面不跳动），
+        再把与新段落开头的偏差交给滚动主时钟在后续几帧内逐渐修正；偏差超过一屏或手动跳转时直接定位到段落开头。
+        
+        Args:
+            previous_index: 切换前的段落索引
+            index: 新段落索引
+        
+        Returns:
+            相对于新段落顶端的滚动位置（像素）
+        """
+        self.checkpoint_error = 0.0
+        if not self.is_scrolling or previous_index is None or index != previous_index + 1:
+            return 0.0
+        display = self.main_window.text_display
+        position = self.scroll_position - display.paragraph_height(previous_index)
+        if abs(position) > display.height():
+            return 0.0
+        self.checkpoint_error = position
+        return position
+    
+    def schedule_prelayout(self):
+        """安排在空闲时预排版下一段和上一段"""
+        index = self.text_processor.current_paragraph_index
+        self.prelayout_queue = [i for i in (index + 1, index - 1)
+                                if 0 <= i < len(self.text_processor.paragraphs)]
+        if self.prelayout_queue:
+            self.prelayout_timer.start()
+    
+    def prelayout_next(self):
+        """预排版队列中的一个段落，每次空闲只处理一段，避免长时间占用事件循环"""
+        if not self.prelayout_queue:
+            return
+        index = self.prelayout_queue.pop(0)
+        if index < len(self.text_processor.paragraphs):
+            text = self.text_processor.paragraphs[index]
+            self.main_window.text_display.prepare(text)
+            if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
+                self.secondary_screen.text_display.prepare(text)
+        if self.prelayout_queue:
+            self.prelayout_timer.start()
     
     def update_control_panel(self):
         """更新控制面板状态"""
@@ -230,67 +505,79 @@ class MainApp(QObject):
             self.text_processor.current_paragraph_index, 
             self.text_processor.get_total_paragraphs()
         )
+        self.update_time_info()
     
-    def on_main_scroll_changed(self, value):
-        """主窗口滚动位置改变时的槽函数"""
-        # 同步到副屏
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            # 防止循环触发
-            if abs(self.secondary_screen.text_browser.verticalScrollBar().value() - value) > 1:
-                self.secondary_screen.text_browser.verticalScrollBar().setValue(value)
-                self.secondary_screen.scroll_position = value
-    
-    def on_secondary_scroll_changed(self, value):
-        """副屏滚动位置改变时的槽函数"""
-        # 同步到主窗口
-        if abs(self.main_window.text_browser.verticalScrollBar().value() - value) > 1:
-            self.main_window.text_browser.verticalScrollBar().setValue(value)
-            self.main_window.scroll_position = value
+    def update_time_info(self):
+        """更新控制面板上的演出时间信息"""
+        self.control_panel.update_time_info(
+            self.text_processor.get_elapsed_time(),
+            self.text_processor.get_total_time(),
+            self.text_processor.get_remaining_time(),
+            self.text_processor.get_time_progress()
+        )
+    
+    def seek_to_time(self, text):
+        """跳转到时间轴上指定时间所在的段落"""
+        if self.text_processor.seek_to_time(text):
+            self.control_panel.error_label.setText("")
+        else:
+            self.control_panel.error_label.setText("时间格式无效，请输入 时:分:秒")
     
     def on_paragraph_scroll_changed(self, progress):
         """段落内滚动位置改变时的槽函数"""
-        # 计算目标滚动位置
-        main_scroll_bar = self.main_window.text_browser.verticalScrollBar()
-        max_value = main_scroll_bar.maximum()
-        target_position = int(progress * max_value)
-        
-        # 设置主窗口滚动位置
-        self.main_window.text_browser.verticalScrollBar().setValue(target_position)
-        self.main_window.scroll_position = target_position
-        
-        # 同步到副屏
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.text_browser.verticalScrollBar().setValue(target_position)
-            self.secondary_screen.scroll_position = target_position
+        # 计算目标滚动位置，所有输出窗口使用同一位置
+        display = self.main_window.text_display
+        if display.is_continuous():
+            # 连续模式：进度对应当前段落自身的高度
+            max_value = display.paragraph_height(self.text_processor.current_paragraph_index)
+        else:
+            max_value = display.verticalScrollBar().maximum()
+        self.scroll_position = progress * max_value
+        self.checkpoint_error = 0.0
+        self.apply_scroll_position()
     
     def on_main_window_resized(self, size):
-        """主窗口大小改变时的槽函数"""
+        """主窗口大小改变时的槽函数：拖动期间连续触发，停止改变后统一处理一次"""
+        self.pending_main_window_size = size
+        self.resize_settle_timer.start()
+    
+    def apply_main_window_size(self):
+        """主窗口大小稳定后同步副屏、写入一次配置并更新控制面板"""
+        size = self.pending_main_window_size
+        self.pending_main_window_size = None
+        if size is None:
+            return
+        
         # 同步到副屏
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
+        if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
             self.secondary_screen.resize(size)
         
         # 更新配置
         width, height = size.width(), size.height()
-        self.config_manager.set("main_window.width", width)
-        self.config_manager.set("main_window.height", height)
+        self.config_manager.update_window_size("main_window", width, height)
         
-        # 更新控制面板显示数值
+        # 更新控制面板显示数值（使用blockSignals避免再次设置窗口大小），标签页尚未创建时跳过
+        if not self.control_panel.tabs_built():
+            return
+        self.control_panel.main_width_spinbox.blockSignals(True)
+        self.control_panel.main_height_spinbox.blockSignals(True)
         self.control_panel.main_width_spinbox.setValue(width)
         self.control_panel.main_height_spinbox.setValue(height)
+        self.control_panel.main_width_spinbox.blockSignals(False)
+        self.control_panel.main_height_spinbox.blockSignals(False)
     
     def on_main_window_moved(self, pos):
         """主窗口位置改变时的槽函数"""
         # 获取新的窗口位置
         x, y = pos.x(), pos.y()
         
-        # 避免重复更新（只有当数值发生变化时才更新）
-        if (self.control_panel.main_x_spinbox.value() != x or 
-            self.control_panel.main_y_spinbox.value() != y):
-            # 更新配置
-            self.config_manager.set("main_window.x", x)
-            self.config_manager.set("main_window.y", y)
-            
-            # 更新控制面板显示数值（使用blockSignals避免触发valueChanged信号）
+        # 更新配置（数值没有变化时不会写入，拖动期间的连续修改由配置管理器合并为一次写入）
+        self.config_manager.update_window_position("main_window", x, y)
+        
+        # 更新控制面板显示数值（使用blockSignals避免触发valueChanged信号）；
+        # 标签页尚未创建时跳过，创建后按配置更新
+        if self.control_panel.tabs_built() and (self.control_panel.main_x_spinbox.value() != x or
+                                                self.control_panel.main_y_spinbox.value() != y):
             self.control_panel.main_x_spinbox.blockSignals(True)
             self.control_panel.main_y_spinbox.blockSignals(True)
             self.control_panel.main_x_spinbox.setValue(x)
@@ -303,14 +590,13 @@ class MainApp(QObject):
         # 获取新的窗口位置
         x, y = pos.x(), pos.y()
         
-        # 避免重复更新（只有当数值发生变化时才更新）
-        if (self.control_panel.secondary_x_spinbox.value() != x or 
-            self.control_panel.secondary_y_spinbox.value() != y):
-            # 更新配置
-            self.config_manager.set("secondary_window.x", x)
-            self.config_manager.set("secondary_window.y", y)
-            
-            # 更新控制面板显示数值（使用blockSignals避免触发valueChanged信号）
+        # 更新配置（数值没有变化时不会写入，拖动期间的连续修改由配置管理器合并为一次写入）
+        self.config_manager.update_window_position("secondary_window", x, y)
+        
+        # 更新控制面板显示数值（使用blockSignals避免触发valueChanged信号）；
+        # 标签页尚未创建时跳过，创建后按配置更新
+        if self.control_panel.tabs_built() and (self.control_panel.secondary_x_spinbox.value() != x or
+                                                self.control_panel.secondary_y_spinbox.value() != y):
             self.control_panel.secondary_x_spinbox.blockSignals(True)
             self.control_panel.secondary_y_spinbox.blockSignals(True)
             self.control_panel.secondary_x_spinbox.setValue(x)
@@ -329,7 +615,6 @@ class MainApp(QObject):
         
         # 窗口移动信号连接
         self.main_window.window_moved_signal.connect(self.on_main_window_moved)
-        self.secondary_screen.window_moved_signal.connect(self.on_secondary_window_moved)
     
     def on_main_window_closed(self, event):
         """主窗口关闭事件"""
@@ -349,32 +634,65 @@ class MainApp(QObject):
         # 关闭所有窗口
         self.main_window.close()
         self.control_panel.close()
-        self.secondary_screen.close()
+        if self.secondary_screen is not None:
+            self.secondary_screen.close()
         
         # 退出应用程序
         self.app.quit()
     
     def start_scroll(self):
         """开始滚动"""
+        self.is_scrolling = True
         self.main_window.start_scroll()
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
+        if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
             self.secondary_screen.start_scroll()
+        self.scroll_clock.start()
         # 开始自动段落跳转
         self.text_processor.start_auto_play()
+        self.time_info_timer.start()
     
     def pause_scroll(self):
         """暂停滚动"""
+        self.is_scrolling = False
+        self.scroll_clock.stop()
         self.main_window.pause_scroll()
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
+        if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
             self.secondary_screen.pause_scroll()
         # 停止自动段落跳转
         self.text_processor.stop_auto_play()
+        self.time_info_timer.stop()
+        self.update_time_info()
     
     def reset_scroll(self):
         """重置滚动"""
-        self.main_window.reset_scroll()
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.reset_scroll()
+        self.scroll_position = 0.0
+        self.checkpoint_error = 0.0
+        self.apply_scroll_position()
+    
+    def on_scroll_frame(self, delta_time):
+        """
+        滚动主时钟的一帧：计算一次滚动位置并交给所有输出窗口
+        
+        Args:
+            delta_time: 距上一帧的时间（秒）
+        """
+        if not self.is_scrolling:
+            return
+        self.scroll_position += self.settings.scroll_speed * delta_time
+        if self.checkpoint_error:
+            # 段落切换时的偏差按时间比例逐帧修正（指数衰减，时间常数为CHECKPOINT_GLIDE秒）
+            step = self.checkpoint_error * min(1.0, delta_time / self.CHECKPOINT_GLIDE)
+            if abs(self.checkpoint_error - step) < 0.5:
+                step = self.checkpoint_error
+            self.scroll_position -= step
+            self.checkpoint_error -= step
+        self.apply_scroll_position()
+    
+    def apply_scroll_position(self):
+        """所有输出窗口按主时钟的滚动位置绘制"""
+        self.main_window.set_scroll_position(self.scroll_position)
+        if self.settings.secondary_screen_enabled and self.secondary_screen.isVisible():
+            self.secondary_screen.set_scroll_position(self.scroll_position)
     
     def set_scroll_speed(self, speed):
         """设置滚动速度（倒序逻辑：值越小速度越快，值越大速度越慢）"""
@@ -393,21 +711,51 @@ class MainApp(QObject):
         log_value = math.log10(numerator / 1000)
         actual_speed = 0.1 + (1000 - 0.1) * (log_value / 3)  # 映射到0.1-1000像素/秒
         
-        self.settings["scroll_speed"] = actual_speed
-        self.main_window.set_scroll_speed(actual_speed)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.set_scroll_speed(actual_speed)
+        self.settings.scroll_speed = actual_speed
+    
+    def set_display_mode(self, mode):
+        """设置显示方式：单段显示或整篇连续滚动"""
+        self.settings.display_mode = mode
+    
+    def apply_display_mode(self):
+        """把显示方式应用到所有输出窗口，连续模式下窗口直接使用文本处理器的段落视图"""
+        paragraphs = self.text_processor.paragraphs if self.settings.display_mode == "continuous" else None
+        self.checkpoint_error = 0.0
+        for window in self.output_windows():
+            window.text_display.set_paragraphs(paragraphs)
+        # 按新的显示方式重新显示当前段落
+        self.rendered_paragraph_index = None
+        self.mark_dirty("text", "scroll")
+    
+    def set_tiled_rendering(self, enabled):
+        """设置输出窗口是否使用分块位图渲染"""
+        self.settings.tiled_rendering = enabled
+    
+    def set_frame_pacing(self, mode):
+        """设置滚动帧节奏"""
+        self.settings.frame_pacing = mode
+    
+    def get_frame_stats(self):
+        """获取滚动主时钟的帧率和掉帧统计"""
+        return self.scroll_clock.get_stats()
+    
+    def get_layout_cache_stats(self):
+        """获取共享排版缓存（含分块位图）的命中统计"""
+        return self.layout_cache.get_stats()
+    
+    def update_frame_stats(self):
+        """更新控制面板上的滚动帧率"""
+        self.control_panel.update_frame_stats(self.get_frame_stats())
     
     def set_font_size(self, size):
         """设置字体大小"""
-        self.settings["font_size"] = size
-        self.main_window.set_font_size(size)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.set_font_size(size)
+        self.settings.font_size = size
         
         # 更新控制面板的滚动一行时间显示
-        # 计算当前行高
-        line_height = size * 1.2  # 假设行高为字体大小的1.2倍
+        # 计算当前行高：使用按字号缓存的字体度量
+        font = QFont(self.main_window.display_font)
+        font.setPointSize(size)
+        line_height = self.layout_cache.font_metrics(font).lineSpacing()
         # 获取当前滚动速度值
         current_speed_value = self.control_panel.speed_slider.value()
         # 更新滚动时间显示，并传递行高值
@@ -415,40 +763,53 @@ class MainApp(QObject):
     
     def set_background_color(self, color):
         """设置背景颜色"""
-        self.settings["background_color"] = color.name()
-        self.main_window.set_background_color(color)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.set_background_color(color)
+        self.settings.background_color = color.name()
     
     def set_text_color(self, color):
         """设置文本颜色"""
-        self.settings["text_color"] = color.name()
-        self.main_window.set_text_color(color)
-        if self.settings["secondary_screen_enabled"] and self.secondary_screen.isVisible():
-            self.secondary_screen.set_text_color(color)
+        self.settings.text_color = color.name()
+    
+    def set_paragraph_duration(self, duration):
+        """设置段落停留时间"""
+        self.settings.paragraph_duration = duration
+    
+    def set_paragraph_time_control_mode(self, mode):
+        """设置段落时间控制方式"""
+        self.settings.paragraph_time_control_mode = mode
     
     def toggle_secondary_screen(self, enabled):
         """切换副屏显示"""
-        self.settings["secondary_screen_enabled"] = enabled
+        self.settings.secondary_screen_enabled = enabled
         if enabled:
             # 同步主窗口状态到副屏
-            self.secondary_screen.sync_with_main(self.main_window)
+            self.ensure_secondary_screen().sync_with_main(self.main_window)
             self.secondary_screen.show()
-        else:
+        elif self.secondary_screen is not None:
             self.secondary_screen.hide()
         
-        # 更新控制面板UI
-        self.control_panel.secondary_screen_check.setChecked(enabled)
+        # 更新控制面板UI（标签页尚未创建时跳过，创建后按配置更新）
+        if self.control_panel.tabs_built():
+            self.control_panel.secondary_screen_check.setChecked(enabled)
     
     def set_main_window_topmost(self, topmost):
         """设置主窗口置顶"""
-        self.settings["main_window_topmost"] = topmost
-        self.main_window.set_topmost(topmost)
+        self.settings.main_window_topmost = topmost
     
     def set_secondary_window_topmost(self, topmost):
         """设置副屏置顶"""
-        self.settings["secondary_screen_topmost"] = topmost
-        self.secondary_screen.set_topmost(topmost)
+        self.settings.secondary_screen_topmost = topmost
+    
+    def set_main_window_transform(self, mirrored, rotation):
+        """设置主窗口输出的镜像和旋转"""
+        with self.settings.batch():
+            self.settings.main_window_mirrored = mirrored
+            self.settings.main_window_rotation = rotation
+    
+    def set_secondary_window_transform(self, mirrored, rotation):
+        """设置副屏输出的镜像和旋转"""
+        with self.settings.batch():
+            self.settings.secondary_screen_mirrored = mirrored
+            self.settings.secondary_screen_rotation = rotation
     
     def set_main_window_width(self, width):
         """设置主窗口宽度 - 同时更新副屏宽度"""
@@ -462,7 +823,7 @@ class MainApp(QObject):
         self.main_window.setGeometry(x, y, width, height)
         
         # 同步调整副屏宽度
-        if self.secondary_screen.isVisible():
+        if self.secondary_screen is not None and self.secondary_screen.isVisible():
             secondary_rect = self.secondary_screen.geometry()
             secondary_x, secondary_y = secondary_rect.x(), secondary_rect.y()
             secondary_height = secondary_rect.height()
@@ -483,7 +844,7 @@ class MainApp(QObject):
         self.main_window.setGeometry(x, y, width, height)
         
         # 同步调整副屏高度
-        if self.secondary_screen.isVisible():
+        if self.secondary_screen is not None and self.secondary_screen.isVisible():
             secondary_rect = self.secondary_screen.geometry()
             secondary_x, secondary_y = secondary_rect.x(), secondary_rect.y()
             secondary_width = secondary_rect.width()
@@ -524,6 +885,11 @@ class MainApp(QObject):
     
     def set_secondary_window_x(self, x):
         """设置副屏X坐标"""
+        # 副屏尚未创建时只更新配置，创建时按配置设置位置
+        if self.secondary_screen is None:
+            self.config_manager.set("secondary_window.x", x)
+            return
+        
         # 获取当前窗口位置和大小
         rect = self.secondary_screen.geometry()
         y, width, height = rect.y(), rect.width(), rect.height()
@@ -539,6 +905,11 @@ class MainApp(QObject):
     
     def set_secondary_window_y(self, y):
         """设置副屏Y坐标"""
+        # 副屏尚未创建时只更新配置，创建时按配置设置位置
+        if self.secondary_screen is None:
+            self.config_manager.set("secondary_window.y", y)
+            return
+        
         # 获取当前窗口位置和大小
         rect = self.secondary_screen.geometry()
         x, width, height = rect.x(), rect.width(), rect.height()
@@ -558,9 +929,12 @@ class MainApp(QObject):
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             self.control_panel.set_text(content)
-            self.text_processor.set_text(content)
-            self.update_display()
-            self.update_control_panel()
+            # 文本已直接交给文本处理器，不再需要合并后的编辑更新
+            self.dynamic_editor.cancel_pending_text_change()
+            self.text_processor.load_text(content)
+            # 新文本的第一次显示总是从段落开头开始
+            self.rendered_paragraph_index = None
+            self.mark_dirty("text", "scroll", "panel")
             # 更新最后打开的文件路径
             self.config_manager.set("last_opened_file", file_path)
             # 更新控制面板的当前文件路径
@@ -583,49 +957,98 @@ class MainApp(QObject):
     
     def clear_text(self):
         """清空文本"""
+        self.dynamic_editor.cancel_pending_text_change()
         self.text_processor.clear()
-        self.update_display()
-        self.update_control_panel()
+        # 新文本的第一次显示总是从段落开头开始
+        self.rendered_paragraph_index = None
+        self.mark_dirty("text", "scroll", "panel")
     
     def on_save_config(self):
         """保存配置"""
         # 更新配置值
-        self.config_manager.set("scroll_speed", self.settings["scroll_speed"])
-        self.config_manager.set("font_size", self.settings["font_size"])
-        self.config_manager.set("background_color", self.settings["background_color"])
-        self.config_manager.set("text_color", self.settings["text_color"])
-        self.config_manager.set("paragraph_duration", self.text_processor.paragraph_duration)
-        self.config_manager.set("paragraph_time_control_mode", self.text_processor.time_control_mode)
-        self.config_manager.set("secondary_screen_topmost", self.settings["secondary_screen_topmost"])
-        self.config_manager.set("main_window_topmost", self.settings["main_window_topmost"])
-        
-        # 保存到文件
+        self.settings.save(self.config_manager)
+        
+        # 保存到文件（用户明确要求保存，立即写入）
         self.config_manager.save_config()
     
     def on_reset_config(self):
         """重置配置"""
-        # 重置为默认配置
-        self.config_manager.config = self.config_manager.default_config.copy()
-        self.config_manager.save_config()
+        # 重置为默认配置（外观预设保留）
+        self.config_manager.reset()
         
-        # 重新加载配置
-        self.settings = {
-            "scroll_speed": self.config_manager.get("scroll_speed"),
-            "font_size": self.config_manager.get("font_size"),
-            "background_color": self.config_manager.get("background_color"),
-            "text_color": self.config_manager.get("text_color"),
-            "paragraph_duration": self.config_manager.get("paragraph_duration"),
-            "secondary_screen_enabled": False,  # 固定默认为False，不读取配置
-            "secondary_screen_topmost": self.config_manager.get("secondary_screen_topmost"),
-            "main_window_topmost": self.config_manager.get("main_window_topmost")
-        }
-        
-        # 应用配置到窗口
+        # 重新加载配置：只有改变的设置项通知订阅的窗口
+        self.settings.load(self.config_manager)
+        
+        # 应用窗口位置和大小
         self.apply_config_to_windows()
         
-        # 更新文本处理器
-        self.text_processor.set_paragraph_duration(self.settings["paragraph_duration"])
-        self.text_processor.set_time_control_mode(self.config_manager.get("paragraph_time_control_mode"))
+        # 刷新外观预设列表
+        self.control_panel.set_preset_names(self.config_manager.preset_names(),
+                                            self.config_manager.get("current_preset"))
+    
+    def save_preset(self, name):
+        """把当前外观（样式、置顶、输出变换、窗口大小和位置）保存为预设"""
+        # 拖动中尚未写入配置的窗口大小先写入
+        self.resize_settle_timer.stop()
+        self.apply_main_window_size()
+        preset = self.config_manager.capture_preset()
+        preset.update({key: getattr(self.settings, key)
+                       for key in ConfigManager.PRESET_KEYS if key in Settings.FIELDS})
+        with self.config_manager.transaction():
+            self.config_manager.save_preset(name, preset)
+            self.config_manager.set("current_preset", name)
+        self.control_panel.set_preset_names(self.config_manager.preset_names(), name)
+    
+    def delete_preset(self, name):
+        """删除外观预设"""
+        self.config_manager.delete_preset(name)
+        self.control_panel.set_preset_names(self.config_manager.preset_names(),
+                                            self.config_manager.get("current_preset"))
+    
+    def apply_preset(self, name):
+        """
+        切换外观预设：所有修改一次性应用，只重新排版一次、写入一次配置
+        
+        Args:
+            name: 预设名称
+        
+        Returns:
+            切换用时（毫秒），预设不存在时返回None
+        """
+        clock = QElapsedTimer()
+        clock.start()
+        
+        # 写入配置（合并为一次写入），窗口大小和位置按配置设置
+        preset = self.config_manager.apply_preset(name)
+        if preset is None:
+            return None
+        self.apply_config_to_windows()
+        
+        # 其余设置作为一个批次通知订阅的窗口
+        self.settings.update({key: value for key, value in preset.items() if key in Settings.FIELDS})
+        
+        # 不等待大小改变停止：立即采用新宽度，与字体改变合并为一次排版，并在返回前完成绘制准备
+        self.resize_settle_timer.stop()
+        self.apply_main_window_size()
+        for window in self.output_windows():
+            window.text_display.apply_pending_resize()
+        self.flush_render()
+        
+        elapsed_ms = clock.nsecsElapsed() / 1e6
+        self.preset_stats["switches"] += 1
+        self.preset_stats["last_ms"] = elapsed_ms
+        self.preset_stats["max_ms"] = max(self.preset_stats["max_ms"], elapsed_ms)
+        
+        # 更新控制面板（不再次触发设置）
+        self.control_panel.blockSignals(True)
+        self.control_panel.update_look_from_config(self.config_manager.config)
+        self.control_panel.blockSignals(False)
+        self.control_panel.update_preset_time(elapsed_ms)
+        return elapsed_ms
+    
+    def get_preset_stats(self):
+        """获取外观预设切换统计：切换次数、最近一次和最长的用时（毫秒）"""
+        return dict(self.preset_stats)
     
     def start(self):
         """启动应用程序"""
@@ -636,13 +1059,17 @@ class MainApp(QObject):
         self.main_window.show()
         self.control_panel.show()
         
-        # 确保副屏默认隐藏
-        self.secondary_screen.hide()
-        
-        # 启动事件循环
-        sys.exit(self.app.exec_())
+        # 启动事件循环，退出前写入尚未保存的配置
+        exit_code = self.app.exec_()
+        self.config_manager.close()
+        sys.exit(exit_code)
 
 if __name__ == "__main__":
+    # 启动性能测试：python main.py --benchmark-startup [-o 结果.json] [--runs 次数] [--file 脚本]
+    if "--benchmark-startup" in sys.argv:
+        from startup_benchmark import main as run_startup_benchmark
+        sys.exit(run_startup_benchmark(sys.argv[sys.argv.index("--benchmark-startup") + 1:]))
+    
     # 创建并启动应用程序
     app = MainApp()
     app.start()
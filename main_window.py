@@ -1,6 +1,7 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTextBrowser, QPushButton
-from PyQt5.QtCore import Qt, QTimer, QPoint, QDateTime, pyqtSignal
-from PyQt5.QtGui import QTextOption, QFont, QColor
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton
+from PyQt5.QtCore import Qt, QPoint, pyqtSignal
+from PyQt5.QtGui import QTextOption, QFont, QColor, QPalette
+from text_display import TextDisplay
 
 class MainDisplayWindow(QMainWindow):
     """主显示窗口，用于显示滚动文本"""
@@ -17,110 +18,86 @@ class MainDisplayWindow(QMainWindow):
         self.setGeometry(100, 100, 800, 600)
         self.setWindowFlags(Qt.Window | Qt.WindowMinMaxButtonsHint | Qt.WindowCloseButtonHint)
         
-        # 初始化文本显示组件
-        self.text_browser = QTextBrowser()
-        self.text_browser.setAlignment(Qt.AlignCenter)
-        self.text_browser.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.text_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        # 初始化文本显示组件：自绘组件，排版结果缓存，按小数像素平移滚动
+        self.text_display = TextDisplay()
         
         # 设置默认样式
+        self.display_font = QFont()  # 显示字体，改变字号时沿用同一个对象
         self.font_size = 36
         self.background_color = QColor(0, 0, 0)
         self.text_color = QColor(255, 255, 255)
         self.update_style()
         
-        # 初始化滚动相关属性
+        # 初始化滚动相关属性：滚动位置由MainApp的滚动主时钟统一计算后设置
         self.is_scrolling = False
         self.scroll_speed = 1000  # 滚动速度，像素/秒
         self.scroll_position = 0
-        self.scroll_timer = QTimer(self)
-        self.scroll_timer.timeout.connect(self.update_scroll)
-        self.last_scroll_time = 0
         
         # 设置中心部件
         central_widget = QWidget()
         layout = QVBoxLayout(central_widget)
-        layout.addWidget(self.text_browser)
+        layout.addWidget(self.text_display)
         self.setCentralWidget(central_widget)
     
     def update_style(self):
-        """更新窗口样式"""
-        # 设置字体
-        font = QFont()
-        font.setPointSize(self.font_size)
-        self.text_browser.setFont(font)
+        """更新窗口样式：直接设置字体和调色板，不使用样式表，不会触发样式重新计算"""
+        # 设置字体，字号没有变化时显示组件不会重新排版
+        self.display_font.setPointSize(self.font_size)
+        self.text_display.setFont(self.display_font)
         
-        # 设置样式表
-        style_sheet = "QTextBrowser {{ background-color: {0}; color: {1}; padding: 20px; }}".format(
-            self.background_color.name(), self.text_color.name())
-        self.text_browser.setStyleSheet(style_sheet)
+        # 设置颜色：窗口背景（文本区域外的边距）与文本区域一致
+        palette = self.palette()
+        if palette.color(QPalette.Window) != self.background_color:
+            palette.setColor(QPalette.Window, self.background_color)
+            self.setPalette(palette)
+        self.text_display.set_colors(self.background_color, self.text_color)
     
     def set_text(self, text):
         """设置显示文本"""
         # 保存当前滚动位置
-        current_scroll_value = self.text_browser.verticalScrollBar().value()
-        current_scroll_position = self.scroll_position
-        is_scrolling = self.is_scrolling
+        current_scroll_offset = self.text_display.scroll_offset
         
         # 更新文本
-        self.text_browser.setPlainText(text)
+        self.text_display.setPlainText(text)
         
         # 恢复滚动位置
-        self.text_browser.verticalScrollBar().setValue(current_scroll_value)
-        self.scroll_position = current_scroll_position
-        
-        # 确保滚动定时器状态正确
-        if is_scrolling and not self.is_scrolling:
-            self.start_scroll()
+        self.text_display.set_scroll_offset(current_scroll_offset)
     
     def start_scroll(self):
         """开始滚动"""
         if not self.is_scrolling:
             self.is_scrolling = True
-            self.last_scroll_time = QDateTime.currentMSecsSinceEpoch()
-            self.scroll_timer.start(30)  # 约33fps
     
     def pause_scroll(self):
         """暂停滚动"""
         if self.is_scrolling:
             self.is_scrolling = False
-            self.scroll_timer.stop()
     
     def reset_scroll(self):
         """重置滚动位置"""
-        # 保存当前滚动状态
-        was_scrolling = self.is_scrolling
-        
-        # 重置位置
-        self.scroll_position = 0
-        self.text_browser.verticalScrollBar().setValue(0)
-        
-        # 如果之前在滚动，继续滚动
-        if was_scrolling:
-            self.start_scroll()
+        self.set_scroll_position(0)
     
-    def update_scroll(self):
-        """更新滚动位置"""
-        if not self.is_scrolling:
-            return
-        
-        # 计算时间差
-        current_time = QDateTime.currentMSecsSinceEpoch()
-        delta_time = (current_time - self.last_scroll_time) / 1000.0  # 转换为秒
-        self.last_scroll_time = current_time
+    def set_scroll_position(self, position):
+        """
+        设置滚动位置
         
-        # 计算滚动距离
-        scroll_distance = self.scroll_speed * delta_time
-        self.scroll_position += scroll_distance
-        
-        # 更新滚动条位置
-        scroll_bar = self.text_browser.verticalScrollBar()
-        scroll_bar.setValue(int(self.scroll_position))
+        Args:
+            position: 滚动距离（像素，可以是小数）
+        """
+        self.scroll_position = position
+        self.text_display.set_scroll_offset(position)
     
     def set_scroll_speed(self, speed):
         """设置滚动速度"""
         self.scroll_speed = speed
     
+    def set_style(self, font_size, background_color, text_color):
+        """一次性设置字体大小和颜色，只更新一次样式"""
+        self.font_size = font_size
+        self.background_color = background_color
+        self.text_color = text_color
+        self.update_style()
+    
     def set_font_size(self, size):
         """设置字体大小"""
         self.font_size = size
@@ -136,13 +113,27 @@ class MainDisplayWindow(QMainWindow):
         self.text_color = color
         self.update_style()
     
+    def set_output_transform(self, mirrored, rotation):
+        """
+        设置输出镜像和旋转，只改变绘制时的变换，不重新排版
+        
+        Args:
+            mirrored: 是否水平镜像
+            rotation: 旋转角度，0或180
+        """
+        self.text_display.set_output_transform(mirrored, rotation)
+    
     def set_topmost(self, is_topmost):
-        """设置窗口是否置顶"""
+        """设置窗口是否置顶：改变窗口标志会重建原生窗口，置顶状态不变时跳过，隐藏的窗口保持隐藏"""
+        if bool(self.windowFlags() & Qt.WindowStaysOnTopHint) == is_topmost:
+            return
+        was_visible = self.isVisible()
         if is_topmost:
             self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         else:
             self.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
-        self.show()
+        if was_visible:
+            self.show()
     
     def resizeEvent(self, event):
         """窗口大小改变事件"""
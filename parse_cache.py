@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+from array import array
+from text_processor import ParagraphTable
+
+class ParseCache:
+    """
+    解析结果磁盘缓存
+    
+    按文本内容的哈希保存段落标识、段落位置、持续时间、BMP以外字符的位置和时间轴，再次打开同一个脚本时跳过解析。
+    每个条目一个文件：第一行是JSON描述，之后依次是各个数组的原始字节。
+    缓存总大小超过上限时按文件修改时间淘汰最久未使用的条目（命中时会更新修改时间）。
+    """
+    
+    VERSION = 2
+    SUFFIX = ".cache"
+    
+    def __init__(self, cache_dir="parse_cache", max_bytes=20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes  # 缓存目录的最大总字节数
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def text_key(text):
+        """计算文本内容的哈希，作为缓存键"""
+        return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+    
+    def load(self, text, time_control_mode, paragraph_duration):
+        """
+        读取文本的解析结果
+        
+        Args:
+            text: 文本内容
+            time_control_mode: 当前时间控制方式，与缓存时不同则不使用缓存的时间轴
+            paragraph_duration: 当前每段停留时间，与缓存时不同则不使用缓存的时间轴
+        
+        Returns:
+            (parse_script格式的解析结果, 时间轴前缀和或None)，未命中时返回None
+        """
+        path = self._path(self.text_key(text))
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                data = f.read()
+            if header["version"] != self.VERSION or header["length"] != len(text):
+                raise ValueError("缓存条目与文本不匹配")
+            
+            values = array('q')
+            values.frombytes(data)
+            count, marker_count, astral_count = header["paragraphs"], header["markers"], header["astral"]
+            if len(values) != marker_count * 3 + count * 4 + astral_count + 1:
+                raise ValueError("缓存条目已损坏")
+            
+            markers = self._read_table(values, 0, marker_count)
+            offset = marker_count * 3
+            table = self._read_table(values, offset, count)
+            offset += count * 3
+            astral = values[offset:offset + astral_count]
+            time_starts = values[offset + astral_count:]
+            if header["timeline"] != [time_control_mode, paragraph_duration]:
+                time_starts = None
+            
+            # 更新修改时间，作为最近使用的标记
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"读取解析缓存失败: {e}")
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return (markers, table, astral), time_starts
+    
+    @staticmethod
+    def _read_table(values, offset, count):
+        """从offset开始依次读取起始位置、结束位置、持续时间三列，组成段落表"""
+        table = ParagraphTable()
+        table.starts = values[offset:offset + count]
+        table.ends = values[offset + count:offset + count * 2]
+        table.durations = values[offset + count * 2:offset + count * 3]
+        return table
+    
+    def store(self, text, result, time_starts, time_control_mode, paragraph_duration):
+        """
+        保存文本的解析结果，写入后淘汰超出容量的旧条目
+        
+        Args:
+            text: 文本内容
+            result: parse_script的返回值
+            time_starts: 按time_control_mode和paragraph_duration计算的时间轴前缀和
+        """
+        markers, table, astral = result
+        header = {
+            "version": self.VERSION,
+            "length": len(text),
+            "paragraphs": len(table),
+            "markers": len(markers),
+            "astral": len(astral),
+            "timeline": [time_control_mode, paragraph_duration],
+        }
+        values = array('q')
+        for source in (markers, table):
+            rows = source.rows(0, len(source))
+            for column in range(3):
+                values.extend(row[column] for row in rows)
+        values.extend(astral)
+        values.extend(time_starts)
+        
+        path = self._path(self.text_key(text))
+        temp_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b"\n")
+                f.write(values.tobytes())
+            # 先写临时文件再替换，读取时不会看到写了一半的条目
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"保存解析缓存失败: {e}")
+            return
+        self.evict()
+    
+    def evict(self, max_bytes=None):
+        """按最近使用时间淘汰条目，直到缓存总大小不超过上限（默认为self.max_bytes）"""
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(self.SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    
+    def clear(self):
+        """删除全部缓存条目"""
+        self.evict(0)
@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class SettingsSignals(QObject):
+    """设置项的改变通知，每个设置项一个信号，另有一个按批次发出的汇总信号"""
+    
+    # 定义信号
+    scroll_speed_changed = pyqtSignal(float)  # 滚动速度（像素/秒）
+    frame_pacing_changed = pyqtSignal(str)  # 滚动帧节奏
+    display_mode_changed = pyqtSignal(str)  # 显示方式
+    tiled_rendering_changed = pyqtSignal(bool)  # 是否使用分块位图渲染
+    font_size_changed = pyqtSignal(int)  # 字体大小
+    background_color_changed = pyqtSignal(str)  # 背景颜色
+    text_color_changed = pyqtSignal(str)  # 文本颜色
+    paragraph_duration_changed = pyqtSignal(int)  # 段落默认持续时间（秒）
+    paragraph_time_control_mode_changed = pyqtSignal(str)  # 段落时间控制模式
+    secondary_screen_enabled_changed = pyqtSignal(bool)  # 副屏是否启用
+    secondary_screen_topmost_changed = pyqtSignal(bool)  # 副屏是否置顶
+    main_window_topmost_changed = pyqtSignal(bool)  # 主窗口是否置顶
+    main_window_mirrored_changed = pyqtSignal(bool)  # 主窗口是否镜像
+    main_window_rotation_changed = pyqtSignal(int)  # 主窗口旋转角度
+    secondary_screen_mirrored_changed = pyqtSignal(bool)  # 副屏是否镜像
+    secondary_screen_rotation_changed = pyqtSignal(int)  # 副屏旋转角度
+    changed = pyqtSignal(object)  # 一批修改完成：改变的设置项名称集合（frozenset）
+
+class Settings:
+    """
+    应用程序设置，类型固定的设置项保存在__slots__属性中，读取时直接访问属性
+    
+    给设置项赋值时按类型转换，值没有变化时忽略；改变通知在批次结束时发出，
+    每个改变的设置项发出一次各自的信号，最后发出一次changed汇总信号。
+    batch()中的多次修改只通知一次，订阅者按最终的值一次性更新。
+    """
+    
+    # 设置项：名称 -> (类型, 是否保存到配置文件)
+    FIELDS = {
+        "scroll_speed": (float, True),
+        "frame_pacing": (str, True),
+        "display_mode": (str, True),
+        "tiled_rendering": (bool, True),
+        "font_size": (int, True),
+        "background_color": (str, True),
+        "text_color": (str, True),
+        "paragraph_duration": (int, True),
+        "paragraph_time_control_mode": (str, True),
+        "secondary_screen_enabled": (bool, False),  # 固定默认为False，不读取配置
+        "secondary_screen_topmost": (bool, True),
+        "main_window_topmost": (bool, True),
+        "main_window_mirrored": (bool, True),
+        "main_window_rotation": (int, True),
+        "secondary_screen_mirrored": (bool, True),
+        "secondary_screen_rotation": (int, True),
+    }
+    
+    __slots__ = tuple(FIELDS) + ('signals', '_pending', '_batch_depth')
+    
+    def __init__(self, defaults):
+        """
+        Args:
+            defaults: 默认值字典，通常是ConfigManager.default_config
+        """
+        object.__setattr__(self, 'signals', SettingsSignals())
+        object.__setattr__(self, '_pending', set())  # 本批次中改变的设置项
+        object.__setattr__(self, '_batch_depth', 0)
+        for name, (field_type, persistent) in self.FIELDS.items():
+            value = defaults.get(name) if persistent else None
+            object.__setattr__(self, name, field_type(value) if value is not None else field_type())
+    
+    def __setattr__(self, name, value):
+        field = self.FIELDS.get(name)
+        if field is None:
+            raise AttributeError(f"未知的设置项: {name}")
+        value = field[0](value)
+        if getattr(self, name) == value:
+            return
+        object.__setattr__(self, name, value)
+        self._pending.add(name)
+        if self._batch_depth == 0:
+            self._notify()
+    
+    @contextmanager
+    def batch(self):
+        """
+        批量修改设置：批次中的修改在退出时统一通知，批次可以嵌套
+        
+        用法:
+            with settings.batch():
+                settings.font_size = 48
+                settings.text_color = "#ffff00"
+        """
+        object.__setattr__(self, '_batch_depth', self._batch_depth + 1)
+        try:
+            yield self
+        finally:
+            object.__setattr__(self, '_batch_depth', self._batch_depth - 1)
+            if self._batch_depth == 0:
+                self._notify()
+    
+    def update(self, values):
+        """
+        在一个批次中修改多个设置项，忽略未知的名称
+        
+        Args:
+            values: 设置项名称 -> 新值
+        """
+        with self.batch():
+            for name, value in values.items():
+                if name in self.FIELDS and value is not None:
+                    setattr(self, name, value)
+    
+    def _notify(self):
+        """发出本批次的改变通知"""
+        if not self._pending:
+            return
+        names = frozenset(self._pending)
+        self._pending.clear()
+        for name in self.FIELDS:
+            if name in names:
+                getattr(self.signals, name + "_changed").emit(getattr(self, name))
+        self.signals.changed.emit(names)
+    
+    def notify_all(self):
+        """把所有设置项作为一个批次通知一次，用于初次应用到窗口"""
+        self._pending.update(self.FIELDS)
+        if self._batch_depth == 0:
+            self._notify()
+    
+    def load(self, config_manager):
+        """从配置管理器读取保存到配置文件的设置项，只通知改变的项"""
+        self.update({name: config_manager.config.get(name)
+                     for name, (_, persistent) in self.FIELDS.items() if persistent})
+    
+    def save(self, config_manager):
+        """把设置项写入配置管理器，合并为一次写入"""
+        with config_manager.transaction():
+            for name, (_, persistent) in self.FIELDS.items():
+                if persistent:
+                    config_manager.set(name, getattr(self, name))
+    
+    def to_dict(self):
+        """获取所有设置项的字典"""
+        return {name: getattr(self, name) for name in self.FIELDS}
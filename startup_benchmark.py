@@ -0,0 +1,225 @@
+"""
+启动性能测试：在离屏模式下启动提词器，记录各模块的导入用时和启动各阶段的用时，结果保存为JSON
+
+用法:
+    python startup_benchmark.py -o startup.json --runs 5 --file 示例脚本.txt
+    main.exe --benchmark-startup -o startup.json   （PyInstaller打包后的程序）
+
+每次测量在新的进程中进行，模块导入和首帧都是冷启动；结果包含每次测量的数据和各项的中位数。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import importlib
+
+# 必须在导入PyQt5之前设置，测试时不显示窗口
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+START_TIME = time.perf_counter()  # 测试进程开始计时的时间
+
+# 按依赖顺序导入，每个模块的用时只包含它自身和尚未导入的依赖
+IMPORT_ORDER = (
+    "PyQt5.QtCore",
+    "PyQt5.QtGui",
+    "PyQt5.QtWidgets",
+    "config_manager",
+    "settings",
+    "layout_cache",
+    "text_display",
+    "frame_clock",
+    "text_processor",
+    "parse_cache",
+    "dynamic_editor",
+    "main_window",
+    "control_panel",
+    "main",
+)
+TIMEOUT = 30.0  # 等待启动完成的最长时间（秒）
+
+def elapsed_ms(start):
+    """从start到现在的用时（毫秒）"""
+    return (time.perf_counter() - start) * 1000
+
+def entry_module():
+    """从main.py启动时（含打包后的程序）主程序模块是__main__，否则返回None"""
+    module = sys.modules.get("__main__")
+    return module if hasattr(module, "MainApp") else None
+
+def measure_imports():
+    """
+    按IMPORT_ORDER依次导入模块并计时
+    
+    Returns:
+        模块名 -> 导入用时（毫秒），已经导入的模块为0
+    """
+    imports = {}
+    for name in IMPORT_ORDER:
+        if name == "main" and entry_module() is not None:
+            # 主程序已经作为__main__运行，它导入的模块在测试开始前都已导入
+            imports[name] = 0.0
+            continue
+        start = time.perf_counter()
+        importlib.import_module(name)
+        imports[name] = elapsed_ms(start)
+    return imports
+
+def measure_startup():
+    """
+    在当前进程中启动提词器，等待首帧显示和恢复上次打开的文件后退出
+    
+    Returns:
+        各阶段从测试进程开始计时的用时（毫秒）
+    """
+    from PyQt5.QtCore import QTimer
+    module = entry_module() or importlib.import_module("main")
+    MainApp = module.MainApp
+    
+    construct_start = elapsed_ms(START_TIME)
+    app = MainApp()
+    # 与MainApp.start()相同的启动步骤，只是不进入会退出进程的事件循环
+    app.initialize_components()
+    app.main_window.show()
+    app.control_panel.show()
+    
+    deadline = time.perf_counter() + TIMEOUT
+    poll_timer = QTimer()
+    poll_timer.setInterval(5)
+    def check_done():
+        if app.first_frame_done or time.perf_counter() > deadline:
+            app.app.quit()
+    poll_timer.timeout.connect(check_done)
+    poll_timer.start()
+    app.app.exec_()
+    poll_timer.stop()
+    app.config_manager.close()
+    
+    stats = app.get_startup_stats()
+    result = {"construct_start_ms": construct_start, "completed": app.first_frame_done}
+    for key, value in stats.items():
+        # MainApp从开始构造时计时，换算为从测试进程开始计时
+        result[key] = construct_start + value
+    result["paragraphs"] = len(app.text_processor.paragraphs)
+    return result
+
+def run_single(script_file=None):
+    """
+    在临时目录中测量一次启动，不读写当前目录的配置文件和解析缓存
+    
+    Args:
+        script_file: 作为上次打开的文件恢复的脚本，None表示不恢复文件
+    
+    Returns:
+        本次测量结果的字典
+    """
+    work_dir = tempfile.mkdtemp(prefix="startup_benchmark_")
+    cwd = os.getcwd()
+    try:
+        if script_file:
+            config = {"last_opened_file": os.path.abspath(script_file)}
+            with open(os.path.join(work_dir, "config.json"), 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False)
+        os.chdir(work_dir)
+        result = {"imports_ms": measure_imports()}
+        result["imports_total_ms"] = sum(result["imports_ms"].values())
+        result["startup_ms"] = measure_startup()
+        return result
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def child_command(args):
+    """启动一次测量子进程的命令：源码运行本脚本，打包后的程序使用--benchmark-startup参数"""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--benchmark-startup"] + args
+    return [sys.executable, os.path.abspath(__file__)] + args
+
+def median_of(runs, path):
+    """各次测量中某一项的中位数，path为嵌套字典的键序列"""
+    values = []
+    for run in runs:
+        value = run
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values.append(value)
+    return statistics.median(values) if values else None
+
+def summarize(runs):
+    """计算各项用时的中位数"""
+    summary = {"process_ms": median_of(runs, ("process_ms",)),
+               "imports_total_ms": median_of(runs, ("imports_total_ms",)),
+               "imports_ms": {}, "startup_ms": {}}
+    for name in IMPORT_ORDER:
+        summary["imports_ms"][name] = median_of(runs, ("imports_ms", name))
+    for key in ("construct_start_ms", "app_created_ms", "config_load_ms", "construct_ms", "first_frame_ms", "restore_ms"):
+        summary["startup_ms"][key] = median_of(runs, ("startup_ms", key))
+    return summary
+
+def main(argv=None):
+    """命令行入口，返回进程退出码"""
+    parser = argparse.ArgumentParser(description="提词器启动性能测试")
+    parser.add_argument("-o", "--output", default="startup_benchmark.json", help="结果JSON文件")
+    parser.add_argument("--runs", type=int, default=5, help="测量次数，每次在新进程中冷启动")
+    parser.add_argument("--file", help="作为上次打开的文件恢复的脚本")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)  # 子进程：只测量一次
+    args = parser.parse_args(argv)
+    
+    if args.single:
+        result = run_single(args.file)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        return 0 if result["startup_ms"]["completed"] else 1
+    
+    runs = []
+    for _ in range(max(1, args.runs)):
+        fd, run_output = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        child_args = ["--single", "-o", run_output]
+        if args.file:
+            child_args += ["--file", args.file]
+        start = time.perf_counter()
+        completed = subprocess.run(child_command(child_args), stdout=subprocess.DEVNULL)
+        process_ms = elapsed_ms(start)
+        try:
+            with open(run_output, 'r', encoding='utf-8') as f:
+                run = json.load(f)
+        except (OSError, ValueError):
+            run = {}
+        finally:
+            os.remove(run_output)
+        run["process_ms"] = process_ms
+        run["returncode"] = completed.returncode
+        runs.append(run)
+    
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "script_file": args.file,
+        "runs": runs,
+        "median": summarize(runs),
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    
+    median = report["median"]
+    print(f"启动用时中位数（{len(runs)}次）: 进程 {median['process_ms']:.0f} ms，"
+          f"导入 {median['imports_total_ms'] or 0:.0f} ms，"
+          f"首帧 {median['startup_ms']['first_frame_ms'] or 0:.0f} ms，"
+          f"恢复文件 {median['startup_ms']['restore_ms'] or 0:.0f} ms")
+    print(f"结果已保存到 {args.output}")
+    return 0 if all(run["returncode"] == 0 for run in runs) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtTest import QTest
+from config_manager import ConfigManager
+
+class TestConfigManager(unittest.TestCase):
+    """测试ConfigManager模块的功能"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境"""
+        cls.app = QApplication(sys.argv) if not QApplication.instance() else QApplication.instance()
+
+    def setUp(self):
+        """创建测试对象"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+        self.config_manager = ConfigManager(self.config_file)
+        self.initial_writes = self.config_manager.write_count
+
+    def tearDown(self):
+        """清理测试文件"""
+        self.config_manager.close()
+        self.temp_dir.cleanup()
+
+    def read_file(self):
+        """读取配置文件内容"""
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_set_coalesces_writes(self):
+        """测试连续修改合并为一次写入"""
+        for x in range(100):
+            self.config_manager.set("main_window.x", x)
+        self.assertEqual(self.config_manager.write_count, self.initial_writes)
+
+        # 等待合并写入的计时器触发
+        QTest.qWait(ConfigManager.FLUSH_DELAY + 200)
+        self.config_manager.close()
+        self.assertEqual(self.config_manager.write_count, self.initial_writes + 1)
+        self.assertEqual(self.read_file()["main_window"]["x"], 99)
+
+    def test_unchanged_value_not_written(self):
+        """测试设置相同的值不会触发写入"""
+        self.config_manager.set("font_size", self.config_manager.get("font_size"))
+        self.assertFalse(self.config_manager.dirty)
+        self.config_manager.close()
+        self.assertEqual(self.config_manager.write_count, self.initial_writes)
+
+    def test_transaction_defers_write(self):
+        """测试事务中的修改在退出时才安排写入"""
+        with self.config_manager.transaction():
+            self.config_manager.set("main_window.width", 1024)
+            with self.config_manager.transaction():
+                self.config_manager.set("main_window.height", 768)
+            self.assertFalse(self.config_manager.flush_timer.isActive())
+        self.assertTrue(self.config_manager.flush_timer.isActive())
+
+        self.config_manager.close()
+        self.assertEqual(self.config_manager.write_count, self.initial_writes + 1)
+        saved = self.read_file()
+        self.assertEqual(saved["main_window"]["width"], 1024)
+        self.assertEqual(saved["main_window"]["height"], 768)
+
+    def test_save_config_is_atomic(self):
+        """测试立即保存写出完整的配置文件且不留下临时文件"""
+        self.config_manager.set("text_color", "#00ff00")
+        self.config_manager.save_config()
+        self.assertFalse(self.config_manager.dirty)
+        self.assertFalse(os.path.exists(self.config_file + ".tmp"))
+        self.assertEqual(self.read_file()["text_color"], "#00ff00")
+
+    def test_close_persists_pending_changes(self):
+        """测试退出前写入尚未保存的修改"""
+        self.config_manager.set("scroll_speed", 1500)
+        self.config_manager.close()
+        self.assertEqual(ConfigManager(self.config_file).get("scroll_speed"), 1500)
+
+    def test_apply_preset_single_write(self):
+        """测试切换外观预设合并为一次写入"""
+        self.config_manager.set("font_size", 60)
+        self.config_manager.set("main_window.width", 1200)
+        self.config_manager.save_preset("camera", self.config_manager.capture_preset())
+        self.config_manager.set("font_size", 36)
+        self.config_manager.set("main_window.width", 800)
+        self.config_manager.close()
+        writes = self.config_manager.write_count
+
+        preset = self.config_manager.apply_preset("camera")
+        self.assertEqual(preset["font_size"], 60)
+        self.assertEqual(self.config_manager.get("main_window.width"), 1200)
+        self.assertEqual(self.config_manager.get("current_preset"), "camera")
+        self.config_manager.close()
+        self.assertEqual(self.config_manager.write_count, writes + 1)
+        self.assertIsNone(self.config_manager.apply_preset("missing"))
+
+    def test_reset_keeps_presets(self):
+        """测试重置配置时保留外观预设"""
+        self.config_manager.save_preset("camera", self.config_manager.capture_preset())
+        self.config_manager.set("current_preset", "camera")
+        self.config_manager.set("font_size", 60)
+        self.config_manager.reset()
+        self.assertEqual(self.config_manager.get("font_size"), 36)
+        self.assertEqual(self.config_manager.preset_names(), ["camera"])
+        self.assertEqual(self.config_manager.get("current_preset"), "camera")
+        self.assertIn("camera", self.read_file()["presets"])
+
+    def test_default_config_not_modified(self):
+        """测试修改嵌套配置不会改动默认配置"""
+        self.config_manager.set("main_window.x", 300)
+        self.assertEqual(self.config_manager.default_config["main_window"]["x"], 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import sys
 import os
 import unittest
 from PyQt5.QtWidgets import QApplication, QTextBrowser
+from PyQt5.QtTest import QTest
 from main_window import MainDisplayWindow
 from dynamic_editor import DynamicEditor
 
@@ -25,7 +26,7 @@ class TestDynamicEditor(unittest.TestCase):
         self.main_window.set_text(test_text)
         
         # 模拟滚动到某个位置
-        scroll_bar = self.main_window.text_browser.verticalScrollBar()
+        scroll_bar = self.main_window.text_display.verticalScrollBar()
         scroll_bar.setValue(scroll_bar.maximum() // 2)
         self.main_window.scroll_position = 500
         self.main_window.is_scrolling = True
@@ -50,7 +51,7 @@ class TestDynamicEditor(unittest.TestCase):
         
         # 验证恢复结果
         self.assertTrue(restored)
-        new_scroll_bar = self.main_window.text_browser.verticalScrollBar()
+        new_scroll_bar = self.main_window.text_display.verticalScrollBar()
         
         # 验证滚动位置是否基于百分比正确恢复（不受文本长度变化影响）
         expected_value = int(saved_state['scroll_percentage'] * new_scroll_bar.maximum())
@@ -66,7 +67,7 @@ class TestDynamicEditor(unittest.TestCase):
         self.main_window.set_text(test_text)
         
         # 模拟滚动到某个位置
-        scroll_bar = self.main_window.text_browser.verticalScrollBar()
+        scroll_bar = self.main_window.text_display.verticalScrollBar()
         scroll_bar.setValue(scroll_bar.maximum() // 2)
         
         # 保存滚动位置
@@ -84,7 +85,7 @@ class TestDynamicEditor(unittest.TestCase):
         test_text = "\n".join([f"测试行{i}" for i in range(50)])
         self.main_window.set_text(test_text)
         
-        scroll_bar = self.main_window.text_browser.verticalScrollBar()
+        scroll_bar = self.main_window.text_display.verticalScrollBar()
         scroll_bar.setValue(scroll_bar.maximum() // 2)
         
         # 保存滚动位置
@@ -117,7 +118,7 @@ class TestDynamicEditor(unittest.TestCase):
         for i, state in enumerate(scroll_states):
             # 设置滚动状态
             self.dynamic_editor.set_current_paragraph(i)
-            self.main_window.text_browser.verticalScrollBar().setValue(state['scroll_bar_value'])
+            self.main_window.text_display.verticalScrollBar().setValue(state['scroll_bar_value'])
             self.main_window.scroll_position = state['scroll_position']
             self.main_window.is_scrolling = state['is_scrolling']
             
@@ -135,6 +136,30 @@ class TestDynamicEditor(unittest.TestCase):
             self.assertEqual(saved_state['scroll_position'], state['scroll_position'])
             self.assertEqual(saved_state['is_scrolling'], state['is_scrolling'])
     
+    def test_text_change_coalescing(self):
+        """测试连续编辑合并为一次文本更新，并记录编辑到显示的延迟"""
+        updates = []
+        self.dynamic_editor.text_update_requested.connect(lambda: updates.append(True))
+        self.dynamic_editor.set_coalesce_interval(20)
+        
+        # 一个时间窗口内的多次编辑只触发一次更新
+        for _ in range(10):
+            self.dynamic_editor.schedule_text_change()
+        QTest.qWait(60)
+        self.assertEqual(len(updates), 1)
+        
+        self.dynamic_editor.mark_displayed()
+        stats = self.dynamic_editor.get_latency_stats()
+        self.assertEqual(stats['edit_count'], 10)
+        self.assertEqual(stats['update_count'], 1)
+        self.assertGreaterEqual(stats['last_latency'], 15)
+        
+        # 取消后不再触发更新
+        self.dynamic_editor.schedule_text_change()
+        self.dynamic_editor.cancel_pending_text_change()
+        QTest.qWait(40)
+        self.assertEqual(len(updates), 1)
+    
     def tearDown(self):
         """清理测试对象"""
         self.main_window.close()
@@ -0,0 +1,65 @@
+import sys
+import unittest
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QPixmap
+from PyQt5.QtWidgets import QApplication
+from layout_cache import LayoutCache, TileCache
+
+class TestLayoutCache(unittest.TestCase):
+    """测试LayoutCache模块的功能"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境"""
+        cls.app = QApplication(sys.argv) if not QApplication.instance() else QApplication.instance()
+
+    def setUp(self):
+        """创建测试对象"""
+        self.font = QFont()
+        self.font.setPointSize(36)
+
+    def get_entry(self, cache, text):
+        """按固定的字体和行宽获取排版结果"""
+        return cache.get(text, self.font, 400, 1.0, Qt.AlignLeft)
+
+    def test_tile_cache_evicts_by_bytes(self):
+        """测试条带缓存按总字节数淘汰最久未使用的条带"""
+        tile_bytes = 100 * 100 * 4
+        tiles = TileCache(max_bytes=3 * tile_bytes)
+        entry = self.get_entry(LayoutCache(), "第一段")
+        render = lambda entry, index: QPixmap(100, 100)
+        colors = (0, 1)
+        for index in range(3):
+            tiles.get(entry, index, colors, 1.0, render)
+        # 使用条带0后，最久未使用的是条带1
+        tiles.get(entry, 0, colors, 1.0, render)
+        tiles.get(entry, 3, colors, 1.0, render)
+
+        self.assertEqual(tiles.get_stats(), {'hits': 1, 'misses': 4, 'tiles': 3, 'bytes': 3 * tile_bytes})
+        self.assertEqual([key[1] for key in tiles.tiles], [2, 0, 3])
+
+    def test_pixmap_budget(self):
+        """测试整段位图按总字节数释放最久未使用的位图，条目本身保留"""
+        pixmap_bytes = 100 * 100 * 4
+        cache = LayoutCache(max_entries=8, max_pixmap_bytes=2 * pixmap_bytes)
+        colors = (0, 1)
+        entries = [self.get_entry(cache, f"第{index}段") for index in range(3)]
+        cache.store_pixmap(entries[0], QPixmap(100, 100), colors)
+        cache.store_pixmap(entries[1], QPixmap(100, 100), colors)
+        self.assertIsNotNone(cache.get_pixmap(entries[0], colors))
+        self.assertIsNone(cache.get_pixmap(entries[0], (0, 2)))
+        cache.store_pixmap(entries[2], QPixmap(100, 100), colors)
+
+        self.assertIsNone(entries[1].pixmap)
+        self.assertIsNotNone(entries[0].pixmap)
+        self.assertEqual(cache.get_stats()['pixmap_bytes'], 2 * pixmap_bytes)
+        self.assertEqual(cache.get_stats()['entries'], 3)
+
+        # 淘汰条目时一同释放它的位图
+        cache.max_entries = 1
+        self.get_entry(cache, "第三段")
+        self.assertIsNone(entries[2].pixmap)
+        self.assertEqual(cache.pixmap_bytes, 0)
+
+if __name__ == "__main__":
+    unittest.main()
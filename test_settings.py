@@ -0,0 +1,71 @@
+import sys
+import os
+import tempfile
+import unittest
+from PyQt5.QtWidgets import QApplication
+from config_manager import ConfigManager
+from settings import Settings
+
+class TestSettings(unittest.TestCase):
+    """测试Settings模块的功能"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境"""
+        cls.app = QApplication(sys.argv) if not QApplication.instance() else QApplication.instance()
+
+    def setUp(self):
+        """创建测试对象"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_manager = ConfigManager(os.path.join(self.temp_dir.name, "config.json"))
+        self.settings = Settings(self.config_manager.default_config)
+        self.batches = []
+        self.font_sizes = []
+        self.settings.signals.changed.connect(self.batches.append)
+        self.settings.signals.font_size_changed.connect(self.font_sizes.append)
+
+    def tearDown(self):
+        """清理测试文件"""
+        self.config_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_typed_attributes(self):
+        """测试设置项按类型保存，未知的设置项不能赋值"""
+        self.settings.font_size = "48"
+        self.assertEqual(self.settings.font_size, 48)
+        self.assertEqual(self.font_sizes, [48])
+        with self.assertRaises(AttributeError):
+            self.settings.font_sise = 48
+        self.assertFalse(hasattr(self.settings, '__dict__'))
+
+    def test_unchanged_value_not_notified(self):
+        """测试值没有变化时不发出通知"""
+        self.settings.font_size = self.settings.font_size
+        self.assertEqual(self.batches, [])
+
+    def test_batch_notifies_once(self):
+        """测试批次中的多次修改只通知一次，并且使用最终的值"""
+        with self.settings.batch():
+            for size in range(40, 60):
+                self.settings.font_size = size
+            self.settings.text_color = "#ffff00"
+            self.assertEqual(self.batches, [])
+        self.assertEqual(self.batches, [frozenset({"font_size", "text_color"})])
+        self.assertEqual(self.font_sizes, [59])
+
+    def test_load_and_save(self):
+        """测试从配置读取和写回配置"""
+        self.config_manager.set("display_mode", "continuous")
+        self.settings.load(self.config_manager)
+        self.assertEqual(self.settings.display_mode, "continuous")
+        self.assertEqual(self.batches, [frozenset({"display_mode"})])
+
+        self.settings.main_window_rotation = 180
+        self.settings.secondary_screen_enabled = True
+        self.settings.save(self.config_manager)
+        self.assertEqual(self.config_manager.get("main_window_rotation"), 180)
+        # 运行时设置项不保存到配置文件
+        self.assertIsNone(self.config_manager.get("secondary_screen_enabled"))
+
+if __name__ == "__main__":
+    unittest.main()
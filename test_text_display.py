@@ -0,0 +1,125 @@
+import sys
+import math
+import unittest
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtTest import QTest
+from layout_cache import LayoutCache
+from text_display import TextDisplay
+
+class TestTextDisplay(unittest.TestCase):
+    """测试TextDisplay模块的功能"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境"""
+        cls.app = QApplication(sys.argv) if not QApplication.instance() else QApplication.instance()
+
+    def setUp(self):
+        """创建测试对象"""
+        self.font = QFont()
+        self.font.setPointSize(30)
+        self.display = self.create_display()
+
+    def tearDown(self):
+        """关闭测试窗口"""
+        self.display.close()
+
+    def create_display(self, layout_cache=None):
+        """创建固定大小的显示组件"""
+        display = TextDisplay(layout_cache=layout_cache)
+        display.resize(800, 600)
+        display.setFont(self.font)
+        return display
+
+    def block_positions(self):
+        """连续模式：按段落高度从头累加得到的与视口相交的段落位置"""
+        heights = self.display._heights
+        y = -self.display.scroll_offset - sum(heights[:self.display._anchor])
+        positions = []
+        for height in heights:
+            if y + height > 0 and y < self.display.height():
+                positions.append(y)
+            y += height
+        return positions
+
+    def test_shared_layout_cache(self):
+        """测试共享排版缓存的两个输出窗口同一段落只排版一次"""
+        cache = LayoutCache()
+        displays = [self.create_display(cache), self.create_display(cache)]
+        misses, hits = cache.misses, cache.hits
+        for display in displays:
+            display.setPlainText("第一段文字" * 20)
+        self.assertEqual((cache.misses - misses, cache.hits - hits), (1, 1))
+
+        # 切换到新段落再切换回来：新段落只排版一次，原段落从缓存中取出
+        displays[0].setPlainText("第二段文字")
+        displays[1].setPlainText("第二段文字")
+        for display in displays:
+            display.setPlainText("第一段文字" * 20)
+        self.assertEqual((cache.misses - misses, cache.hits - hits), (2, 4))
+        self.assertIs(displays[0]._entry, displays[1]._entry)
+        for display in displays:
+            display.close()
+
+    def test_continuous_virtualization(self):
+        """测试连续模式只保留视口附近的段落，远离锚点滚动时位置与逐段累加一致"""
+        paragraphs = [f"段落{index} " + "文字" * (index % 50 + 5) for index in range(3000)]
+        self.display.set_paragraphs(paragraphs)
+        self.display.set_anchor(10)
+        offset = 0.0
+        while offset < 20000:
+            offset += 37.5
+            self.display.set_scroll_offset(offset)
+            self.assertEqual([y for y, _ in self.display._visible_blocks()], self.block_positions())
+        self.assertLess(len(self.display._blocks), 20)
+
+        self.display.set_scroll_offset(200000)
+        visible = self.display._visible_blocks()
+        self.assertEqual([y for y, _ in visible], self.block_positions())
+        self.assertLess(len(self.display._blocks), 20)
+        self.assertAlmostEqual(self.display.content_height(), sum(self.display._heights))
+        self.assertEqual(self.display.verticalScrollBar().minimum(),
+                         -math.ceil(sum(self.display._heights[:10])))
+
+    def test_insert_and_remove_paragraphs(self):
+        """测试插入和删除段落时高度数组同步增删，总高度和可滚动范围随之更新"""
+        paragraphs = [f"段落{index}" for index in range(100)]
+        self.display.set_paragraphs(paragraphs)
+        self.display.set_anchor(50)
+        height = self.display.paragraph_height(20)
+
+        paragraphs[20:20] = ["插入" * 200, "插入"]
+        self.display.insert_paragraphs(20, 2)
+        self.assertEqual(len(self.display._heights), 102)
+        self.assertEqual(self.display._heights[22], height)
+        self.assertAlmostEqual(self.display.content_height(), sum(self.display._heights))
+        self.assertEqual(self.display.verticalScrollBar().minimum(),
+                         -math.ceil(sum(self.display._heights[:50])))
+
+        del paragraphs[20:22]
+        self.display.remove_paragraphs(20, 2)
+        self.assertEqual(len(self.display._heights), 100)
+        self.assertEqual(self.display._heights[20], height)
+        self.assertAlmostEqual(self.display.content_height(), sum(self.display._heights))
+
+    def test_resize_drag_relayouts_once(self):
+        """测试拖动改变宽度期间不重新排版，停止改变后只按最终宽度排版一次"""
+        self.display.setPlainText("一段需要换行的文字" * 50)
+        self.display.show()
+        QTest.qWaitForWindowExposed(self.display)
+        misses = self.display.layout_cache.misses
+
+        # 模拟40步拖动，每步都绘制一次（缩放已有位图）
+        for step in range(40):
+            self.display.resize(800 - step * 10, 600)
+            self.display.grab()
+        self.assertEqual(self.display.layout_cache.misses, misses)
+
+        QTest.qWait(TextDisplay.RELAYOUT_DELAY + 100)
+        self.display.grab()
+        self.assertEqual(self.display.layout_cache.misses, misses + 1)
+        self.assertEqual(self.display._layout_width, 410)
+
+if __name__ == "__main__":
+    unittest.main()
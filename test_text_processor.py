@@ -0,0 +1,373 @@
+import sys
+import os
+import random
+import tempfile
+import unittest
+from PyQt5.QtWidgets import QApplication, QTextEdit
+from text_processor import ParagraphTable, TextProcessor
+from parse_cache import ParseCache
+
+class ManualClock:
+    """手动推进的时钟，接口与QElapsedTimer相同"""
+
+    def __init__(self):
+        self.now_ns = 0
+        self.start_ns = 0
+
+    def restart(self):
+        self.start_ns = self.now_ns
+
+    def nsecsElapsed(self):
+        return self.now_ns - self.start_ns
+
+    def advance(self, ms):
+        """时钟前进ms毫秒"""
+        self.now_ns += ms * 1000000
+
+class TestTextProcessor(unittest.TestCase):
+    """测试TextProcessor模块的功能"""
+
+    @classmethod
+    def setUpClass(cls):
+        """设置测试环境"""
+        cls.app = QApplication(sys.argv) if not QApplication.instance() else QApplication.instance()
+
+    def setUp(self):
+        """创建测试对象"""
+        self.text_processor = TextProcessor()
+
+    def full_parse(self, text):
+        """使用完整解析得到段落和持续时间，作为增量解析的对照"""
+        reference = TextProcessor()
+        reference.set_text(text)
+        return list(reference.paragraphs), reference.paragraph_durations
+
+    def test_parse_paragraphs(self):
+        """测试段落标识的识别和分段"""
+        self.text_processor.set_text("开场白\n({0:30})\n第一段\n({1:05})\n\n({0:10})\n第三段  ")
+
+        self.assertEqual(list(self.text_processor.paragraphs), ["开场白", "第一段", "第三段"])
+        self.assertEqual(self.text_processor.paragraph_durations, {1: 30, 2: 10})
+
+    def test_paragraph_table(self):
+        """测试段落表只保存位置，段落文本按需截取"""
+        text = "开场白\n({0:30})\n第一段"
+        self.text_processor.set_text(text)
+
+        self.assertEqual(len(self.text_processor.paragraphs), 2)
+        self.assertEqual(self.text_processor.paragraphs[-1], "第一段")
+        self.assertEqual(self.text_processor.get_paragraph_duration(0), None)
+        self.assertEqual(self.text_processor.get_paragraph_duration(1), 30)
+        self.text_processor.set_current_paragraph(1)
+        self.assertEqual(self.text_processor.get_current_paragraph(), "第一段")
+
+    def test_paragraph_at(self):
+        """测试字符位置到段落索引的映射"""
+        text = "开场白\n({0:30})\n第一段\n({0:10})\n第二段"
+        self.text_processor.set_text(text)
+
+        self.assertEqual(self.text_processor.paragraph_at(0), 0)
+        self.assertEqual(self.text_processor.paragraph_at(text.index("开场白") + 3), 0)
+        # 段落标识归属于其后的段落
+        self.assertEqual(self.text_processor.paragraph_at(text.index("({0:30})")), 1)
+        self.assertEqual(self.text_processor.paragraph_at(text.index("第一段") + 1), 1)
+        self.assertEqual(self.text_processor.paragraph_at(text.index("第二段")), 2)
+        self.assertEqual(self.text_processor.paragraph_at(len(text) + 10), 2)
+
+        # 包含BMP以外字符时按UTF-16位置换算
+        text = "😀😀\n({0:30})\n第一段"
+        self.text_processor.set_text(text)
+        self.assertEqual(self.text_processor.paragraph_at_document_position(len("😀😀\n({0:30})\n") + 2), 1)
+
+    def test_incremental_edit_matches_full_parse(self):
+        """测试增量解析的结果与完整解析一致"""
+        rng = random.Random(7)
+        alphabet = ["a", "段", " ", "\n", "({", "1:0", "})", "({0:05})\n", "({2:30})"]
+        text = "".join(rng.choice(alphabet) for _ in range(200))
+        self.text_processor.set_text(text)
+
+        for _ in range(300):
+            position = rng.randint(0, len(text))
+            removed = rng.randint(0, min(5, len(text) - position))
+            inserted = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+            text = text[:position] + inserted + text[position + removed:]
+
+            self.text_processor.note_contents_change(position, removed, len(inserted))
+            self.text_processor.set_text(text)
+
+            paragraphs, durations = self.full_parse(text)
+            self.assertEqual(list(self.text_processor.paragraphs), paragraphs)
+            self.assertEqual(self.text_processor.paragraph_durations, durations)
+
+    def test_paragraph_delta_signals(self):
+        """测试只根据增量信号维护的段落列表与实际段落一致"""
+        mirror = [""]
+
+        def on_inserted(start, count):
+            mirror[start:start] = [self.text_processor.paragraphs[start + i] for i in range(count)]
+
+        def on_removed(start, count):
+            del mirror[start:start + count]
+
+        def on_changed(index):
+            mirror[index] = self.text_processor.paragraphs[index]
+
+        # 修改的段落索引都在插入、删除位置之前，新旧列表中的索引一致
+        self.text_processor.paragraph_changed.connect(on_changed)
+        self.text_processor.paragraphs_inserted.connect(on_inserted)
+        self.text_processor.paragraphs_removed.connect(on_removed)
+
+        rng = random.Random(11)
+        alphabet = ["a", "段", "\n", "({0:05})\n", "({1:00})"]
+        text = ""
+        for step in range(200):
+            position = rng.randint(0, len(text))
+            removed = rng.randint(0, min(4, len(text) - position))
+            inserted = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+            text = text[:position] + inserted + text[position + removed:]
+            # 偶尔走完整解析
+            if step % 17:
+                self.text_processor.note_contents_change(position, removed, len(inserted))
+            self.text_processor.set_text(text)
+            self.assertEqual(mirror, list(self.text_processor.paragraphs))
+
+        self.text_processor.clear()
+        self.assertEqual(mirror, [""])
+
+    def test_full_parse_emits_minimal_delta(self):
+        """测试完整解析只对有变化的段落发出信号，开头插入一段只发出一次插入"""
+        text = "".join(f"({{0:05}})\n第{index}段\n" for index in range(2000))
+        self.text_processor.set_text(text)
+        changed = []
+        inserted = []
+        self.text_processor.paragraph_changed.connect(changed.append)
+        self.text_processor.paragraphs_inserted.connect(lambda start, count: inserted.append((start, count)))
+
+        self.text_processor.set_text("({0:05})\n新段落\n" + text)
+        self.assertEqual(changed, [])
+        self.assertEqual(inserted, [(0, 1)])
+
+    def test_timeline(self):
+        """测试时间轴前缀和、按时间跳转以及编辑后的增量更新"""
+        text = "开场白\n({0:30})\n第一段\n({1:00})\n第二段"
+        self.text_processor.set_text(text)
+        self.text_processor.set_paragraph_duration(10)
+        self.text_processor.set_time_control_mode("local")
+
+        self.assertEqual(self.text_processor.get_total_time(), 100)
+        self.assertEqual(self.text_processor.get_paragraph_start_time(2), 40)
+        self.assertEqual(self.text_processor.paragraph_at_time(39), 1)
+        self.assertTrue(self.text_processor.seek_to_time("0:00:45"))
+        self.assertEqual(self.text_processor.current_paragraph_index, 2)
+        self.assertEqual(self.text_processor.get_remaining_time(), 60)
+        self.assertAlmostEqual(self.text_processor.get_time_progress(), 0.4)
+        self.assertFalse(self.text_processor.seek_to_time("abc"))
+
+        # 修改第一段的时间只重新累加之后的段落
+        position = text.index("0:30")
+        self.text_processor.note_contents_change(position + 2, 2, 2)
+        self.text_processor.set_text(text.replace("0:30", "0:45"))
+        self.assertEqual(self.text_processor.get_total_time(), 115)
+        self.assertEqual(self.text_processor.get_paragraph_start_time(2), 55)
+
+        self.text_processor.set_time_control_mode("global")
+        self.assertEqual(self.text_processor.get_total_time(), 30)
+
+    def test_drift_free_schedule(self):
+        """测试自动跳转按时间轴计算截止时间，晚到的时间不顺延到下一段"""
+        self.clock = ManualClock()
+        self.text_processor = TextProcessor(self.clock)
+        self.text_processor.set_text("第一段\n({0:01})\n第二段\n({0:01})\n第三段")
+        self.text_processor.set_time_control_mode("local")
+        self.text_processor.set_paragraph_duration(1)
+        self.text_processor.start_auto_play()
+
+        self.assertEqual(self.text_processor.paragraph_timer.interval(), 1000)
+
+        # 第一次跳转晚到300毫秒
+        self.clock.advance(1300)
+        self.text_processor.auto_next_paragraph()
+        self.assertEqual(self.text_processor.current_paragraph_index, 1)
+        self.assertEqual(self.text_processor.get_lateness_stats()['last_lateness'], 300)
+        # 下一次截止时间仍在时钟起点后2秒，只需再等700毫秒
+        self.assertEqual(self.text_processor._next_deadline_ms, 2000)
+        self.assertEqual(self.text_processor.paragraph_timer.interval(), 700)
+        self.assertEqual(self.text_processor.get_elapsed_time(), 1.3)
+
+        # 定时器提前唤醒时继续等待剩余的时间，不跳转
+        self.clock.advance(100)
+        self.text_processor.auto_next_paragraph()
+        self.assertEqual(self.text_processor.current_paragraph_index, 1)
+        self.assertEqual(self.text_processor.paragraph_timer.interval(), 600)
+
+        # 暂停和继续保留本段已停留的时间
+        self.text_processor.stop_auto_play()
+        self.assertEqual(self.text_processor.get_paragraph_elapsed_ms(), 400)
+        self.clock.advance(5000)
+        self.text_processor.start_auto_play()
+        self.assertEqual(self.text_processor.get_paragraph_elapsed_ms(), 400)
+        self.assertEqual(self.text_processor.paragraph_timer.interval(), 600)
+        self.text_processor.stop_auto_play()
+
+    def test_merged_changes(self):
+        """测试多次内容变化合并后再解析"""
+        text = "第一段\n({0:30})\n第二段"
+        self.text_processor.set_text(text)
+
+        # 在末尾追加，再在开头删除两个字符
+        text = text + "\n({0:05})\n第三段"
+        self.text_processor.note_contents_change(len("第一段\n({0:30})\n第二段"), 0, len("\n({0:05})\n第三段"))
+        text = text[2:]
+        self.text_processor.note_contents_change(0, 2, 0)
+        self.text_processor.set_text(text)
+
+        paragraphs, durations = self.full_parse(text)
+        self.assertEqual(list(self.text_processor.paragraphs), paragraphs)
+        self.assertEqual(self.text_processor.paragraph_durations, durations)
+
+    def test_document_contents_change(self):
+        """测试使用QTextDocument.contentsChange驱动增量解析"""
+        text_edit = QTextEdit()
+        text_edit.document().contentsChange.connect(self.text_processor.note_contents_change)
+        text_edit.textChanged.connect(lambda: self.text_processor.set_text(text_edit.toPlainText()))
+
+        text_edit.setPlainText("第一段\n({0:30})\n第二段😀\n({0:10})\n第三段")
+        cursor = text_edit.textCursor()
+        cursor.setPosition(3)
+        cursor.insertText("补充")
+        cursor.setPosition(0)
+        cursor.insertText("({0:20})")
+
+        paragraphs, durations = self.full_parse(text_edit.toPlainText())
+        self.assertEqual(list(self.text_processor.paragraphs), paragraphs)
+        self.assertEqual(self.text_processor.paragraph_durations, durations)
+
+    def test_incremental_edit_with_astral(self):
+        """测试包含BMP以外字符的文本按UTF-16位置换算后仍然增量解析"""
+        def utf16_length(value):
+            return len(value.encode('utf-16-le')) // 2
+
+        text = "😀开场白\n({0:30})\n第一段😀\n({0:10})\n第二段"
+        self.text_processor.set_text(text)
+        table = self.text_processor._table
+
+        # 在第一段的表情之后输入文字
+        position = text.index("第一段😀") + 4
+        self.text_processor.note_contents_change(utf16_length(text[:position]), 0, 2)
+        text = text[:position] + "补充" + text[position:]
+        self.text_processor.set_text(text)
+        # 插入表情，再删除开头的表情
+        position = text.index("第二段")
+        self.text_processor.note_contents_change(utf16_length(text[:position]), 0, 2)
+        text = text[:position] + "😀" + text[position:]
+        self.text_processor.set_text(text)
+        self.text_processor.note_contents_change(0, 2, 0)
+        text = text[1:]
+        self.text_processor.set_text(text)
+
+        self.assertIs(self.text_processor._table, table)
+        paragraphs, durations = self.full_parse(text)
+        self.assertEqual(list(self.text_processor.paragraphs), paragraphs)
+        self.assertEqual(list(self.text_processor.paragraphs), ["开场白", "第一段😀补充", "😀第二段"])
+        # 光标位置按UTF-16计数，表情之后的位置换算到对应的字符
+        position = utf16_length(text[:text.index("补充") + 2])
+        self.assertEqual(self.text_processor.paragraph_at_document_position(position), 1)
+        position = utf16_length(text[:text.index("第二段")])
+        self.assertEqual(self.text_processor.paragraph_at_document_position(position), 2)
+
+    def test_paragraph_table_pending_shift(self):
+        """测试替换范围之后的位置只记录待平移量，读取和查找时再加上"""
+        table = ParagraphTable()
+        for index in range(100):
+            table.append(index * 10, index * 10 + 5, None)
+        replacement = ParagraphTable()
+        replacement.append(10, 18, 30)
+
+        table.splice(1, 2, replacement, 3)
+        table.splice(1, 2, replacement, 1)
+        # 之后的段落保存的位置没有改变
+        self.assertEqual(table.starts[50], 500)
+        self.assertEqual(table.start(50), 504)
+        self.assertEqual(table.end(-1), 999)
+        self.assertEqual(table.bisect_starts(504), 50)
+        self.assertEqual(table.bisect_ends(505), 50)
+
+        # 在后面编辑时只补上两次编辑位置之间的段落
+        replacement = ParagraphTable()
+        replacement.append(604, 610, None)
+        table.splice(60, 61, replacement, 1)
+        self.assertEqual(table.rows(59, 62), [(594, 599, -1), (604, 610, -1), (615, 620, -1)])
+        self.assertEqual(table.start(0), 0)
+        self.assertEqual(table.starts[99], 990)
+
+    def test_background_parse(self):
+        """测试大文本在后台解析，且只采用最新一次解析的结果"""
+        self.text_processor.background_parse_threshold = 1000
+        stale_text = "旧文本\n({0:30})\n" * 200
+        latest_text = "新文本\n({0:10})\n" * 300
+
+        self.text_processor.set_text(stale_text)
+        self.assertTrue(self.text_processor.is_parsing())
+        self.text_processor.set_text(latest_text)
+        self.text_processor.wait_for_parse()
+
+        self.assertFalse(self.text_processor.is_parsing())
+        self.assertEqual(self.text_processor.raw_text, latest_text)
+        self.assertEqual(self.text_processor.get_total_paragraphs(), 300)
+        self.assertEqual(self.text_processor.get_paragraph_duration(1), 10)
+
+    def test_parse_cache(self):
+        """测试解析缓存命中时直接使用缓存的段落和时间轴，并按最近使用淘汰"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ParseCache(cache_dir)
+            text = "开场白\n({0:30})\n第一段😀\n({1:00})\n第二段"
+            self.text_processor.parse_cache = cache
+            self.assertFalse(self.text_processor.load_text(text))
+
+            reader = TextProcessor()
+            reader.parse_cache = cache
+            self.assertTrue(reader.load_text(text))
+            self.assertEqual(list(reader.paragraphs), list(self.text_processor.paragraphs))
+            self.assertEqual(reader.paragraph_durations, self.text_processor.paragraph_durations)
+            self.assertEqual(reader.get_total_time(), self.text_processor.get_total_time())
+            self.assertEqual(reader.paragraph_at_document_position(len("开场白\n({0:30})\n第一段😀") + 1), 1)
+
+            # 缓存命中后仍可以增量编辑
+            reader.note_contents_change(0, 0, 1)
+            reader.set_text("新" + text)
+            self.assertEqual(reader.paragraphs[0], "新开场白")
+
+            # 时间控制方式不同时重新累加时间轴
+            reader = TextProcessor()
+            reader.parse_cache = cache
+            reader.set_time_control_mode("local")
+            self.assertTrue(reader.load_text(text))
+            self.assertEqual(reader.get_total_time(), 100)
+
+        # 超过容量时淘汰最久未使用的条目
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ParseCache(cache_dir)
+            texts = ["第一个脚本", "第二个脚本", "第三个脚本"]
+            for index, text in enumerate(texts[:2]):
+                cache.store(text, reader.parse_script(text), [0, 10], "global", 10)
+                os.utime(cache._path(cache.text_key(text)), (index + 1, index + 1))
+            # 读取较早的条目，使它成为最近使用的条目
+            self.assertIsNotNone(cache.load(texts[0], "global", 10))
+            cache.max_bytes = 2 * os.path.getsize(cache._path(cache.text_key(texts[0])))
+            cache.store(texts[2], reader.parse_script(texts[2]), [0, 10], "global", 10)
+
+            self.assertIsNone(cache.load(texts[1], "global", 10))
+            self.assertIsNotNone(cache.load(texts[0], "global", 10))
+            self.assertIsNotNone(cache.load(texts[2], "global", 10))
+
+    def test_clear(self):
+        """测试清空文本"""
+        self.text_processor.set_text("第一段\n({0:30})\n第二段")
+        self.text_processor.clear()
+
+        self.assertEqual(list(self.text_processor.paragraphs), [""])
+        self.assertEqual(self.text_processor.get_total_paragraphs(), 1)
+
+if __name__ == '__main__':
+    # 运行测试
+    unittest.main()
@@ -0,0 +1,557 @@
+import math
+from array import array
+from PyQt5.QtWidgets import QWidget, QScrollBar
+from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer
+from PyQt5.QtGui import QColor, QFont, QPainter, QPixmap, QTransform
+from layout_cache import LayoutCache, TileCache
+
+class TextDisplay(QWidget):
+    """
+    自绘文本显示组件，替代QTextBrowser用于滚动显示
+    
+    文本只在内容、字体或宽度改变时用QTextLayout排版一次，排版结果再绘制到缓存位图中；
+    滚动时只按小数像素平移绘制缓存位图，不会重新排版，也不会因为取整而逐像素跳动。
+    排版结果和位图保存在LayoutCache中，多个输出窗口共享同一个缓存时同一段落只排版、绘制一次。
+    分块渲染（set_tiled）时段落切成固定高度的条带分别缓存，滚动只合成可见条带，内存占用有上限。
+    镜像和旋转（set_output_transform）只改变缓存位图绘制到窗口时的变换，不需要重新排版或重新绘制位图。
+    拖动改变窗口宽度时先把已有的位图缩放到新宽度显示，宽度稳定后才按新宽度重新排版一次。
+    
+    连续模式（set_paragraphs）下整个脚本作为一条文本带滚动：只排版与视口及上下预留范围相交的段落，
+    其余段落的高度按字数估算。滚动位置相对于锚点段落（当前段落）的顶端；绘制时从上一次视口顶端所在的段落
+    逐段移动到新的视口顶端，锚点段落和视口顶端段落的起始位置随高度改变增量更新，滚动开销与脚本长度无关。
+    向下滚动时新排版的段落都在视口下方，实际高度替换估算值不会造成画面跳动。
+    """
+    
+    PADDING = 24  # 文本四周的留白（原QTextBrowser的20像素内边距加4像素文档边距）
+    MAX_CACHE_PIXELS = 8 * 1024 * 1024  # 整段位图的最大像素数，超过时改用分块位图
+    VIRTUAL_MARGIN = 1.0  # 连续模式下视口上下预先排版的范围（视口高度的倍数）
+    RELAYOUT_DELAY = 150  # 拖动改变宽度时，停止改变多久后重新排版（毫秒）
+    
+    def __init__(self, parent=None, layout_cache=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        
+        self._text = ""
+        self._font = QFont()
+        self.background_color = QColor(0, 0, 0)
+        self.text_color = QColor(255, 255, 255)
+        self.alignment = Qt.AlignLeft
+        
+        # 排版和绘制缓存
+        self.layout_cache = layout_cache if layout_cache is not None else LayoutCache()
+        self._entry = None  # 当前文本的排版结果（TextLayoutEntry）
+        self._entry_key = None  # 排版结果对应的缓存键，文本、字体、宽度或设备像素比改变时失效
+        self._content_height = 0.0  # 文本内容（含留白）的高度
+        self._layout_width = self.width()  # 排版和位图使用的窗口宽度，拖动改变宽度时暂时与实际宽度不同
+        self.relayout_timer = QTimer(self)
+        self.relayout_timer.setSingleShot(True)
+        self.relayout_timer.setInterval(self.RELAYOUT_DELAY)
+        self.relayout_timer.timeout.connect(self._relayout)
+        self.tiled = False  # 是否使用分块位图渲染
+        
+        # 输出变换：水平镜像（分光镜提词器）和旋转180度，绘制缓存位图时应用
+        self.mirrored = False
+        self.rotation = 0
+        self._output_transform = QTransform()
+        
+        # 连续模式：段落视图为None时只显示setPlainText设置的文本
+        self._paragraphs = None  # 段落文本视图（ParagraphList）
+        self._heights = array('d')  # 每个段落块的高度（含留白），尚未排版的段落为估算值
+        self._anchor = 0  # 锚点段落索引，scroll_offset相对于锚点段落的顶端
+        self._anchor_start = 0.0  # 锚点段落顶端在整个文本带中的位置
+        self._top = 0  # 上一次绘制时视口顶端所在的段落索引
+        self._top_start = 0.0  # 视口顶端段落的顶端在整个文本带中的位置
+        self._total = 0.0  # 全部段落块的总高度
+        self._blocks = {}  # 视口附近已排版的段落：段落索引 -> TextLayoutEntry
+        self._estimate = None  # 估算段落高度用的(窄字符宽度, 宽字符宽度, 行距, 行宽)
+        
+        # 滚动位置：scroll_offset保存小数像素位置，滚动条只作为整数位置的模型（不显示）
+        self.scroll_offset = 0.0
+        self.scroll_bar = QScrollBar(Qt.Vertical, self)
+        self.scroll_bar.hide()
+        self.scroll_bar.valueChanged.connect(self._on_scroll_bar_changed)
+    
+    def verticalScrollBar(self):
+        """与QTextBrowser兼容：返回表示整数滚动位置的滚动条"""
+        return self.scroll_bar
+    
+    def setPlainText(self, text):
+        """设置显示文本（连续模式下只保存，退出连续模式后显示）"""
+        if text == self._text:
+            return
+        self._text = text
+        if self._paragraphs is None:
+            self._invalidate_layout()
+    
+    def toPlainText(self):
+        """获取显示文本"""
+        return self._text
+    
+    def setFont(self, font):
+        """设置字体，需要重新排版（字体只用于排版，不设置为部件字体，避免字体变化事件传播）"""
+        if font != self._font:
+            self._font = QFont(font)
+            self._invalidate_layout()
+    
+    def setAlignment(self, alignment):
+        """设置文本水平对齐方式"""
+        if alignment != self.alignment:
+            self.alignment = alignment
+            self._invalidate_layout()
+    
+    def set_colors(self, background_color, text_color):
+        """设置背景和文字颜色，只需要重新绘制缓存位图"""
+        if background_color == self.background_color and text_color == self.text_color:
+            return
+        self.background_color = QColor(background_color)
+        self.text_color = QColor(text_color)
+        self.update()
+    
+    def set_scroll_offset(self, offset):
+        """
+        设置滚动位置
+        
+        Args:
+            offset: 滚动距离（像素，可以是小数），超出范围时限制在可滚动范围内；
+                    连续模式下相对于锚点段落的顶端，可以为负数（显示锚点之前的段落）
+        """
+        self._ensure_layout()
+        offset = min(max(float(self.scroll_bar.minimum()), offset), float(self.scroll_bar.maximum()))
+        if offset == self.scroll_offset:
+            return
+        self.scroll_offset = offset
+        # 整数部分同步到滚动条，滚动条的槽函数据此判断不是外部设置
+        self.scroll_bar.setValue(int(offset))
+        self.update()
+    
+    def _on_scroll_bar_changed(self, value):
+        """滚动条被直接设置时，使用整数位置"""
+        if int(self.scroll_offset) != value:
+            self.scroll_offset = float(value)
+        self.update()
+    
+    def set_layout_cache(self, layout_cache):
+        """使用共享的排版缓存"""
+        self.layout_cache = layout_cache
+        self._invalidate_layout()
+    
+    def set_paragraphs(self, paragraphs):
+        """
+        进入或退出连续模式
+        
+        Args:
+            paragraphs: 段落文本视图（支持len和索引，内容变化时需调用insert_paragraphs等方法通知），
+                        为None时恢复只显示setPlainText设置的文本
+        """
+        self._paragraphs = paragraphs
+        self._anchor = 0
+        self._blocks = {}
+        self._heights = array('d')
+        self._reset_positions()
+        self._invalidate_layout()
+    
+    def is_continuous(self):
+        """是否处于连续模式"""
+        return self._paragraphs is not None
+    
+    def set_anchor(self, index):
+        """
+        连续模式：设置锚点段落，之后的滚动位置相对于该段落的顶端
+        
+        Args:
+            index: 段落索引
+        """
+        if self._paragraphs is None or index == self._anchor:
+            return
+        self._ensure_layout()
+        self._anchor = index
+        self._anchor_start = self._start_of(index)
+        self._update_scroll_range()
+        self.update()
+    
+    def paragraph_height(self, index):
+        """连续模式：排版并返回段落块的实际高度（含留白）"""
+        self._ensure_layout()
+        self._block(index)
+        return self._heights[index]
+    
+    def insert_paragraphs(self, first, count):
+        """连续模式：在first处插入了count个段落，按估算高度加入"""
+        if self._paragraphs is None or self._estimate is None:
+            return
+        self._heights[first:first] = array('d', (self._estimate_height(self._paragraphs[index])
+                                                 for index in range(first, first + count)))
+        self._blocks = {}
+        self._reset_positions()
+        self._update_scroll_range()
+        self.update()
+    
+    def remove_paragraphs(self, first, count):
+        """连续模式：从first开始删除了count个段落"""
+        if self._paragraphs is None or self._estimate is None:
+            return
+        del self._heights[first:first + count]
+        self._blocks = {}
+        self._reset_positions()
+        self._update_scroll_range()
+        self.update()
+    
+    def update_paragraph(self, index):
+        """连续模式：段落内容改变，重新估算高度，显示时重新排版"""
+        if self._paragraphs is None or self._estimate is None or index >= len(self._heights):
+            return
+        self._set_height(index, self._estimate_height(self._paragraphs[index]))
+        self._blocks.pop(index, None)
+        self._update_scroll_range()
+        self.update()
+    
+    def content_height(self):
+        """获取文本内容（含留白）的高度，连续模式下为整个脚本的（部分估算的）高度"""
+        self._ensure_layout()
+        if self._paragraphs is not None:
+            return self._total
+        return self._content_height
+    
+    def _invalidate_layout(self):
+        """内容或字体改变，立即重新排版以更新可滚动范围"""
+        self._entry_key = None
+        self._ensure_layout()
+        self.update()
+    
+    def _ensure_layout(self):
+        """按当前文本、字体、宽度和设备像素比从排版缓存中取得排版结果"""
+        width = max(1, self._layout_width - 2 * self.PADDING)
+        ratio = self.devicePixelRatioF()
+        if self._paragraphs is not None:
+            # 连续模式：排版条件改变时丢弃已排版的段落，重新估算全部段落高度
+            key = LayoutCache.make_key(None, self._font, width, ratio, self.alignment)
+            if key == self._entry_key:
+                return
+            self._entry_key = key
+            self._blocks = {}
+            self._estimate_heights(width)
+            self._update_scroll_range()
+            return
+        
+        key = LayoutCache.make_key(self._text, self._font, width, ratio, self.alignment)
+        if key == self._entry_key:
+            return
+        
+        self._entry = self.layout_cache.get(self._text, self._font, width, ratio, self.alignment)
+        self._entry_key = key
+        self._content_height = self._entry.height + 2 * self.PADDING
+        self._update_scroll_range()
+    
+    def _estimate_heights(self, width):
+        """连续模式：按字数估算全部段落的高度"""
+        metrics = self.layout_cache.font_metrics(self._font)
+        self._estimate = (metrics.averageCharWidth(), metrics.horizontalAdvance('中'),
+                          metrics.lineSpacing(), width)
+        self._heights = array('d', (self._estimate_height(text) for text in self._paragraphs))
+        self._reset_positions()
+    
+    def _estimate_height(self, text):
+        """估算段落块的高度（含留白）"""
+        narrow_width, wide_width, line_spacing, width = self._estimate
+        # UTF-8中汉字等宽字符占3字节、ASCII字符占1字节，由字节数推算宽字符个数，无需逐字符判断
+        wide = (len(text.encode('utf-8', 'surrogatepass')) - len(text)) // 2
+        narrow = len(text) - wide
+        lines = max(1, math.ceil((narrow * narrow_width + wide * wide_width) / width)) + text.count('\n')
+        return lines * line_spacing + 2 * self.PADDING
+    
+    def _block(self, index):
+        """连续模式：获取段落的排版结果，并用实际高度替换估算高度"""
+        entry = self._blocks.get(index)
+        if entry is None:
+            width = max(1, self._layout_width - 2 * self.PADDING)
+            entry = self.layout_cache.get(self._paragraphs[index], self._font, width,
+                                          self.devicePixelRatioF(), self.alignment)
+            self._blocks[index] = entry
+            self._set_height(index, entry.height + 2 * self.PADDING)
+        return entry
+    
+    def _set_height(self, index, height):
+        """连续模式：改变段落块的高度，同时更新总高度以及其后的锚点段落、视口顶端段落的起始位置"""
+        delta = height - self._heights[index]
+        if not delta:
+            return
+        self._heights[index] = height
+        self._total += delta
+        if index < self._anchor:
+            self._anchor_start += delta
+        if index < self._top:
+            self._top_start += delta
+    
+    def _start_of(self, index):
+        """连续模式：段落顶端在整个文本带中的位置，从视口顶端段落累加，只经过两者之间的段落"""
+        if index >= self._top:
+            return self._top_start + sum(self._heights[self._top:index])
+        return self._top_start - sum(self._heights[index:self._top])
+    
+    def _reset_positions(self):
+        """连续模式：段落增删或全部重新估算后，重新计算总高度和起始位置，视口顶端段落回到锚点段落"""
+        self._total = sum(self._heights)
+        self._anchor_start = sum(self._heights[:self._anchor])
+        self._top = min(self._anchor, max(0, len(self._heights) - 1))
+        self._top_start = sum(self._heights[:self._top])
+    
+    def _visible_blocks(self):
+        """
+        连续模式：把视口顶端段落移动到当前滚动位置，从它向上下逐段排版，直到超出视口及预留范围
+        
+        Returns:
+            [(段落顶端在窗口中的位置, 排版结果)]，只包含与视口相交的段落
+        """
+        count = len(self._heights)
+        if count == 0:
+            return []
+        heights = self._heights
+        margin = self.height() * self.VIRTUAL_MARGIN
+        
+        # 视口顶端段落跟随滚动位置移动，只经过两次绘制之间滚过的段落
+        view_top = self._anchor_start + self.scroll_offset
+        top, start = self._top, self._top_start
+        while top > 0 and start > view_top:
+            top -= 1
+            start -= heights[top]
+        while top < count - 1 and start + heights[top] <= view_top:
+            start += heights[top]
+            top += 1
+        self._top, self._top_start = top, start
+        
+        previous_blocks = self._blocks
+        blocks = {}
+        
+        # 向上：视口上方预留范围内的段落（排版后的实际高度会更新起始位置，每次重新计算视口顶端段落的位置）
+        above = 0.0
+        index = top - 1
+        while index >= 0 and self._top_y() - above > -margin:
+            blocks[index] = self._block(index)
+            above += heights[index]
+            index -= 1
+        first = index + 1
+        
+        # 向下：视口顶端段落及其后的段落
+        below = 0.0
+        last = top
+        while last < count and self._top_y() + below < self.height() + margin:
+            blocks[last] = self._block(last)
+            below += heights[last]
+            last += 1
+        
+        # 按排版后的实际高度计算与视口相交的段落
+        visible = []
+        y = self._top_y() - above
+        for index in range(first, last):
+            height = heights[index]
+            if y + height > 0 and y < self.height():
+                visible.append((y, blocks[index]))
+            y += height
+        
+        # 只保留视口附近的段落，内存占用与脚本长度无关；有新排版的段落时实际高度替换了估算值
+        self._blocks = blocks
+        if blocks.keys() - previous_blocks.keys():
+            self._update_scroll_range()
+        return visible
+    
+    def _top_y(self):
+        """连续模式：视口顶端段落的顶端在窗口中的位置"""
+        return self._top_start - self._anchor_start - self.scroll_offset
+    
+    def _update_scroll_range(self):
+        """根据内容高度和窗口高度更新可滚动范围"""
+        if self._paragraphs is not None:
+            # 连续模式：可以向上滚动到脚本开头，向下滚动到脚本末尾
+            minimum = -math.ceil(self._anchor_start)
+            maximum = max(0, math.ceil(self._total - self._anchor_start - self.height()))
+        else:
+            minimum = 0
+            maximum = max(0, math.ceil(self._content_height - self.height()))
+        self.scroll_bar.setRange(minimum, maximum)
+        self.scroll_bar.setPageStep(max(1, self.height()))
+        self.scroll_offset = min(max(float(minimum), self.scroll_offset), float(maximum))
+    
+    def set_output_transform(self, mirrored, rotation):
+        """
+        设置输出变换
+        
+        Args:
+            mirrored: 是否水平镜像
+            rotation: 旋转角度，0或180（旋转90度会改变行宽，需要重新排版，不支持）
+        """
+        rotation = 180 if rotation % 360 == 180 else 0
+        if mirrored == self.mirrored and rotation == self.rotation:
+            return
+        self.mirrored = mirrored
+        self.rotation = rotation
+        self._update_output_transform()
+        self.update()
+    
+    def _update_output_transform(self):
+        """按窗口大小计算输出变换：镜像与旋转180度组合后仍是沿坐标轴的翻转"""
+        flip_x = self.mirrored != (self.rotation == 180)
+        flip_y = self.rotation == 180
+        self._output_transform = QTransform(-1 if flip_x else 1, 0, 0, -1 if flip_y else 1,
+                                            self.width() if flip_x else 0, self.height() if flip_y else 0)
+    
+    def set_tiled(self, tiled):
+        """
+        设置是否使用分块位图渲染
+        
+        Args:
+            tiled: True时段落切成固定高度的条带分别缓存，只合成可见条带，适合大字号；
+                   False时整段绘制成一张位图，位图过大时自动改用条带
+        """
+        if tiled != self.tiled:
+            self.tiled = tiled
+            self.update()
+    
+    def prepare(self, text):
+        """
+        按当前字体、宽度和颜色预先排版并绘制一段文本，之后切换到这段文本时只需从缓存中取出
+        
+        Args:
+            text: 段落文本
+        """
+        width = max(1, self._layout_width - 2 * self.PADDING)
+        entry = self.layout_cache.get(text, self._font, width, self.devicePixelRatioF(), self.alignment)
+        if self.tiled or self._render_pixmap(entry) is None:
+            # 分块渲染时只需准备切换后第一屏的条带
+            self._draw_tiles(None, entry, 0.0)
+    
+    def _render_pixmap(self, entry):
+        """把排版结果绘制到缓存位图（保存在排版缓存条目中），位图过大时返回None"""
+        colors = (self.background_color.rgba(), self.text_color.rgba())
+        pixmap = self.layout_cache.get_pixmap(entry, colors)
+        if pixmap is not None:
+            return pixmap
+        ratio = self.devicePixelRatioF()
+        width = self._layout_width
+        height = math.ceil(entry.height + 2 * self.PADDING)
+        if width * height * ratio * ratio > self.MAX_CACHE_PIXELS:
+            return None
+        
+        pixmap = QPixmap(max(1, math.ceil(width * ratio)), max(1, math.ceil(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.background_color)
+        painter = QPainter(pixmap)
+        painter.setPen(self.text_color)
+        entry.layout.draw(painter, QPointF(self.PADDING, self.PADDING))
+        painter.end()
+        self.layout_cache.store_pixmap(entry, pixmap, colors)
+        return pixmap
+    
+    def _render_tile(self, entry, index):
+        """把排版结果中的一个条带绘制成位图，只绘制与条带相交的文本行"""
+        ratio = self.devicePixelRatioF()
+        width = self._layout_width
+        top = index * TileCache.TILE_HEIGHT
+        height = min(TileCache.TILE_HEIGHT, math.ceil(entry.height + 2 * self.PADDING) - top)
+        
+        pixmap = QPixmap(max(1, math.ceil(width * ratio)), max(1, math.ceil(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.background_color)
+        painter = QPainter(pixmap)
+        painter.setPen(self.text_color)
+        painter.translate(0, -top)
+        entry.layout.draw(painter, QPointF(self.PADDING, self.PADDING), [], QRectF(0, top, width, height))
+        painter.end()
+        return pixmap
+    
+    def _draw_block(self, painter, entry, y):
+        """
+        绘制一个段落块的可见部分
+        
+        Args:
+            painter: 窗口的QPainter
+            entry: 段落的排版结果
+            y: 段落块顶端在窗口中的位置（可以是小数）
+        """
+        pixmap = None if self.tiled else self._render_pixmap(entry)
+        if pixmap is None:
+            self._draw_tiles(painter, entry, y)
+        else:
+            self._blit(painter, pixmap, y)
+    
+    def _draw_tiles(self, painter, entry, y):
+        """取出（必要时绘制）与视口相交的条带并合成，painter为None时只准备条带"""
+        tile_height = TileCache.TILE_HEIGHT
+        block_height = entry.height + 2 * self.PADDING
+        first = max(0, math.floor(-y / tile_height))
+        last = min(math.ceil(block_height / tile_height), math.ceil((self.height() - y) / tile_height))
+        colors = (self.background_color.rgba(), self.text_color.rgba())
+        ratio = self.devicePixelRatioF()
+        for index in range(first, last):
+            pixmap = self.layout_cache.tiles.get(entry, index, colors, ratio, self._render_tile)
+            if painter is not None:
+                self._blit(painter, pixmap, y + index * tile_height)
+    
+    def _blit(self, painter, pixmap, y):
+        """
+        按小数像素位置绘制位图的可见部分
+        
+        Args:
+            painter: 窗口的QPainter
+            pixmap: 段落或条带的位图
+            y: 位图顶端在窗口中的位置（可以是小数）
+        """
+        # 只取出可见部分：整数部分决定源区域和目标位置，小数部分用变换平移
+        ratio = pixmap.devicePixelRatio()
+        top = max(0, math.floor(-y))
+        height = min(pixmap.height() / ratio, self.height() - y + 1) - top
+        if height <= 0:
+            return
+        target = math.floor(y + top)
+        fraction = y + top - target
+        if fraction:
+            # 光栅引擎会把纯平移取整，加上极小的缩放才会按小数位置做双线性插值
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.setTransform(QTransform(1, 0, 0, 1 + 1e-6, 0, fraction) * self._output_transform)
+        else:
+            painter.setTransform(self._output_transform)
+        painter.drawPixmap(QRectF(0, target, self.width(), height), pixmap,
+                           QRectF(0, top * ratio, pixmap.width(), height * ratio))
+    
+    def paintEvent(self, event):
+        """按小数像素平移绘制缓存位图"""
+        self._ensure_layout()
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.background_color)
+        if self._paragraphs is not None:
+            for y, entry in self._visible_blocks():
+                self._draw_block(painter, entry, y)
+        else:
+            self._draw_block(painter, self._entry, -self.scroll_offset)
+        painter.end()
+    
+    def _relayout(self):
+        """宽度稳定后按新宽度重新排版"""
+        self.relayout_timer.stop()
+        if self._layout_width != self.width():
+            self._layout_width = self.width()
+            self._ensure_layout()
+            self.update()
+    
+    def apply_pending_resize(self):
+        """
+        不再等待宽度停止改变，立即采用当前宽度；排版在下一次需要时进行，
+        与随后的字体等改变合并为一次排版
+        """
+        if self.relayout_timer.isActive():
+            self.relayout_timer.stop()
+            self._layout_width = self.width()
+            self.update()
+    
+    def resizeEvent(self, event):
+        """
+        宽度改变时重新排版：窗口可见且宽度连续改变时推迟到停止改变后只排版一次，
+        期间绘制时把已有位图缩放到新宽度；只有高度改变时只更新可滚动范围
+        """
+        super().resizeEvent(event)
+        self._update_output_transform()
+        if event.size().width() != event.oldSize().width():
+            if self.isVisible() and event.oldSize().width() > 0:
+                self.relayout_timer.start()
+            else:
+                self._relayout()
+        self._update_scroll_range()
@@ -1,50 +1,319 @@
 import re
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate, chain
+from PyQt5.QtCore import (QCoreApplication, QElapsedTimer, QEvent, QObject, QRunnable, QThreadPool, Qt,
+                          pyqtSignal, QTimer)
+
+class ParagraphTable:
+    """
+    紧凑段落表，用数组保存每个段落在原始文本中的起止位置和持续时间
+    
+    编辑后替换范围之后的位置不立即平移，而是记录为待平移量：从_shift_from开始的位置读取时都要加上_shift。
+    下一次替换时只需补上两次编辑位置之间的段落，连续编辑同一处时开销与编辑之后的段落数无关。
+    """
+    
+    __slots__ = ('starts', 'ends', 'durations', '_shift_from', '_shift')
+    
+    NO_DURATION = -1  # 段落没有自定义持续时间
+    
+    def __init__(self):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.durations = array('q')
+        self._shift_from = 0  # 从这个索引开始的位置尚未平移
+        self._shift = 0  # 尚未平移的字符数
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def append(self, start, end, duration):
+        """追加一个段落，duration为None表示没有自定义持续时间"""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.durations.append(self.NO_DURATION if duration is None else duration)
+    
+    def start(self, index):
+        """获取段落的起始位置"""
+        if index < 0:
+            index += len(self.starts)
+        return self.starts[index] + (self._shift if index >= self._shift_from else 0)
+    
+    def end(self, index):
+        """获取段落的结束位置"""
+        if index < 0:
+            index += len(self.ends)
+        return self.ends[index] + (self._shift if index >= self._shift_from else 0)
+    
+    def rows(self, first, last):
+        """获取[first, last)范围内的段落：(起始位置, 结束位置, 持续时间)列表"""
+        return [(self.start(index), self.end(index), self.durations[index])
+                for index in range(first, min(last, len(self.starts)))]
+    
+    def get_duration(self, index):
+        """获取段落的自定义持续时间，没有则返回None"""
+        duration = self.durations[index]
+        return None if duration == self.NO_DURATION else duration
+    
+    def bisect_starts(self, position):
+        """获取第一个起始位置不小于position的段落索引"""
+        return self._bisect(self.starts, position)
+    
+    def bisect_ends(self, position):
+        """获取第一个结束位置不小于position的段落索引"""
+        return self._bisect(self.ends, position)
+    
+    def _bisect(self, values, position):
+        """在平移前后两部分中分别二分查找，位置整体仍然是升序的"""
+        split = min(self._shift_from, len(values))
+        index = bisect_left(values, position, 0, split)
+        if index < split:
+            return index
+        return bisect_left(values, position - self._shift, split)
+    
+    def splice(self, first, last, table, delta):
+        """
+        用另一个段落表替换[first, last)范围内的段落
+        
+        Args:
+            first: 替换范围起始索引
+            last: 替换范围结束索引
+            table: 新的段落表
+            delta: 替换范围之后的段落需要平移的字符数
+        """
+        # 把原有的待平移量补到两次编辑位置之间的段落上，之后替换范围之后的段落只差同一个平移量
+        if self._shift and self._shift_from < first:
+            self._add(self._shift_from, first, self._shift)
+        elif self._shift and self._shift_from > last:
+            self._add(last, self._shift_from, -self._shift)
+        self.starts[first:last] = table.starts
+        self.ends[first:last] = table.ends
+        self.durations[first:last] = table.durations
+        self._shift_from = first + len(table)
+        self._shift += delta
+        if self._shift_from >= len(self.starts):
+            self._shift = 0
+    
+    def _add(self, first, last, amount):
+        """给[first, last)范围内保存的位置加上amount"""
+        last = min(last, len(self.starts))
+        if first < last:
+            self.starts[first:last] = array('q', map(amount.__add__, self.starts[first:last]))
+            self.ends[first:last] = array('q', map(amount.__add__, self.ends[first:last]))
+
+class ParagraphList:
+    """段落文本的只读视图，只在访问某个段落时才从原始文本中截取"""
+    
+    __slots__ = ('_processor',)
+    
+    def __init__(self, processor):
+        self._processor = processor
+    
+    def __len__(self):
+        # 没有段落时保留一个空段落
+        return max(1, len(self._processor._table))
+    
+    def __getitem__(self, index):
+        table = self._processor._table
+        if not table:
+            if index in (0, -1):
+                return ""
+            raise IndexError("paragraph index out of range")
+        return self._processor.raw_text[table.start(index):table.end(index)]
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+class ParseJob(QRunnable):
+    """后台完整解析任务，结果通过带代号的信号送回文本处理器"""
+    
+    def __init__(self, processor, generation, text):
+        super().__init__()
+        self.processor = processor
+        self.generation = generation
+        self.text = text
+    
+    def run(self):
+        result = self.processor.parse_script(self.text)
+        self.processor.parse_finished.emit(self.generation, self.text, result)
 
 class TextProcessor(QObject):
     """文本处理器，负责文本分段和管理"""
     
     # 定义信号
-    paragraphs_updated = pyqtSignal(list)  # 段落列表更新
+    paragraphs_updated = pyqtSignal(object)  # 段落列表更新（ParagraphList视图）
     current_paragraph_changed = pyqtSignal(int)  # 当前段落索引改变
+    paragraphs_inserted = pyqtSignal(int, int)  # 插入段落：起始索引、数量
+    paragraphs_removed = pyqtSignal(int, int)  # 删除段落：起始索引、数量
+    paragraph_changed = pyqtSignal(int)  # 段落内容或持续时间改变：段落索引
+    parse_finished = pyqtSignal(int, object, object)  # 后台解析完成：任务代号、文本、解析结果
+    transition_lateness_measured = pyqtSignal(int, float)  # 自动跳转完成：新段落索引、相对计划时间的延迟（毫秒）
     
-    def __init__(self):
+    def __init__(self, clock=None):
+        """
+        Args:
+            clock: 段落自动跳转使用的单调时钟，需要提供restart()和nsecsElapsed()，默认为QElapsedTimer
+        """
         super().__init__()
         
         # 初始化属性
         self.raw_text = ""
-        self.paragraphs = []
+        self._table = ParagraphTable()  # 每个有效段落在raw_text中的位置和持续时间
+        self.paragraphs = ParagraphList(self)  # 段落文本视图，按需截取
+        self._time_starts = array('q', [0, 10])  # 时间轴前缀和：每个段落的开始时间（秒），最后一项为总时长
         self.current_paragraph_index = 0
         self.paragraph_duration = 10  # 默认每段停留10秒
         self.is_auto_playing = False  # 是否自动播放
-        self.remaining_time = 0  # 暂停时的剩余时间
+        self.paused_offset_ms = 0.0  # 暂停时本段已停留的时间（毫秒）
         self.time_control_mode = "global"  # 时间控制方式："global"全局控制，"local"局部文本标识控制
-        self.paragraph_durations = {}  # 存储每个段落的自定义持续时间
         
-        # 段落自动跳转定时器
+        # 增量解析所需的索引结构
+        self._markers = ParagraphTable()  # 段落标识表：每个段落标识的起止位置和时间
+        self._pending_change = None  # 尚未应用的文档变化：(位置, 删除字符数, 新增字符数)，按UTF-16计数
+        self._astral = array('q')  # BMP以外的字符在raw_text中的位置（升序），用于换算Qt的UTF-16位置
+        
+        # 后台解析：超过阈值的完整解析放到线程池中执行，只采用最新一次任务的结果
+        self.background_parse_threshold = 100000  # 字符数
+        self._parse_generation = 0  # 最新解析任务的代号
+        self._parsing = False  # 是否有尚未返回的后台解析任务
+        self._parse_pool = QThreadPool(self)
+        self._parse_pool.setMaxThreadCount(1)
+        self.parse_finished.connect(self.on_parse_finished)
+        
+        # 可选的解析结果磁盘缓存（ParseCache），只用于load_text打开的文本
+        self.parse_cache = None
+        self._uncached_text = None  # 缓存未命中、等待解析完成后写入缓存的文本
+        
+        # 段落自动跳转：每次跳转的截止时间都由单调时钟的起点和时间轴计算，
+        # 定时器只负责在截止时间唤醒，晚到的时间不会累积到后面的段落
+        self.play_clock = clock if clock is not None else QElapsedTimer()
+        self._anchor_index = 0  # 时钟起点所在的段落
+        self._anchor_offset_ms = 0.0  # 时钟起点时该段已停留的时间（毫秒）
+        self._next_deadline_ms = 0.0  # 下一次跳转的截止时间（相对时钟起点，毫秒）
+        self.transition_lateness = deque(maxlen=1000)  # 最近各次自动跳转的延迟（毫秒）
         self.paragraph_timer = QTimer(self)
+        self.paragraph_timer.setSingleShot(True)
+        self.paragraph_timer.setTimerType(Qt.PreciseTimer)
         self.paragraph_timer.timeout.connect(self.auto_next_paragraph)
         
         # 正则表达式模式，用于匹配({时间})格式的段落标识，时间格式为分:秒
         self.paragraph_pattern = re.compile(r'\(\{([0-9]+:[0-9]+)\}\)')
+        self.non_space_pattern = re.compile(r'\S')
+        self.astral_pattern = re.compile('[\U00010000-\U0010FFFF]')
+    
+    def note_contents_change(self, position, chars_removed, chars_added):
+        """
+        记录文档的一次内容变化（对应QTextDocument.contentsChange），
+        下一次set_text时据此只重新解析受影响的区域
+        
+        Args:
+            position: 变化起始位置
+            chars_removed: 删除的字符数
+            chars_added: 新增的字符数
+        """
+        if self._pending_change is None:
+            self._pending_change = (position, chars_removed, chars_added)
+            return
+        
+        # 多次变化合并为一个覆盖全部变化的区域（旧文本坐标与新文本坐标分别计算）
+        start, removed, added = self._pending_change
+        old_end = start + removed
+        mid_end = start + added
+        change_end = position + chars_removed
+        new_start = min(start, position)
+        mid_end_merged = max(mid_end, change_end)
+        old_end_merged = old_end + (mid_end_merged - mid_end)
+        new_end_merged = mid_end_merged + (chars_added - chars_removed)
+        self._pending_change = (new_start, old_end_merged - new_start, new_end_merged - new_start)
     
     def set_text(self, text):
         """设置原始文本并进行分段处理"""
+        change = self._pending_change
+        self._pending_change = None
+        
+        # 后台解析进行中时段落位置已经过期，新文本只能重新完整解析
+        if self._parsing:
+            change = None
+        elif change is not None:
+            change = self._convert_change(text, change)
+        if change is not None:
+            self.reparse_range(text, *change)
+        elif self._parsing or len(text) >= self.background_parse_threshold:
+            self.start_background_parse(text)
+            return
+        else:
+            self.install_parse_result(text, self.parse_script(text))
+        self.publish_paragraphs()
+    
+    def load_text(self, text):
+        """
+        载入新打开的文本：解析缓存命中时直接使用缓存的段落和时间轴，未命中时完整解析并写入缓存
+        
+        Returns:
+            是否命中缓存
+        """
+        self._pending_change = None
+        cached = None
+        if self.parse_cache is not None:
+            cached = self.parse_cache.load(text, self.time_control_mode, self.paragraph_duration)
+        if cached is None:
+            self._uncached_text = text
+            self.set_text(text)
+            return False
+        
+        # 丢弃尚未返回的后台解析结果
+        self._parse_generation += 1
+        self._parsing = False
+        result, time_starts = cached
+        self.install_parse_result(text, result, time_starts)
+        self.publish_paragraphs()
+        return True
+    
+    def start_background_parse(self, text):
+        """在后台线程中完整解析文本，之前尚未开始的解析任务直接丢弃"""
+        self._parse_generation += 1
+        self._parsing = True
+        self._parse_pool.clear()
+        self._parse_pool.start(ParseJob(self, self._parse_generation, text))
+    
+    def on_parse_finished(self, generation, text, result):
+        """后台解析完成，只采用最新一次任务的结果"""
+        if generation != self._parse_generation:
+            return
+        self._parsing = False
+        self.install_parse_result(text, result)
+        self.publish_paragraphs()
+    
+    def is_parsing(self):
+        """是否有尚未完成的后台解析"""
+        return self._parsing
+    
+    def wait_for_parse(self):
+        """等待后台解析完成并应用结果"""
+        self._parse_pool.waitForDone()
+        QCoreApplication.sendPostedEvents(None, QEvent.MetaCall)
+    
+    def publish_paragraphs(self):
+        """段落解析完成后更新当前段落并通知界面"""
         # 保存当前段落索引，避免重置
         current_index = self.current_paragraph_index
         # 保存自动播放状态
         was_playing = self.is_auto_playing
         
-        self.raw_text = text
-        self.parse_paragraphs()
-        
         # 确保当前段落索引不超出新的段落数量范围
         if current_index >= len(self.paragraphs):
             current_index = max(0, len(self.paragraphs) - 1)
+        index_changed = current_index != self.current_paragraph_index
         self.current_paragraph_index = current_index
         
+        # 段落内容的变化已经通过增量信号发出，这里只在当前段落索引变化时通知
         self.paragraphs_updated.emit(self.paragraphs)
-        self.current_paragraph_changed.emit(self.current_paragraph_index)
+        if index_changed:
+            self.current_paragraph_changed.emit(self.current_paragraph_index)
+            self.restart_paragraph_timer()
         
         # 恢复自动播放状态
         if was_playing and not self.is_auto_playing:
@@ -52,52 +321,391 @@ class TextProcessor(QObject):
     
     def parse_paragraphs(self):
         """解析文本，识别({时间})格式的段落标识并分段"""
-        # 重置段落持续时间字典
-        self.paragraph_durations = {}
+        self.install_parse_result(self.raw_text, self.parse_script(self.raw_text))
+    
+    def install_parse_result(self, text, result, time_starts=None):
+        """
+        使用完整解析的结果替换全部段落，并发出段落增量信号
         
-        # 使用正则表达式查找所有匹配的段落标识和位置
-        matches = list(self.paragraph_pattern.finditer(self.raw_text))
+        Args:
+            text: 解析的文本
+            result: parse_script的返回值
+            time_starts: 缓存的时间轴前缀和，为None时重新累加
+        """
+        old_text, old_table = self.raw_text, self._table
+        self.raw_text = text
+        self._markers, self._table, self._astral = result
+        self._emit_splice(0, old_table.rows(0, len(old_table)), old_text, len(old_table), time_starts)
         
-        # 如果没有匹配，整个文本作为一个段落
-        if not matches:
-            self.paragraphs = [self.raw_text.strip() if self.raw_text.strip() else ""]
-            return
+        # load_text打开的文本解析完成后写入缓存，之后的编辑不再写入
+        if text is self._uncached_text:
+            self._uncached_text = None
+            if self.parse_cache is not None:
+                self.parse_cache.store(text, result, self._time_starts,
+                                       self.time_control_mode, self.paragraph_duration)
+    
+    def parse_script(self, text):
+        """
+        完整解析文本，不修改处理器状态，可以在后台线程中调用
         
-        # 初始化段落列表
-        self.paragraphs = []
+        Returns:
+            (段落标识表, 段落表, BMP以外的字符的位置数组)
+        """
+        markers = self._scan_markers(text, 0, len(text))
+        table = self._build_table(text, 0, len(text), None, markers)
+        astral = array('q', (match.start() for match in self.astral_pattern.finditer(text)))
+        return self._marker_table(markers), table, astral
+    
+    def reparse_range(self, text, position, chars_removed, chars_added):
+        """
+        增量解析：只重新扫描变化位置所在行的段落标识，并替换受影响的段落
         
-        # 处理第一个段落
-        start_pos = 0
-        first_match = matches[0]
-        first_paragraph = self.raw_text[start_pos:first_match.start()].strip()
-        if first_paragraph:
-            self.paragraphs.append(first_paragraph)
+        Args:
+            text: 变化后的文本
+            position: 变化起始位置（字符串索引）
+            chars_removed: 删除的字符数
+            chars_added: 新增的字符数
+        """
+        old_text = self.raw_text
+        self.raw_text = text
+        delta = chars_added - chars_removed
         
-        # 处理中间段落
-        for i in range(len(matches)):
-            match = matches[i]
-            # 解析时间格式：分:秒
-            time_str = match.group(1)
-            minutes, seconds = map(int, time_str.split(':'))
-            duration = minutes * 60 + seconds
-            
-            # 确定下一个段落的开始位置
-            if i < len(matches) - 1:
-                next_match = matches[i + 1]
-                next_paragraph = self.raw_text[match.end():next_match.start()].strip()
+        # 段落标识不会跨行，因此扫描窗口扩展到变化区域所在的完整行即可
+        window_start = text.rfind('\n', 0, position) + 1
+        window_end = text.find('\n', position + chars_added)
+        if window_end == -1:
+            window_end = len(text)
+        old_window_end = window_end - delta
+        
+        # 替换窗口内的段落标识，窗口之后的标识整体平移
+        first = self._markers.bisect_starts(window_start)
+        last = self._markers.bisect_starts(old_window_end)
+        old_len = len(text) - delta
+        old_segment_end = self._markers.start(last) if last < len(self._markers) else old_len
+        new_markers = self._scan_markers(text, window_start, window_end)
+        self._markers.splice(first, last, self._marker_table(new_markers), delta)
+        
+        # BMP以外的字符：去掉被删除的，加入新增内容中的，之后的平移
+        astral_first = bisect_left(self._astral, position)
+        astral_last = bisect_left(self._astral, position + chars_removed)
+        added = [match.start() for match in self.astral_pattern.finditer(text, position, position + chars_added)]
+        if added or astral_first < len(self._astral):
+            self._astral[astral_first:] = array('q', added) + array('q', map(delta.__add__, self._astral[astral_last:]))
+        
+        # 受影响的段落范围：从窗口前一个标识之后，到窗口后第一个标识之前
+        if first > 0:
+            segment_start = self._markers.end(first - 1)
+            prev_duration = self._markers.get_duration(first - 1)
+        else:
+            segment_start = 0
+            prev_duration = None
+        new_table = self._build_table(text, segment_start, old_segment_end + delta, prev_duration, new_markers)
+        
+        # 只替换受影响的段落，其余段落只平移位置
+        span_first = self._table.bisect_starts(segment_start)
+        span_last = self._table.bisect_starts(old_segment_end)
+        old_rows = self._table.rows(span_first, span_last)
+        old_total = len(self._table)
+        self._table.splice(span_first, span_last, new_table, delta)
+        self._emit_splice(span_first, old_rows, old_text, old_total)
+    
+    def _emit_splice(self, first, old_rows, old_text, old_total, time_starts=None):
+        """
+        根据一次段落替换发出paragraph_changed、paragraphs_removed、paragraphs_inserted信号
+        
+        首尾文本和持续时间都没有变化的段落不发出信号，完整解析替换全部段落时，
+        在开头插入一个段落也只在分歧位置发出一次插入信号
+        
+        Args:
+            first: 替换范围的起始索引
+            old_rows: 被替换的旧段落列表：(起始位置, 结束位置, 持续时间)
+            old_text: 替换前的原始文本
+            old_total: 替换前的段落总数
+            time_starts: 缓存的时间轴前缀和，为None时只更新替换范围的时间轴
+        """
+        new_total = len(self._table)
+        inserted = len(old_rows) + new_total - old_total
+        new_rows = self._table.rows(first, first + inserted)
+        # 没有段落时视图中保留一个空段落，按普通段落处理
+        if old_total == 0:
+            old_rows = [(0, 0, ParagraphTable.NO_DURATION)]
+        if new_total == 0:
+            new_rows = [(0, 0, ParagraphTable.NO_DURATION)]
+        
+        def same(old, new):
+            return old[2] == new[2] and old_text[old[0]:old[1]] == self.raw_text[new[0]:new[1]]
+        
+        # 去掉首尾相同的段落
+        prefix = 0
+        limit = min(len(old_rows), len(new_rows))
+        while prefix < limit and same(old_rows[prefix], new_rows[prefix]):
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and same(old_rows[-1 - suffix], new_rows[-1 - suffix]):
+            suffix += 1
+        old_rows = old_rows[prefix:len(old_rows) - suffix]
+        new_rows = new_rows[prefix:len(new_rows) - suffix]
+        first += prefix
+        
+        if time_starts is not None:
+            self._update_timeline(0, time_starts)
+        else:
+            self._splice_timeline(first, [row[2] for row in old_rows], [row[2] for row in new_rows])
+        
+        common = min(len(old_rows), len(new_rows))
+        for offset in range(common):
+            if not same(old_rows[offset], new_rows[offset]):
+                self.paragraph_changed.emit(first + offset)
+        
+        if len(old_rows) > len(new_rows):
+            self.paragraphs_removed.emit(first + common, len(old_rows) - len(new_rows))
+        elif len(new_rows) > len(old_rows):
+            self.paragraphs_inserted.emit(first + common, len(new_rows) - len(old_rows))
+    
+    def _convert_change(self, text, change):
+        """
+        把记录的内容变化从Qt的UTF-16位置换算为字符串索引
+        
+        Returns:
+            (位置, 删除字符数, 新增字符数)，变化与文本对不上、不能用于增量解析时返回None
+        """
+        position, chars_removed, chars_added = change
+        if position < 0 or chars_removed < 0 or chars_added < 0:
+            return None
+        start = self._to_str_index(position)
+        end = self._to_str_index(position + chars_removed)
+        added = len(text) - len(self.raw_text) + end - start
+        if end > len(self.raw_text) or added < 0:
+            return None
+        # 新增内容中BMP以外的字符各占两个UTF-16单位；Qt在替换整个文档时会多计一个段落分隔符，
+        # 长度对不上时退回完整解析
+        astral = sum(1 for _ in self.astral_pattern.finditer(text, start, start + added))
+        if added + astral != chars_added:
+            return None
+        return start, end - start, added
+    
+    def _to_str_index(self, position):
+        """把UTF-16位置换算为raw_text的字符串索引（在BMP以外字符的位置上二分查找）"""
+        astral = self._astral
+        # 第k个BMP以外字符的UTF-16位置为astral[k] + k，统计位置在position之前的字符个数
+        low, high = 0, len(astral)
+        while low < high:
+            middle = (low + high) // 2
+            if astral[middle] + middle < position:
+                low = middle + 1
             else:
-                # 最后一个匹配，处理到文本末尾
-                next_paragraph = self.raw_text[match.end():].strip()
-            
-            # 如果段落内容不为空，添加到段落列表并存储持续时间
-            if next_paragraph:
-                # 存储该段落的持续时间（索引是当前段落列表的长度，即下一个段落的索引）
-                self.paragraph_durations[len(self.paragraphs)] = duration
-                self.paragraphs.append(next_paragraph)
-        
-        # 如果没有段落，添加一个空段落
-        if not self.paragraphs:
-            self.paragraphs = [""]
+                high = middle
+        return position - low
+    
+    def _scan_markers(self, text, start, end):
+        """扫描指定范围内的段落标识"""
+        markers = []
+        for match in self.paragraph_pattern.finditer(text, start, end):
+            # 解析时间格式：分:秒
+            minutes, seconds = map(int, match.group(1).split(':'))
+            markers.append((match.start(), match.end(), minutes * 60 + seconds))
+        return markers
+    
+    @staticmethod
+    def _marker_table(markers):
+        """把段落标识列表转换为段落标识表"""
+        table = ParagraphTable()
+        for marker in markers:
+            table.append(*marker)
+        return table
+    
+    def _build_table(self, text, start, end, duration, markers):
+        """
+        根据段落标识把[start, end)范围切分为段落
+        
+        Args:
+            text: 文本
+            start: 范围起始位置
+            end: 范围结束位置
+            duration: 范围内第一个段落的持续时间（前一个段落标识的时间，没有则为None）
+            markers: 范围内的段落标识列表
+        
+        Returns:
+            只包含非空段落的段落表
+        """
+        table = ParagraphTable()
+        segment_start = start
+        for marker_start, marker_end, marker_duration in markers + [(end, end, None)]:
+            span = self._strip_span(text, segment_start, marker_start)
+            if span is not None:
+                table.append(span[0], span[1], duration)
+            segment_start = marker_end
+            duration = marker_duration
+        return table
+    
+    def _strip_span(self, text, start, end):
+        """去掉[start, end)两端的空白，段落为空时返回None"""
+        match = self.non_space_pattern.search(text, start, end)
+        if match is None:
+            return None
+        start = match.start()
+        while text[end - 1].isspace():
+            end -= 1
+        return start, end
+    
+    @property
+    def paragraph_durations(self):
+        """每个段落的自定义持续时间字典（按需生成）"""
+        return {index: self._table.get_duration(index)
+                for index in range(len(self._table))
+                if self._table.durations[index] != ParagraphTable.NO_DURATION}
+    
+    def get_paragraph_duration(self, index):
+        """获取指定段落的自定义持续时间，没有则返回None"""
+        if 0 <= index < len(self._table):
+            return self._table.get_duration(index)
+        return None
+    
+    def get_effective_duration(self, index):
+        """获取段落实际使用的停留时间（秒）：局部模式下优先使用段落标识中的时间"""
+        if 0 <= index < len(self._table):
+            return self._effective_duration(self._table.durations[index])
+        return self.paragraph_duration
+    
+    def _effective_duration(self, duration):
+        """段落表中的持续时间对应的实际停留时间（秒）"""
+        if self.time_control_mode == "local" and duration != ParagraphTable.NO_DURATION:
+            return duration
+        return self.paragraph_duration
+    
+    def _update_timeline(self, first, time_starts=None):
+        """
+        从第first个段落开始重新累加时间轴前缀和，之前的段落开始时间保持不变
+        
+        Args:
+            first: 需要重新累加的第一个段落索引
+            time_starts: 已经算好的完整时间轴（来自解析缓存），给出时直接替换
+        """
+        # 播放中时间轴改变后，以当前段落已停留的时间为新的时钟起点
+        offset_ms = self.get_paragraph_elapsed_ms() if self.is_auto_playing else None
+        if time_starts is not None:
+            self._time_starts = array('q', time_starts)
+        else:
+            first = min(first, len(self._time_starts) - 1)
+            durations = (self.get_effective_duration(index) for index in range(first, len(self.paragraphs)))
+            starts = accumulate(chain([self._time_starts[first]], durations))
+            del self._time_starts[first:]
+            self._time_starts.extend(starts)
+        if offset_ms is not None and self.current_paragraph_index < len(self.paragraphs):
+            self._rebase_play_clock(offset_ms)
+    
+    def _splice_timeline(self, first, old_durations, new_durations):
+        """
+        段落替换后局部更新时间轴：只累加替换范围内的新段落，之后的段落开始时间整体平移
+        
+        Args:
+            first: 替换范围的起始索引
+            old_durations: 被替换的旧段落在段落表中的持续时间
+            new_durations: 新段落在段落表中的持续时间
+        """
+        old = [self._effective_duration(duration) for duration in old_durations]
+        new = [self._effective_duration(duration) for duration in new_durations]
+        if old == new:
+            return
+        offset_ms = self.get_paragraph_elapsed_ms() if self.is_auto_playing else None
+        start = self._time_starts[first]
+        shift = sum(new) - sum(old)
+        suffix = self._time_starts[first + len(old) + 1:]
+        if shift:
+            suffix = array('q', map(shift.__add__, suffix))
+        self._time_starts[first + 1:] = array('q', accumulate(chain([start], new)))[1:] + suffix
+        if offset_ms is not None and self.current_paragraph_index < len(self.paragraphs):
+            self._rebase_play_clock(offset_ms)
+    
+    def get_total_time(self):
+        """获取整场演出的总时长（秒）"""
+        return self._time_starts[-1]
+    
+    def get_paragraph_start_time(self, index):
+        """获取段落在时间轴上的开始时间（秒）"""
+        return self._time_starts[index]
+    
+    def paragraph_at_time(self, seconds):
+        """获取时间轴上指定时间（秒）所在的段落索引（二分查找）"""
+        index = bisect_right(self._time_starts, seconds) - 1
+        return max(0, min(index, len(self.paragraphs) - 1))
+    
+    @staticmethod
+    def parse_time(text):
+        """
+        解析时间字符串
+        
+        Args:
+            text: "时:分:秒"、"分:秒"或秒数
+        
+        Returns:
+            秒数，格式无效时返回None
+        """
+        parts = text.strip().split(':')
+        if not 1 <= len(parts) <= 3 or not all(part.isdigit() for part in parts):
+            return None
+        seconds = 0
+        for part in parts:
+            seconds = seconds * 60 + int(part)
+        return seconds
+    
+    def seek_to_time(self, value):
+        """
+        跳转到时间轴上指定时间所在的段落
+        
+        Args:
+            value: 秒数或时间字符串（如"00:42:10"）
+        
+        Returns:
+            是否跳转成功
+        """
+        seconds = self.parse_time(value) if isinstance(value, str) else value
+        if seconds is None:
+            return False
+        return self.set_current_paragraph(self.paragraph_at_time(seconds))
+    
+    def get_elapsed_time(self):
+        """获取当前在时间轴上的位置（秒）：当前段落开始时间加上本段已停留的时间"""
+        elapsed = self._time_starts[self.current_paragraph_index]
+        duration_ms = self.get_effective_duration(self.current_paragraph_index) * 1000
+        return elapsed + min(max(0.0, self.get_paragraph_elapsed_ms()), duration_ms) / 1000
+    
+    def get_remaining_time(self):
+        """获取距离演出结束的剩余时间（秒）"""
+        return max(0, self.get_total_time() - self.get_elapsed_time())
+    
+    def get_time_progress(self):
+        """获取按时间计算的整体进度（0.0 - 1.0）"""
+        total = self.get_total_time()
+        if total <= 0:
+            return 0.0
+        return min(1.0, self.get_elapsed_time() / total)
+    
+    def paragraph_at(self, offset):
+        """
+        获取包含指定字符位置的段落索引（在段落结束位置上二分查找）
+        
+        段落之间的空白和段落标识归属于其后的段落
+        
+        Args:
+            offset: raw_text中的字符位置
+        """
+        if not self._table:
+            return 0
+        return min(self._table.bisect_ends(offset), len(self._table) - 1)
+    
+    def paragraph_at_document_position(self, position):
+        """
+        获取编辑器光标位置所在的段落索引
+        
+        有尚未解析的文档变化或后台解析未完成时段落位置已经过期，返回None
+        
+        Args:
+            position: QTextDocument中的位置（按UTF-16计数）
+        """
+        if self._pending_change is not None or self._parsing:
+            return None
+        return self.paragraph_at(self._to_str_index(position))
     
     def get_current_paragraph(self):
         """获取当前段落文本"""
@@ -139,6 +747,7 @@ class TextProcessor(QObject):
         """设置每段停留时间"""
         if duration > 0:
             self.paragraph_duration = duration
+            self._update_timeline(0)
             # 立即重启计时器以应用新的停留时间
             self.restart_paragraph_timer()
     
@@ -146,52 +755,85 @@ class TextProcessor(QObject):
         """设置时间控制方式："global"或"local"""
         if mode in ["global", "local"]:
             self.time_control_mode = mode
+            self._update_timeline(0)
             # 重启计时器以应用新的控制方式
             self.restart_paragraph_timer()
     
     def start_auto_play(self):
-        """开始自动播放 - 如果有剩余时间则从剩余时间继续"""
+        """开始自动播放 - 从暂停时本段已停留的时间继续"""
         self.is_auto_playing = True
-        if self.remaining_time > 0:
-            # 从剩余时间继续
-            self.paragraph_timer.start(self.remaining_time)
-        else:
-            # 根据时间控制方式选择初始持续时间
-            if self.time_control_mode == "local" and self.current_paragraph_index in self.paragraph_durations:
-                # 使用段落自定义持续时间
-                duration = self.paragraph_durations[self.current_paragraph_index]
-            else:
-                # 使用全局持续时间
-                duration = self.paragraph_duration
-            self.paragraph_timer.start(duration * 1000)
+        self._rebase_play_clock(self.paused_offset_ms)
     
     def stop_auto_play(self):
-        """停止自动播放 - 保存剩余时间"""
-        if self.paragraph_timer.isActive():
-            # 保存剩余时间
-            self.remaining_time = self.paragraph_timer.remainingTime()
+        """停止自动播放 - 保存本段已停留的时间"""
+        if self.is_auto_playing:
+            self.paused_offset_ms = self.get_paragraph_elapsed_ms()
         self.is_auto_playing = False
         self.paragraph_timer.stop()
     
     def restart_paragraph_timer(self):
         """重新启动段落定时器 - 用于重置或切换段落时"""
-        self.remaining_time = 0  # 重置剩余时间
+        self.paused_offset_ms = 0.0  # 从段落开头计时
         if self.is_auto_playing:
-            self.paragraph_timer.stop()
-            # 根据时间控制方式选择持续时间
-            if self.time_control_mode == "local" and self.current_paragraph_index in self.paragraph_durations:
-                # 使用段落自定义持续时间
-                duration = self.paragraph_durations[self.current_paragraph_index]
-            else:
-                # 使用全局持续时间
-                duration = self.paragraph_duration
-            self.paragraph_timer.start(duration * 1000)
+            self._rebase_play_clock(0.0)
+    
+    def _rebase_play_clock(self, offset_ms):
+        """以当前段落已停留offset_ms毫秒为起点重新开始计时，并安排下一次跳转"""
+        self._anchor_index = self.current_paragraph_index
+        self._anchor_offset_ms = offset_ms
+        self.play_clock.restart()
+        self._schedule_next_transition()
+    
+    def _schedule_offset_ms(self, index):
+        """获取第index个段落开始时相对时钟起点的时间（毫秒）"""
+        return (self._time_starts[index] - self._time_starts[self._anchor_index]) * 1000 - self._anchor_offset_ms
+    
+    def _schedule_next_transition(self):
+        """根据时间轴计算下一次跳转的截止时间，定时器只等待到截止时间为止"""
+        self._next_deadline_ms = self._schedule_offset_ms(self.current_paragraph_index + 1)
+        now_ms = self.play_clock.nsecsElapsed() / 1e6
+        # 向上取整，避免定时器在截止时间之前触发
+        self.paragraph_timer.start(max(0, math.ceil(self._next_deadline_ms - now_ms)))
+    
+    def get_paragraph_elapsed_ms(self):
+        """获取本段已停留的时间（毫秒）"""
+        if not self.is_auto_playing:
+            return self.paused_offset_ms
+        now_ms = self.play_clock.nsecsElapsed() / 1e6
+        return now_ms - self._schedule_offset_ms(self.current_paragraph_index)
     
     def auto_next_paragraph(self):
-        """自动跳转到下一段"""
-        if not self.next_paragraph():
+        """自动跳转到下一段，下一次截止时间仍按时间轴计算，本次的延迟不会顺延"""
+        lateness = self.play_clock.nsecsElapsed() / 1e6 - self._next_deadline_ms
+        if lateness < 0:
+            # 定时器提前唤醒，继续等待剩余的时间
+            self._schedule_next_transition()
+            return
+        if self.current_paragraph_index >= len(self.paragraphs) - 1:
             # 已经是最后一段，停止自动播放
             self.stop_auto_play()
+            return
+        
+        self.current_paragraph_index += 1
+        self.transition_lateness.append(lateness)
+        self._schedule_next_transition()
+        self.current_paragraph_changed.emit(self.current_paragraph_index)
+        self.transition_lateness_measured.emit(self.current_paragraph_index, lateness)
+    
+    def get_lateness_stats(self):
+        """
+        获取自动跳转延迟的统计信息
+        
+        Returns:
+            包含最近一次、平均和最大延迟（毫秒）以及跳转次数的字典
+        """
+        count = len(self.transition_lateness)
+        return {
+            'last_lateness': self.transition_lateness[-1] if count else 0.0,
+            'average_lateness': sum(self.transition_lateness) / count if count else 0.0,
+            'max_lateness': max(self.transition_lateness) if count else 0.0,
+            'transition_count': count,
+        }
     
     def get_total_paragraphs(self):
         """获取总段落数"""
@@ -205,8 +847,11 @@ class TextProcessor(QObject):
     
     def clear(self):
         """清空文本和段落"""
-        self.raw_text = ""
-        self.paragraphs = [""]
+        self.install_parse_result("", (ParagraphTable(), ParagraphTable(), array('q')))
+        self._pending_change = None
+        # 丢弃尚未返回的后台解析结果
+        self._parse_generation += 1
+        self._parsing = False
         self.current_paragraph_index = 0
         self.paragraphs_updated.emit(self.paragraphs)
         self.current_paragraph_changed.emit(self.current_paragraph_index)